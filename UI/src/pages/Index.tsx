@@ -86,6 +86,50 @@ const Index = () => {
     loadDevices();
   }, []);
 
+  // Live device updates pushed by the API instead of polling /devices
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let lastVersion: number | null = null;
+    let closed = false;
+
+    const connect = () => {
+      const query = lastVersion !== null ? `?since=${lastVersion}` : '';
+      socket = new WebSocket(`ws://localhost:8000/ws/devices${query}`);
+
+      socket.onmessage = (message) => {
+        const data = JSON.parse(message.data);
+
+        if (data.type === 'snapshot' && Array.isArray(data.devices)) {
+          lastVersion = data.version;
+          const byId = new Map<string, boolean>(data.devices.map((d: any) => [d.id, d.status === 'on']));
+          setDevices(prev => prev.map(d => byId.has(d.id) ? { ...d, isOn: byId.get(d.id)! } : d));
+        } else if (data.type === 'change') {
+          lastVersion = data.version;
+          if (data.changes?.status) {
+            setDevices(prev => prev.map(d =>
+              d.id === data.device_id ? { ...d, isOn: data.changes.status === 'on' } : d
+            ));
+          }
+        }
+      };
+
+      socket.onclose = () => {
+        if (!closed) {
+          retryTimer = setTimeout(connect, 3000);
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      if (retryTimer) clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, []);
+
   const toggleDevice = async (deviceId: string) => {
     const device = devices.find(d => d.id === deviceId);
     if (!device) return;
@@ -1,6 +1,6 @@
 import requests
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 class SmartHomeAPIClient:
@@ -130,6 +130,58 @@ class SmartHomeAPIClient:
         except requests.RequestException as e:
             return {"status": "error", "message": f"Error: {str(e)}"}
 
+    
+    def get_devices(self, location: Optional[str] = None, type: Optional[str] = None,
+                    status: Optional[str] = None) -> Dict[str, Any]:
+        """Get devices and their current status, optionally filtered by location/type/status."""
+        try:
+            params = {k: v for k, v in {"location": location, "type": type, "status": status}.items() if v}
+            response = self.session.get(f"{self.base_url}/devices", params=params)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            return {"status": "error", "message": f"Error: {str(e)}"}
+    
+    def get_device_changes(self, since: int) -> Dict[str, Any]:
+        """
+        Get only the device changes after `since` (a version from get_devices or a previous call).
+        If the response has "resync": true, the server no longer has those changes; call get_devices.
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/devices", params={"since": since})
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            return {"status": "error", "message": f"Error: {str(e)}"}
+    
+    def control_device(self, device_id: str, action: str) -> Dict[str, Any]:
+        """Turn a single device on or off."""
+        try:
+            payload = {"device_id": device_id, "action": action}
+            response = self.session.post(f"{self.base_url}/devices/control", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            return {"status": "error", "message": f"Error: {str(e)}"}
+    
+    def control_devices(self, commands: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Control several devices in one request.
+        
+        Args:
+            commands (List[Dict[str, str]]): [{"device_id": ..., "action": "on" | "off"}, ...]
+            
+        Returns:
+            Dict containing the combined result message and status
+        """
+        try:
+            payload = {"commands": commands}
+            response = self.session.post(f"{self.base_url}/devices/control/batch", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            return {"status": "error", "message": f"Error: {str(e)}"}
+
 
 def main():
     """
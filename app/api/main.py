@@ -1,12 +1,14 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 import sys
 import os
-import tempfile
+import asyncio
+import time
 import io
+import json
 from dotenv import load_dotenv
 
 # Load environment variables early
@@ -21,9 +23,17 @@ from app.agent.agent_impl import MyAgent
 from app.tools.tools import TOOLS
 from app.voice.TTS.tts_impl_daya import DAYA_TTS
 from app.voice.TTS.tts_impl_xtts import XTTS_TTS
-from app.voice.whisper_stt import WhisperSTT
+from app.voice.whisper_stt import WhisperSTT, command_profile
+from app.voice.stt_profiles import DECODING_PROFILES, get_profile
+from app.voice.stt_stream import StreamingTranscription
+from app.voice.stt_batching import TranscriptionQueueFull
+from app.voice.model_manager import model_manager
 from config.settings import Settings
 from app.devices.hardware import ArduinoController
+from app.devices.events import device_events
+from app.devices.history import DeviceHistoryStore
+from app.devices.scheduler import DeviceScheduler, timing_from_request, describe_job
+from app.devices.rules import RuleEngine
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -56,6 +66,9 @@ llm_client = None
 tts_service = None
 stt_service = None
 device_controller = None
+device_history = None
+device_scheduler = None
+rule_engine = None
 
 # Pydantic models for request/response
 class ChatRequest(BaseModel):
@@ -72,6 +85,7 @@ class SystemPromptRequest(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     message: str
+    devices: Optional[Dict[str, Any]] = None
 
 class LLMConfigRequest(BaseModel):
     api_key: Optional[str] = None
@@ -95,9 +109,22 @@ class Device(BaseModel):
     location: str
     pin: int
     status: str
+    controller: Optional[str] = None  # board name; None means the default board
 
 class DeviceList(BaseModel):
     devices: List[Device]
+    version: Optional[int] = None
+
+class DeviceChange(BaseModel):
+    version: int
+    device_id: str
+    changes: Dict[str, Any]
+    timestamp: float
+
+class DeviceDelta(BaseModel):
+    version: int
+    changes: List[DeviceChange]
+    resync: bool = False  # True when the backlog no longer covers `since`; fetch GET /devices
 
 class DeviceControlRequest(BaseModel):
     device_id: str
@@ -107,15 +134,74 @@ class DeviceResponse(BaseModel):
     message: str
     status: str = "success"
 
+class DeviceBatchControlRequest(BaseModel):
+    commands: List[DeviceControlRequest]
+
+class ScheduleRequest(BaseModel):
+    commands: List[DeviceControlRequest]
+    name: Optional[str] = ""
+    delay_minutes: Optional[float] = None
+    at: Optional[str] = None  # "HH:MM" (local) or ISO date-time
+    repeat: Optional[str] = None  # daily, weekdays, weekends or "mon,wed,..."; needs `at`
+    every_minutes: Optional[float] = None
+
+class DeviceHistoryBucket(BaseModel):
+    start: int
+    end: int
+    on_seconds: float
+    toggles: int
+
+class DeviceHistoryResponse(BaseModel):
+    device_id: str
+    bucket: int
+    buckets: List[DeviceHistoryBucket]
+
 # Initialize the agent and LLM client
 def initialize_agent():
-    global agent, llm_client, tts_service, stt_service, device_controller
+    global agent, llm_client, tts_service, stt_service, device_controller, device_history, device_scheduler, rule_engine
     try:
         # Initialize LLM client
         llm_client = GenericLLMClient()
-          # Initialize device controller
+        
+        # Release the previous controller's serial port before opening a new one
+        if device_controller is not None and hasattr(device_controller, "_cleanup_serial"):
+            device_controller._cleanup_serial()
+        
+        # Initialize device controller
         device_controller = ArduinoController()
         
+        # State history follows the event bus; created once, it outlives controller reinitialization
+        if device_history is None and Settings.DEVICE_HISTORY_DB:
+            device_history = DeviceHistoryStore(
+                Settings.DEVICE_HISTORY_DB,
+                flush_interval=float(Settings.DEVICE_HISTORY_FLUSH_INTERVAL),
+                retention_days=float(Settings.DEVICE_HISTORY_RETENTION_DAYS),
+                rollup_retention_days=float(Settings.DEVICE_HISTORY_ROLLUP_RETENTION_DAYS),
+            )
+            device_history.start(device_events, list(device_controller.get_device_states().values()))
+        
+        # Jobs always run through whichever controller is current
+        if device_scheduler is None:
+            device_scheduler = DeviceScheduler(
+                Settings.DEVICE_SCHEDULES_PATH,
+                execute=lambda commands: device_controller.control_devices(commands),
+                catch_up=float(Settings.DEVICE_SCHEDULE_CATCH_UP_SECONDS),
+            )
+            device_scheduler.start()
+        import app.tools.generic_tools as generic_tools
+        generic_tools.device_scheduler = device_scheduler
+        
+        if rule_engine is None:
+            rule_engine = RuleEngine(
+                Settings.DEVICE_RULES_PATH,
+                execute=lambda commands: device_controller.control_devices(commands),
+                get_state=lambda device_id: device_controller.get_device_states().get(device_id),
+                max_depth=int(Settings.DEVICE_RULES_MAX_DEPTH),
+                max_fires_per_minute=int(Settings.DEVICE_RULES_MAX_FIRES_PER_MINUTE),
+            )
+            rule_engine.load()
+            rule_engine.start(device_events)
+        
         # Set the device controller for the tools
         from app.tools.generic_tools import device_controller as tools_device_controller
         tools_device_controller = device_controller
@@ -131,17 +217,20 @@ def initialize_agent():
             device_control=device_controller
         )
         
-        # Initialize voice services
-        if Settings.TTS_MODEL.strip().split()[0] == "XTTS":
-            tts_service = XTTS_TTS()
-        
-        elif Settings.TTS_MODEL.strip().split()[0]  == "DAYA":
-            tts_service = DAYA_TTS()
-        
-        else:
-            raise ValueError(f"Unsupported TTS model: {Settings.TTS_MODEL}")
+        # Initialize voice services once; their models live in the model manager, so
+        # reinitializing the agent doesn't load Whisper and XTTS a second time
+        if tts_service is None:
+            if Settings.TTS_MODEL.strip().split()[0] == "XTTS":
+                tts_service = XTTS_TTS()
+            
+            elif Settings.TTS_MODEL.strip().split()[0]  == "DAYA":
+                tts_service = DAYA_TTS()
+            
+            else:
+                raise ValueError(f"Unsupported TTS model: {Settings.TTS_MODEL}")
         
-        stt_service = WhisperSTT()
+        if stt_service is None:
+            stt_service = WhisperSTT()
         
         print("✅ Agent, voice services, and device controller initialized successfully")
         return True
@@ -154,18 +243,43 @@ def initialize_agent():
 async def startup_event():
     initialize_agent()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if device_history is not None:
+        # Writes the last batch
+        device_history.close()
+    if device_scheduler is not None:
+        device_scheduler.close()
+    if rule_engine is not None:
+        rule_engine.close()
+    if stt_service is not None:
+        stt_service.batcher.close()
+    if model_manager.is_registered("stt_pool"):
+        # Stops the long-form worker processes
+        model_manager.unload("stt_pool")
+    model_manager.close()
+
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check if the API is running and the agent is initialized."""
+    devices = device_controller.connection_status() if device_controller is not None else None
     if agent is None or llm_client is None:
         return HealthResponse(
             status="error",
-            message="Agent not initialized"
+            message="Agent not initialized",
+            devices=devices
+        )
+    if devices and devices.get("state") not in ("connected", "simulator"):
+        return HealthResponse(
+            status="degraded",
+            message=f"API is running but the device link is {devices.get('state')}",
+            devices=devices
         )
     return HealthResponse(
         status="healthy",
-        message="API is running and agent is initialized"
+        message="API is running and agent is initialized",
+        devices=devices
     )
 
 # Simple chat endpoint
@@ -445,37 +559,94 @@ async def download_file(filename: str):
 
 # Speech-to-Text endpoint
 @app.post("/stt/transcribe", response_model=STTResponse)
-async def speech_to_text(audio_file: UploadFile = File(...)):
-    """Transcribe uploaded audio file to text."""
+async def speech_to_text(audio_file: UploadFile = File(...), profile: Optional[str] = None):
+    """Transcribe uploaded audio file to text with a decoding profile (STT_DEFAULT_PROFILE if omitted)."""
     if stt_service is None:
         raise HTTPException(status_code=500, detail="STT service not initialized")
+    try:
+        decoding = get_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
         # Validate file type
         if not audio_file.content_type or not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
-          # Create temporary file for audio processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
         
-        try:
-            # Transcribe audio using STT service
-            transcription = stt_service.transcribe(temp_file_path)
-            
-            return STTResponse(
-                transcription=transcription,
-                status="success"
-            )
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        # Decoded in memory; only unusual formats still go through a temp file and ffmpeg.
+        # Off the event loop: the clip waits in the batch queue while other requests are served
+        content = await audio_file.read()
+        transcription = await asyncio.to_thread(
+            stt_service.transcribe_bytes, content, audio_file.content_type, audio_file.filename, decoding)
+        
+        return STTResponse(
+            transcription=transcription,
+            status="success"
+        )
                 
+    except HTTPException:
+        raise
+    except TranscriptionQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in STT transcription: {str(e)}")
 
+# Long recordings, streamed chunk by chunk
+@app.post("/stt/transcribe/stream")
+async def speech_to_text_stream(audio_file: UploadFile = File(...), profile: Optional[str] = None):
+    """
+    Transcribe a long recording (voice memo, meeting notes) in parallel chunks split at pauses.
+    The response is newline-delimited JSON: a plan event, one chunk event per chunk as soon as
+    it is transcribed (in completion order, with its start/end seconds), then a final event with
+    the stitched transcript.
+    """
+    if stt_service is None:
+        raise HTTPException(status_code=500, detail="STT service not initialized")
+    try:
+        decoding = get_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not audio_file.content_type or not audio_file.content_type.startswith('audio/'):
+        raise HTTPException(status_code=400, detail="File must be an audio file")
+
+    content = await audio_file.read()
+    if not content:
+        raise HTTPException(status_code=400, detail="Audio file is empty")
+    try:
+        audio = await asyncio.to_thread(
+            stt_service.decode_bytes, content, audio_file.content_type, audio_file.filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not decode audio: {str(e)}")
+
+    def events():
+        # Iterated in Starlette's threadpool, so waiting on chunks doesn't block the event loop
+        try:
+            for event in stt_service.transcribe_long(audio, decoding):
+                yield json.dumps(event) + "\n"
+        except TranscriptionQueueFull as e:
+            yield json.dumps({"type": "error", "message": str(e), "retry_after": 1}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# Decoding profiles and their latency
+@app.get("/stt/profiles")
+async def get_stt_profiles():
+    """Decoding profiles, which one each endpoint uses by default, and recent latency per profile."""
+    if stt_service is not None:
+        profiles = stt_service.profile_stats()
+    else:
+        profiles = {name: profile.describe() for name, profile in DECODING_PROFILES.items()}
+    return {"profiles": profiles, "default": get_profile().name, "command": command_profile().name,
+            "status": "success"}
+
+# Voice model status endpoint
+@app.get("/models")
+async def get_models():
+    """Load state, load/warm-up time and idle time of the voice models."""
+    return {"models": model_manager.status(), "status": "success"}
+
 # Live Speech-to-Text endpoint
 @app.post("/stt/live", response_model=STTResponse)
 async def live_speech_to_text():
@@ -494,46 +665,143 @@ async def live_speech_to_text():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in live STT: {str(e)}")
 
+@app.websocket("/ws/stt")
+async def stt_websocket(websocket: WebSocket, sample_rate: int = 16000, profile: Optional[str] = None):
+    """
+    Streaming speech-to-text for remote microphones.
+    The client sends binary messages of 16-bit little-endian mono PCM at `sample_rate`
+    and may send {"type": "flush"} to end the current utterance. The server answers
+    with speech_start, partial (while the user speaks) and final (once they stop)
+    messages, each tagged with its utterance number. Decoding uses `profile`,
+    by default the command profile.
+    """
+    await websocket.accept()
+
+    if stt_service is None:
+        await websocket.send_json({"type": "error", "message": "STT service not initialized"})
+        await websocket.close()
+        return
+    try:
+        decoding = get_profile(profile) if profile else command_profile()
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close()
+        return
+
+    session = StreamingTranscription(
+        sample_rate=sample_rate,
+        end_silence=int(Settings.STT_STREAM_END_SILENCE_MS) / 1000,
+        partial_interval=int(Settings.STT_STREAM_PARTIAL_INTERVAL_MS) / 1000,
+    )
+    send_lock = asyncio.Lock()
+    partial_task: Optional[asyncio.Task] = None
+    finished = 0  # Latest utterance whose final was sent; later partials for it are stale
+
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def run_partial(action):
+        try:
+            text = await asyncio.to_thread(stt_service.transcribe_audio, action["audio"], decoding)
+        except TranscriptionQueueFull:
+            return  # A busy server skips partials; the final still comes
+        if action["utterance"] > finished:
+            await send({"type": "partial", "utterance": action["utterance"], "text": text})
+
+    async def handle(actions):
+        nonlocal partial_task, finished
+        for action in actions:
+            if action["type"] == "speech_start":
+                await send({"type": "speech_start", "utterance": action["utterance"]})
+            elif action["type"] == "partial":
+                # Skip a partial while the previous one is still running rather than queueing behind it
+                if partial_task is None or partial_task.done():
+                    partial_task = asyncio.create_task(run_partial(action))
+            elif action["type"] == "final":
+                started = time.perf_counter()
+                try:
+                    text = await asyncio.to_thread(stt_service.transcribe_audio, action["audio"], decoding)
+                except TranscriptionQueueFull as e:
+                    finished = action["utterance"]
+                    await send({"type": "error", "utterance": action["utterance"], "message": str(e)})
+                    continue
+                finished = action["utterance"]
+                await send({"type": "final", "utterance": action["utterance"], "text": text,
+                            "duration": round(action["audio"].size / 16000, 2),
+                            "latency_ms": round((time.perf_counter() - started) * 1000)})
+            elif action["type"] == "discard":
+                finished = action["utterance"]
+
+    try:
+        await send({"type": "ready", "sample_rate": sample_rate, "profile": decoding.name})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await handle(session.feed(message["bytes"]))
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except ValueError:
+                    command = {}
+                if command.get("type") == "flush":
+                    await handle(session.flush())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if partial_task is not None:
+            partial_task.cancel()
+
 # Voice chat endpoint (combines STT + Chat + TTS)
 @app.post("/voice/chat")
-async def voice_chat(audio_file: UploadFile = File(...)):
-    """Complete voice interaction: STT -> Chat -> TTS response."""
+async def voice_chat(audio_file: UploadFile = File(...), profile: Optional[str] = None):
+    """Complete voice interaction: STT -> Chat -> TTS response. Decodes with the command profile unless `profile` is given."""
     if agent is None or stt_service is None or tts_service is None:
         raise HTTPException(status_code=500, detail="Voice services not fully initialized")
+    try:
+        decoding = get_profile(profile) if profile else command_profile()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
         # Step 1: Transcribe audio to text
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
-            user_message = stt_service.transcribe(temp_file_path)
-            
-            # Step 2: Process with agent
-            agent_response = agent.handle_user_input(user_message)
-            
-            # Step 3: For now, return text response (TTS synthesis would happen here)
+        content = await audio_file.read()
+        user_message = await asyncio.to_thread(
+            stt_service.transcribe_bytes, content, audio_file.content_type, audio_file.filename, decoding)
+        if not user_message.strip():
             return {
-                "user_message": user_message,
-                "agent_response": agent_response,
-                "status": "success",
-                "note": "Audio response generation pending TTS implementation"
+                "user_message": "",
+                "agent_response": "",
+                "status": "no_speech",
+                "note": "No speech detected in the recording"
             }
-            
-        finally:
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        
+        # Step 2: Process with agent
+        agent_response = agent.handle_user_input(user_message)
+        
+        # Step 3: For now, return text response (TTS synthesis would happen here)
+        return {
+            "user_message": user_message,
+            "agent_response": agent_response,
+            "status": "success",
+            "note": "Audio response generation pending TTS implementation"
+        }
                 
+    except TranscriptionQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in voice chat: {str(e)}")
 
 # Device control endpoints
-@app.get("/devices", response_model=DeviceList)
-async def get_devices():
+@app.get("/devices", response_model=Union[DeviceDelta, DeviceList])
+async def get_devices(location: Optional[str] = None, type: Optional[str] = None, status: Optional[str] = None,
+                      since: Optional[int] = None):
     """
-    Get a list of all available devices and their current status.
+    Get available devices and their current status.
+    Optional location/type/status query parameters return only the matching subset.
+    With `since=<version>`, return only the changes after that version instead.
     """
     global device_controller
     
@@ -541,13 +809,104 @@ async def get_devices():
         raise HTTPException(status_code=503, detail="Device controller not initialized")
     
     try:
-        device_dict = device_controller.get_device_states()
-        # Convert dict to list of devices
-        devices = list(device_dict.values()) if isinstance(device_dict, dict) else device_dict
-        return DeviceList(devices=devices)
+        if since is not None:
+            changes = device_events.since(since)
+            if changes is None:
+                return DeviceDelta(version=device_events.version, changes=[], resync=True)
+            return DeviceDelta(version=changes[-1]["version"] if changes else since, changes=changes)
+        
+        # Read the version first: a change landing in between is re-sent, never lost
+        version = device_events.version
+        devices = device_controller.query_devices(location=location, type=type, status=status)
+        return DeviceList(devices=devices, version=version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving devices: {str(e)}")
 
+@app.websocket("/ws/devices")
+async def devices_websocket(websocket: WebSocket, since: Optional[int] = None):
+    """
+    Push device state changes to the client as they happen.
+    Sends a full snapshot first (or the missed changes when resuming with `since`),
+    then one message per change carrying its version number.
+    """
+    await websocket.accept()
+    
+    if not device_controller:
+        await websocket.send_json({"type": "error", "message": "Device controller not initialized"})
+        await websocket.close()
+        return
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    
+    def on_event(event):
+        # Called on the publishing thread; hand the event to the event loop
+        loop.call_soon_threadsafe(_enqueue, event)
+    
+    def _enqueue(event):
+        if queue.full():
+            # A client this far behind gets one resync instead of unbounded buffering;
+            # the snapshot supersedes everything queued
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+        else:
+            queue.put_nowait(event)
+    
+    unsubscribe = device_events.subscribe(on_event)
+    try:
+        missed = device_events.since(since) if since is not None else None
+        if missed is not None:
+            last_sent = since
+            for event in missed:
+                await websocket.send_json({"type": "change", **event})
+                last_sent = event["version"]
+        else:
+            last_sent = device_events.version
+            devices = list(device_controller.get_device_states().values())
+            await websocket.send_json({"type": "snapshot", "version": last_sent, "devices": devices})
+        
+        while True:
+            event = await queue.get()
+            if event.get("type") == "resync":
+                last_sent = device_events.version
+                devices = list(device_controller.get_device_states().values())
+                await websocket.send_json({"type": "snapshot", "version": last_sent, "devices": devices})
+                continue
+            if event["version"] <= last_sent:
+                continue
+            await websocket.send_json({"type": "change", **event})
+            last_sent = event["version"]
+    except WebSocketDisconnect:
+        pass
+    finally:
+        unsubscribe()
+
+@app.get("/devices/{device_id}/history", response_model=DeviceHistoryResponse)
+async def get_device_history(device_id: str, from_: Optional[float] = Query(None, alias="from"),
+                             to: Optional[float] = None, bucket: int = 3600):
+    """
+    On-time seconds and toggle counts for one device, per `bucket` seconds
+    (rounded down to whole hours). `from`/`to` are Unix timestamps; the default
+    range is the last 24 hours.
+    """
+    if not device_history:
+        raise HTTPException(status_code=503, detail="Device history not enabled")
+    
+    if device_controller and device_id not in device_controller.get_device_states():
+        raise HTTPException(status_code=404, detail=f"Device '{device_id}' not found")
+    
+    end = to if to is not None else time.time()
+    start = from_ if from_ is not None else end - 86400
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    if bucket < 3600:
+        raise HTTPException(status_code=400, detail="bucket must be at least 3600 seconds")
+    
+    bucket = bucket // 3600 * 3600
+    buckets = await asyncio.to_thread(device_history.history, device_id, start, end, bucket)
+    return DeviceHistoryResponse(device_id=device_id, bucket=bucket, buckets=buckets)
+
 @app.post("/devices/control", response_model=DeviceResponse)
 async def control_device(request: DeviceControlRequest):
     """
@@ -563,7 +922,8 @@ async def control_device(request: DeviceControlRequest):
         raise HTTPException(status_code=400, detail="Action must be 'on' or 'off'")
     
     try:
-        result = device_controller.control_device({
+        # Waits for the board's acknowledgement: off the event loop, so other requests keep flowing
+        result = await asyncio.to_thread(device_controller.control_device, {
             "device_id": request.device_id,
             "action": request.action
         })
@@ -579,6 +939,142 @@ async def control_device(request: DeviceControlRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error controlling device: {str(e)}")
 
+@app.post("/devices/reconnect", response_model=DeviceResponse)
+async def reconnect_devices(controller: Optional[str] = None):
+    """
+    Reconnect the serial link to the Arduino without reinitializing the agent or voice models.
+    With `controller=<name>` only that board reconnects; otherwise every board does.
+    """
+    global device_controller
+    
+    if not device_controller:
+        raise HTTPException(status_code=503, detail="Device controller not initialized")
+    
+    if not device_controller.reconnect(controller):
+        if controller:
+            raise HTTPException(status_code=404, detail=f"No serial connection for controller '{controller}'")
+        raise HTTPException(status_code=400, detail="No serial connection to reconnect (simulator mode)")
+    
+    return DeviceResponse(message="Reconnect started", status="success")
+
+@app.post("/devices/control/batch", response_model=DeviceResponse)
+async def control_devices(request: DeviceBatchControlRequest):
+    """
+    Control several devices in one hardware round-trip.
+    """
+    global device_controller
+    
+    if not device_controller:
+        raise HTTPException(status_code=503, detail="Device controller not initialized")
+    
+    if not request.commands:
+        raise HTTPException(status_code=400, detail="At least one command is required")
+    
+    for command in request.commands:
+        if command.action not in ["on", "off"]:
+            raise HTTPException(status_code=400, detail=f"Action for '{command.device_id}' must be 'on' or 'off'")
+    
+    try:
+        result = await asyncio.to_thread(device_controller.control_devices, [
+            {"device_id": command.device_id, "action": command.action}
+            for command in request.commands
+        ])
+        
+        # Every entry failed - report as an error; partial failures are returned in the message
+        if all(part.startswith("Error") for part in result.split("; ")):
+            raise HTTPException(status_code=400, detail=result)
+        
+        status = "partial" if "Error" in result else "success"
+        return DeviceResponse(message=result, status=status)
+    except HTTPException:
+        raise
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error controlling devices: {str(e)}")
+
+# Scheduled device actions
+@app.get("/schedules")
+async def list_schedules():
+    """List scheduled device actions, soonest first."""
+    if not device_scheduler:
+        raise HTTPException(status_code=503, detail="Scheduler not initialized")
+    return {"schedules": [describe_job(job) for job in device_scheduler.list_jobs()]}
+
+@app.post("/schedules")
+async def create_schedule(request: ScheduleRequest):
+    """
+    Schedule device commands once (delay_minutes or at) or repeatedly
+    (repeat + at, or every_minutes). Jobs run through the same path as /devices/control/batch.
+    """
+    if not device_scheduler:
+        raise HTTPException(status_code=503, detail="Scheduler not initialized")
+    
+    if not request.commands:
+        raise HTTPException(status_code=400, detail="At least one command is required")
+    
+    known = device_controller.get_device_states() if device_controller else {}
+    for command in request.commands:
+        if command.action not in ["on", "off"]:
+            raise HTTPException(status_code=400, detail=f"Action for '{command.device_id}' must be 'on' or 'off'")
+        if device_controller and command.device_id not in known:
+            raise HTTPException(status_code=404, detail=f"Device '{command.device_id}' not found")
+    
+    try:
+        timing = timing_from_request(request.delay_minutes, request.at, request.repeat, request.every_minutes)
+        job = device_scheduler.schedule([{"device_id": command.device_id, "action": command.action}
+                                         for command in request.commands],
+                                        name=request.name or "", **timing)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return describe_job(job)
+
+@app.delete("/schedules/{schedule_id}", response_model=DeviceResponse)
+async def cancel_schedule(schedule_id: str):
+    """Cancel a scheduled device action."""
+    if not device_scheduler:
+        raise HTTPException(status_code=503, detail="Scheduler not initialized")
+    if not device_scheduler.cancel(schedule_id):
+        raise HTTPException(status_code=404, detail=f"Schedule '{schedule_id}' not found")
+    return DeviceResponse(message=f"Schedule '{schedule_id}' cancelled")
+
+# Sensor telemetry
+@app.get("/sensors")
+async def get_sensors():
+    """Latest reading of every sensor the boards report."""
+    sensors = getattr(device_controller, "sensors", None)
+    if sensors is None:
+        raise HTTPException(status_code=503, detail="Device controller not initialized")
+    return {"sensors": sensors.latest()}
+
+@app.get("/sensors/{sensor}/stats")
+async def get_sensor_stats(sensor: str, window: float = 3600):
+    """Count, mean, min, max and std of one sensor over the last `window` seconds."""
+    sensors = getattr(device_controller, "sensors", None)
+    if sensors is None:
+        raise HTTPException(status_code=503, detail="Device controller not initialized")
+    if window <= 0:
+        raise HTTPException(status_code=400, detail="window must be positive")
+    stats = sensors.stats(sensor, window)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No readings for '{sensor}' in the last {window:g}s")
+    return stats
+
+# Automation rules
+@app.get("/rules")
+async def list_rules():
+    """List the automation rules with their fire counts, plus engine statistics."""
+    if not rule_engine:
+        raise HTTPException(status_code=503, detail="Rule engine not initialized")
+    return {"rules": [rule.describe() for rule in rule_engine.rules.values()], "stats": rule_engine.stats()}
+
+@app.post("/rules/reload", response_model=DeviceResponse)
+async def reload_rules():
+    """Reload the rules file without restarting."""
+    if not rule_engine:
+        raise HTTPException(status_code=503, detail="Rule engine not initialized")
+    enabled = rule_engine.load()
+    return DeviceResponse(message=f"Loaded {enabled} enabled rules")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -10,11 +10,50 @@
  * Example: "5:1\n" will set pin 5 HIGH (on)
  *          "6:0\n" will set pin 6 LOW (off)
  *
+ * Several pins can be set in one frame by separating pairs with commas:
+ *          "8:0,9:0,12:0\n"
+ * The whole frame is validated first and answered with a single reply.
+ *
  * The Arduino responds with "OK" if successful, or "ERROR" if the command is invalid.
+ * "PING\n" is answered with "PONG" and is used by the host as a heartbeat.
+ *
+ * Binary framing (protocol version 1, see app/devices/protocol.py):
+ * the host sends "PROTO 1\n" after "Arduino Ready" and switches to frames when
+ * the reply is "PROTO 1". A frame is
+ *   0xA5 | LEN | SEQ | OPCODE | PAYLOAD (LEN bytes) | CRC8 (poly 0x07 over LEN..PAYLOAD)
+ * SET_PINS (0x01) carries one byte per pin, (pin << 1) | value; PING is 0x02.
+ * Replies echo SEQ with ACK (0x81), PONG (0x82) or ERROR (0xE0, payload = code).
+ * Text lines keep working alongside frames.
+ *
+ * Telemetry: the analog inputs listed in telemetryPins are reported every
+ * telemetryIntervalMs without being asked, as "T:a0=512,a1=300" (text) or, once
+ * the host talks in frames, as a TELEMETRY frame (0x83, SEQ 0) carrying
+ * "a0=512,a1=300"; readings that don't fit one frame's payload continue in
+ * further TELEMETRY frames, split between readings. Leave telemetryPinCount at
+ * 0 to disable.
  */
 
 const int maxPins = 13; // Maximum number of pins to control (adjust as needed)
 
+const int protocolVersion = 1;
+const byte frameStart = 0xA5;
+const byte maxPayload = 32;
+const byte opSetPins = 0x01;
+const byte opPing = 0x02;
+const byte opAck = 0x81;
+const byte opPong = 0x82;
+const byte opTelemetry = 0x83;
+const byte opError = 0xE0;
+const byte errorInvalidCommand = 1;
+const byte errorInvalidPin = 2;
+const byte errorBadFrame = 3;
+
+const int telemetryPinCount = 0; // e.g. 2 with telemetryPins = {A0, A1}
+const int telemetryPins[] = {A0, A1};
+const unsigned long telemetryIntervalMs = 5000;
+unsigned long lastTelemetry = 0;
+bool hostUsesFrames = false;
+
 void setup()
 {
     Serial.begin(9600);
@@ -29,35 +68,215 @@ void setup()
     Serial.println("Arduino Ready");
 }
 
+// Parse one "PIN:VALUE" pair. Returns false if the pair is malformed.
+bool parsePair(String pair, int &pin, int &value)
+{
+    int separatorIndex = pair.indexOf(':');
+    if (separatorIndex <= 0)
+    {
+        return false;
+    }
+    pin = pair.substring(0, separatorIndex).toInt();
+    value = pair.substring(separatorIndex + 1).toInt();
+    return true;
+}
+
+byte crc8(const byte *data, byte length)
+{
+    byte crc = 0;
+    for (byte i = 0; i < length; i++)
+    {
+        crc ^= data[i];
+        for (byte bit = 0; bit < 8; bit++)
+        {
+            crc = (crc & 0x80) ? (byte)((crc << 1) ^ 0x07) : (byte)(crc << 1);
+        }
+    }
+    return crc;
+}
+
+void sendFrame(byte seq, byte opcode, const byte *payload, byte length)
+{
+    byte body[3 + maxPayload];
+    body[0] = length;
+    body[1] = seq;
+    body[2] = opcode;
+    for (byte i = 0; i < length; i++)
+    {
+        body[3 + i] = payload[i];
+    }
+    Serial.write(frameStart);
+    Serial.write(body, 3 + length);
+    Serial.write(crc8(body, 3 + length));
+}
+
+void sendFrameError(byte seq, byte code)
+{
+    sendFrame(seq, opError, &code, 1);
+}
+
+// Read and answer one binary frame; the start byte is still in the buffer.
+void handleFrame()
+{
+    byte length;
+    Serial.read(); // start byte
+    if (Serial.readBytes(&length, 1) != 1 || length > maxPayload)
+    {
+        return; // noise or a truncated frame; the host resends on timeout
+    }
+    byte body[3 + maxPayload];
+    body[0] = length;
+    if (Serial.readBytes(body + 1, length + 2) != length + 2)
+    {
+        return;
+    }
+    byte crc;
+    if (Serial.readBytes(&crc, 1) != 1 || crc != crc8(body, 3 + length))
+    {
+        return; // corrupted: drop it, the host resends on timeout
+    }
+
+    hostUsesFrames = true;
+    byte seq = body[1];
+    byte opcode = body[2];
+    byte *payload = body + 3;
+    if (opcode == opPing)
+    {
+        sendFrame(seq, opPong, payload, 0);
+        return;
+    }
+    if (opcode != opSetPins || length == 0)
+    {
+        sendFrameError(seq, errorBadFrame);
+        return;
+    }
+
+    // Validate every pin before touching any output, like the text protocol
+    for (byte i = 0; i < length; i++)
+    {
+        int pin = payload[i] >> 1;
+        if (pin < 2 || pin > maxPins)
+        {
+            sendFrameError(seq, errorInvalidPin);
+            return;
+        }
+    }
+    for (byte i = 0; i < length; i++)
+    {
+        digitalWrite(payload[i] >> 1, (payload[i] & 1) ? LOW : HIGH);
+    }
+    sendFrame(seq, opAck, payload, 0);
+}
+
+void reportTelemetry()
+{
+    if (telemetryPinCount == 0 || millis() - lastTelemetry < telemetryIntervalMs)
+    {
+        return;
+    }
+    lastTelemetry = millis();
+
+    String readings = "";
+    for (int i = 0; i < telemetryPinCount; i++)
+    {
+        String reading = "a" + String(telemetryPins[i] - A0) + "=" + String(analogRead(telemetryPins[i]));
+        if (hostUsesFrames && readings.length() > 0 && readings.length() + 1 + reading.length() > maxPayload)
+        {
+            // Split between readings, never inside one: each frame stays self-contained
+            sendFrame(0, opTelemetry, (const byte *)readings.c_str(), readings.length());
+            readings = "";
+        }
+        if (readings.length() > 0)
+        {
+            readings += ",";
+        }
+        readings += reading;
+    }
+    if (hostUsesFrames)
+    {
+        sendFrame(0, opTelemetry, (const byte *)readings.c_str(), readings.length());
+    }
+    else
+    {
+        Serial.println("T:" + readings);
+    }
+}
+
 void loop()
 {
+    reportTelemetry();
+
+    if (Serial.available() && Serial.peek() == frameStart)
+    {
+        handleFrame();
+        return;
+    }
+
     if (Serial.available())
     {
         String command = Serial.readStringUntil('\n');
+        command.trim();
+
+        if (command == "PING")
+        {
+            Serial.println("PONG");
+            return;
+        }
+
+        if (command.startsWith("PROTO "))
+        {
+            int requested = command.substring(6).toInt();
+            Serial.print("PROTO ");
+            Serial.println(requested < protocolVersion ? requested : protocolVersion);
+            return;
+        }
 
-        // Parse command (PIN:VALUE)
-        int separatorIndex = command.indexOf(':');
-        if (separatorIndex > 0)
+        // Validate every PIN:VALUE pair before touching any output
+        int start = 0;
+        while (start < (int)command.length())
         {
-            int pin = command.substring(0, separatorIndex).toInt();
-            int value = command.substring(separatorIndex + 1).toInt();
+            int end = command.indexOf(',', start);
+            if (end < 0)
+            {
+                end = command.length();
+            }
 
-            // Validate pin number
-            if (pin >= 2 && pin <= maxPins)
+            int pin, value;
+            if (!parsePair(command.substring(start, end), pin, value))
             {
-                // Set pin state
-                digitalWrite(pin, value == 1 ? LOW : HIGH);
-                Serial.println("OK");
+                Serial.println("ERROR:INVALID_COMMAND");
+                return;
             }
-            else
+            if (pin < 2 || pin > maxPins)
             {
                 Serial.println("ERROR:INVALID_PIN");
+                return;
             }
+            start = end + 1;
         }
-        else
+
+        if (command.length() == 0)
         {
             Serial.println("ERROR:INVALID_COMMAND");
+            return;
+        }
+
+        // Apply all pairs, then acknowledge the frame once
+        start = 0;
+        while (start < (int)command.length())
+        {
+            int end = command.indexOf(',', start);
+            if (end < 0)
+            {
+                end = command.length();
+            }
+
+            int pin, value;
+            parsePair(command.substring(start, end), pin, value);
+            digitalWrite(pin, value == 1 ? LOW : HIGH);
+            start = end + 1;
         }
+        Serial.println("OK");
     }
 
     // Small delay to not overload the serial buffer
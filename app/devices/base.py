@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class DeviceControlInterface(ABC):
     """
@@ -11,7 +11,9 @@ class DeviceControlInterface(ABC):
 
     Methods:
     - control_device: Apply an action to a device.
+    - control_devices: Apply several actions in one round-trip.
     - get_device_states: Return current states of all devices.
+    - query_devices: Return only the devices matching location/type/status filters.
     """
 
     @abstractmethod
@@ -24,6 +26,16 @@ class DeviceControlInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def control_devices(self, commands: List[Dict[str, Any]]) -> str:
+        """
+        Input: List[Dict[str, Any]] — Device commands (e.g., [{"device_id": "bedroom_light", "action": "off"}, ...])
+        Output: str — Per-device results joined with "; "
+        Called by: DeviceCommandAgent, API batch endpoint
+        Calls: GPIO controller or simulation logic (one multi-pin frame)
+        """
+        pass
+
     @abstractmethod
     def get_device_states(self) -> Dict[str, Any]:
         """
@@ -33,3 +45,14 @@ class DeviceControlInterface(ABC):
         Calls: internal state tracker
         """
         pass
+
+    @abstractmethod
+    def query_devices(self, location: Optional[str] = None, type: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Input: Optional filters — location (e.g., "bedroom"), type (e.g., "lamp"), status ("on"/"off")
+        Output: List[Dict[str, Any]] — Devices matching every given filter
+        Called by: DeviceCommandAgent, API
+        Calls: indexed device registry
+        """
+        pass
@@ -0,0 +1,217 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+class _PendingPin:
+    __slots__ = ("value", "futures", "deadline", "commands")
+
+    def __init__(self, value: int, deadline: float):
+        self.value = value
+        self.futures: List[Future] = []
+        self.deadline = deadline
+        self.commands = 0
+
+
+class _PendingFrame:
+    __slots__ = ("values", "futures", "absorbed")
+
+    def __init__(self, values: Dict[int, int]):
+        self.values = values
+        self.futures: List[Future] = []
+        # Pins whose held single-pin commands this frame superseded
+        self.absorbed: List[int] = []
+
+
+class PinCommandCoalescer:
+    """
+    Per-pin coalescing stage in front of the serial writer.
+
+    Role:
+    - Hold a pin command for `window` seconds; later commands for the same pin
+      only replace the desired value (on/off/on within the window -> one "on")
+    - Keep at most one frame per pin on the wire; commands arriving meanwhile
+      coalesce into the next one
+    - Drop a burst that nets out to the state the pin already has
+    - Resolve every caller's Future with the reply of the frame that carried
+      the final value
+    - Order multi-pin frames with the single-pin commands around them: a frame
+      supersedes the commands held for its pins and waits for their frames on
+      the wire, and later commands for those pins wait for it
+
+    `send(pin, value)` and `send_frame({pin: value})` must return a Future
+    resolved with the firmware reply. `on_applied(pin, value)` runs once per
+    acknowledged single-pin frame (or multi-pin frame that superseded held
+    commands for the pin), in order per pin, before the callers are released.
+    """
+
+    def __init__(self, send: Callable[[int, int], Future], window: float = 0.03,
+                 on_applied: Optional[Callable[[int, int], None]] = None,
+                 send_frame: Optional[Callable[[Dict[int, int]], Future]] = None):
+        self.send = send
+        self.send_frame = send_frame
+        self.window = window
+        self.on_applied = on_applied
+        self._pending: Dict[int, _PendingPin] = {}
+        self._frames: List[_PendingFrame] = []
+        self._in_flight: Dict[int, int] = {}
+        self._applied: Dict[int, int] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self.commands = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self._thread = threading.Thread(target=self._run, name="PinCommandCoalescer", daemon=True)
+        self._thread.start()
+
+    def submit(self, pin: int, value: int) -> Future:
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                future.set_exception(RuntimeError("Command coalescer closed"))
+                return future
+            self.commands += 1
+            entry = self._pending.get(pin)
+            if entry is None:
+                entry = _PendingPin(value, time.monotonic() + self.window)
+                self._pending[pin] = entry
+                self._condition.notify()
+            entry.value = value
+            entry.commands += 1
+            entry.futures.append(future)
+        return future
+
+    def submit_frame(self, pin_values: Dict[int, int]) -> Future:
+        """Send several pins in one frame, without the coalescing window, in order with single-pin commands."""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                future.set_exception(RuntimeError("Command coalescer closed"))
+                return future
+            frame = _PendingFrame(dict(pin_values))
+            frame.futures.append(future)
+            for pin in frame.values:
+                entry = self._pending.pop(pin, None)
+                if entry is not None:
+                    # Held commands are older than this frame: it carries their pin's final value
+                    frame.futures.extend(entry.futures)
+                    frame.absorbed.append(pin)
+            self._frames.append(frame)
+            self._condition.notify()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "commands": self.commands,
+                "frames_sent": self.frames_sent,
+                "frames_skipped": self.frames_skipped,
+                "pending": len(self._pending) + len(self._frames),
+            }
+
+    def forget(self):
+        """Drop what is known about the pins (e.g. the board reset)."""
+        with self._condition:
+            self._applied.clear()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+            frames, self._frames = self._frames, []
+            self._condition.notify()
+        for entry in list(pending.values()) + frames:
+            for future in entry.futures:
+                future.set_exception(RuntimeError("Command coalescer closed"))
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                frames, queued = [], set()
+                for frame in list(self._frames):
+                    # Queued frames go out in order, each once its pins are off the wire
+                    if not queued.intersection(frame.values) and not any(pin in self._in_flight for pin in frame.values):
+                        self._frames.remove(frame)
+                        frames.append(frame)
+                        self._in_flight.update(frame.values)
+                        self.frames_sent += 1
+                    queued.update(frame.values)
+                # A command for a pin in a queued frame arrived after it and must follow it
+                ready = [pin for pin, entry in self._pending.items()
+                         if entry.deadline <= now and pin not in self._in_flight and pin not in queued]
+                if not ready and not frames:
+                    waiting = [entry.deadline for pin, entry in self._pending.items()
+                               if pin not in self._in_flight and pin not in queued]
+                    self._condition.wait(max(0.0, min(waiting) - now) if waiting else None)
+                    continue
+                batch = []
+                for pin in ready:
+                    entry = self._pending.pop(pin)
+                    if entry.commands > 1 and self._applied.get(pin) == entry.value:
+                        # on/off bursts that end where the pin already is never touch the relay
+                        self.frames_skipped += 1
+                        for future in entry.futures:
+                            future.set_result("OK")
+                        continue
+                    self._in_flight[pin] = entry.value
+                    self.frames_sent += 1
+                    batch.append((pin, entry))
+
+            for frame in frames:
+                self._dispatch(lambda frame=frame: self.send_frame(frame.values),
+                               frame.values, frame.futures, frame.absorbed)
+            for pin, entry in batch:
+                if entry.commands > 1:
+                    print(f"{Fore.CYAN}[PinCommandCoalescer] Pin {pin}: {entry.commands} commands -> {entry.value}{Style.RESET_ALL}")
+                self._dispatch(lambda pin=pin, entry=entry: self.send(pin, entry.value),
+                               {pin: entry.value}, entry.futures, [pin])
+
+    def _dispatch(self, send: Callable[[], Future], values: Dict[int, int], futures: List[Future], notify: List[int]):
+        try:
+            frame = send()
+        except Exception as e:
+            frame = Future()
+            frame.set_exception(e)
+        frame.add_done_callback(lambda f: self._on_frame_done(values, futures, notify, f))
+
+    def _on_frame_done(self, values: Dict[int, int], futures: List[Future], notify: List[int], frame: Future):
+        try:
+            reply = frame.result()
+            error = None
+        except Exception as e:
+            reply, error = None, e
+
+        with self._condition:
+            for pin, value in values.items():
+                if reply == "OK":
+                    self._applied[pin] = value
+                else:
+                    # Unknown state now; the next burst must reach the board
+                    self._applied.pop(pin, None)
+
+        if reply == "OK" and self.on_applied:
+            for pin in notify:
+                try:
+                    self.on_applied(pin, values[pin])
+                except Exception as e:
+                    print(f"{Fore.RED}[PinCommandCoalescer] on_applied failed for pin {pin}: {e}{Style.RESET_ALL}")
+
+        for future in futures:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(reply)
+
+        with self._condition:
+            for pin in values:
+                self._in_flight.pop(pin, None)
+            # A command queued while this frame was out may be due already
+            self._condition.notify()
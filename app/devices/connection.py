@@ -0,0 +1,372 @@
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Tuple, Callable
+import random
+import threading
+import time
+import serial
+from colorama import Fore, Style, init
+from .protocol import PROTOCOL_VERSION, TELEMETRY_PREFIX
+from .serial_worker import SerialCommandWorker
+
+init(autoreset=True)
+
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+CLOSED = "closed"
+
+OUTAGE_QUEUE = "queue"
+OUTAGE_FAIL_FAST = "fail_fast"
+
+PROTOCOL_TEXT = "text"
+PROTOCOL_AUTO = "auto"
+PROTOCOL_BINARY = "binary"
+
+
+def chain_future(source: Future, target: Future, transform: Optional[Callable[[Any], Any]] = None):
+    """Resolve `target` with the outcome of `source`, optionally transforming the result."""
+    def _done(f: Future):
+        if target.done():
+            return
+        try:
+            result = f.result()
+            target.set_result(transform(result) if transform else result)
+        except Exception as e:
+            target.set_exception(e)
+    source.add_done_callback(_done)
+
+
+class SerialConnectionManager:
+    """
+    Owns the lifecycle of one Arduino serial link.
+
+    Role:
+    - Open the port and wait for the "Arduino Ready" banner on a background thread
+    - Negotiate the binary framing after the banner ("auto"), falling back to
+      text lines when the firmware does not know it
+    - Reconnect with exponential backoff (plus jitter) after any serial failure
+    - Send periodic PING heartbeats and reconnect when they stop being answered
+    - During an outage, either hold commands until the link is back ("queue")
+      or fail them immediately ("fail_fast")
+    - Report connection state and counters for the health endpoint
+    """
+
+    def __init__(self, port: str, baudrate: int = 9600, ready_timeout: float = 10.0,
+                 reconnect_base_delay: float = 0.5, reconnect_max_delay: float = 30.0,
+                 heartbeat_interval: float = 5.0, heartbeat_misses: int = 2,
+                 outage_policy: str = OUTAGE_QUEUE, outage_queue_size: int = 100,
+                 outage_queue_timeout: float = 10.0, max_in_flight: int = 4, ack_timeout: float = 1.0,
+                 port_factory: Optional[Callable[[], Any]] = None,
+                 protocol: str = PROTOCOL_AUTO, frame_retries: int = 2):
+        self.port = port
+        self.baudrate = baudrate
+        self.ready_timeout = ready_timeout
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_misses = max(1, heartbeat_misses)
+        self.outage_policy = outage_policy
+        self.outage_queue_size = outage_queue_size
+        self.outage_queue_timeout = outage_queue_timeout
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self.protocol = protocol
+        self.frame_retries = frame_retries
+        self.framed = False
+        self.port_factory = port_factory or (lambda: serial.Serial(self.port, self.baudrate, timeout=1.0))
+        self.on_connected: List[Callable[["SerialConnectionManager"], None]] = []
+        # Unsolicited sensor readings from the firmware, {sensor: value}
+        self.on_telemetry: Optional[Callable[[Dict[str, float]], None]] = None
+
+        self.state = DISCONNECTED
+        self.serial = None
+        self.worker: Optional[SerialCommandWorker] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: List[Tuple[str, Future, float]] = []
+
+        self.reconnect_count = 0
+        self.failed_attempts = 0
+        self.heartbeat_failures = 0
+        self.last_error: Optional[str] = None
+        self.connected_since: Optional[float] = None
+        self.last_heartbeat: Optional[float] = None
+
+    def start(self, initial_port=None):
+        """
+        Start the supervisor thread. An already-open port can be handed over so the
+        caller can check the port exists before committing to hardware mode.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self.serial = initial_port
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._supervise, name="SerialConnectionManager", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self.state == CLOSED:
+            return
+        self._closing.set()
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.ready_timeout + 2)
+        self._teardown()
+        self._set_state(CLOSED)
+        self._fail_pending(ConnectionError("Serial connection closed"))
+
+    def reconnect(self):
+        """Drop the current link and let the supervisor reconnect straight away."""
+        self.last_error = "Manual reconnect requested"
+        self._teardown()
+        self._set_state(DISCONNECTED)
+        self._wake.set()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.state == CONNECTED and self.worker is not None and self.worker.is_running
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        worker = self.worker
+        return {
+            "state": self.state,
+            "port": self.port,
+            "reconnect_count": self.reconnect_count,
+            "failed_attempts": self.failed_attempts,
+            "heartbeat_failures": self.heartbeat_failures,
+            "last_error": self.last_error,
+            "connected_since": self.connected_since,
+            "last_heartbeat": self.last_heartbeat,
+            "queued_commands": pending,
+            "outage_policy": self.outage_policy,
+            "protocol": f"binary v{PROTOCOL_VERSION}" if self.framed else "text",
+            "retransmits": worker.retransmits if worker else 0,
+            "crc_errors": worker.crc_errors if worker else 0,
+            "telemetry_lines": worker.telemetry_lines if worker else 0,
+        }
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"{Fore.CYAN}[SerialConnectionManager] {self.port}: {self.state} -> {state}{Style.RESET_ALL}")
+        self.state = state
+
+    def submit(self, line: str) -> Future:
+        """Send a protocol line; the Future resolves with the firmware's reply."""
+        if self._closing.is_set():
+            future: Future = Future()
+            future.set_exception(ConnectionError("Serial connection closed"))
+            return future
+
+        worker = self.worker
+        if self.state == CONNECTED and worker is not None and worker.is_running:
+            return worker.submit(line)
+        return self._hold(line)
+
+    def submit_pin(self, pin: int, value: int) -> Future:
+        return self.submit(f"{pin}:{value}")
+
+    def submit_pins(self, pin_values: Dict[int, int]) -> Future:
+        return self.submit(",".join(f"{pin}:{value}" for pin, value in pin_values.items()))
+
+    def _hold(self, line: str, future: Optional[Future] = None) -> Future:
+        future = future or Future()
+        if self.outage_policy == OUTAGE_FAIL_FAST:
+            future.set_exception(ConnectionError(f"Arduino on {self.port} is {self.state}"))
+            return future
+        with self._lock:
+            if len(self._pending) >= self.outage_queue_size:
+                future.set_exception(ConnectionError("Outage queue is full"))
+                return future
+            self._pending.append((line, future, time.monotonic() + self.outage_queue_timeout))
+        return future
+
+    def _flush_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        now = time.monotonic()
+        for line, future, deadline in pending:
+            if future.done():
+                continue
+            if deadline < now:
+                future.set_exception(TimeoutError("Arduino did not reconnect in time"))
+                continue
+            chain_future(self.worker.submit(line), future)
+        if pending:
+            print(f"{Fore.GREEN}[SerialConnectionManager] Sent {len(pending)} commands held during outage{Style.RESET_ALL}")
+
+    def _expire_pending(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [item for item in self._pending if item[2] < now]
+            self._pending = [item for item in self._pending if item[2] >= now]
+        for _, future, _ in expired:
+            if not future.done():
+                future.set_exception(TimeoutError("Arduino did not reconnect in time"))
+
+    def _fail_pending(self, error: Exception):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _supervise(self):
+        while not self._closing.is_set():
+            if self.state != CONNECTED:
+                if self._connect():
+                    continue
+                self._backoff()
+            else:
+                self._wake.wait(self.heartbeat_interval)
+                if self._wake.is_set():
+                    self._wake.clear()
+                    continue
+                self._heartbeat()
+
+    def _connect(self) -> bool:
+        if self.worker is not None:
+            # Left over from a link that failed underneath the worker
+            self._teardown()
+        self._set_state(CONNECTING)
+        try:
+            if self.serial is None or not self.serial.is_open:
+                self.serial = self.port_factory()
+            self._wait_for_ready()
+            if self._closing.is_set():
+                return False
+            self.framed = self._negotiate_protocol()
+
+            worker = SerialCommandWorker(self.serial, max_in_flight=self.max_in_flight, ack_timeout=self.ack_timeout,
+                                         framed=self.framed, retries=self.frame_retries)
+            worker.on_fatal_error = self._on_worker_failed
+            worker.on_telemetry = self._on_telemetry
+            worker.start()
+            self.worker = worker
+
+            if self.connected_since is not None:
+                self.reconnect_count += 1
+            self.failed_attempts = 0
+            self.heartbeat_failures = 0
+            self.connected_since = time.time()
+            self._wake.clear()
+            self._set_state(CONNECTED)
+            print(f"{Fore.CYAN}[SerialConnectionManager] Connected to {self.port} at {self.baudrate} "
+                  f"({'binary frames' if self.framed else 'text'}){Style.RESET_ALL}")
+
+            for callback in list(self.on_connected):
+                try:
+                    callback(self)
+                except Exception as e:
+                    print(f"{Fore.RED}[SerialConnectionManager] on_connected callback failed: {e}{Style.RESET_ALL}")
+            self._flush_pending()
+            return True
+        except Exception as e:
+            self.failed_attempts += 1
+            self.last_error = str(e)
+            print(f"{Fore.RED}[SerialConnectionManager] Connect to {self.port} failed: {e}{Style.RESET_ALL}")
+            self._teardown()
+            self._set_state(DISCONNECTED)
+            return False
+
+    def _wait_for_ready(self):
+        # Opening the port resets most boards; wait for the firmware banner without
+        # holding up the application
+        self.serial.timeout = 0.25
+        start_time = time.time()
+        print(f"{Fore.CYAN}[SerialConnectionManager] Waiting for Arduino Ready...{Style.RESET_ALL}")
+        while time.time() - start_time < self.ready_timeout and not self._closing.is_set():
+            line = self.serial.readline().decode('utf-8', errors='ignore').strip()
+            if line.startswith(TELEMETRY_PREFIX):
+                # Firmware already running (the board did not reset on open)
+                return
+            if line:
+                print(f"{Fore.MAGENTA}[SerialConnectionManager] Arduino boot: '{line}'{Style.RESET_ALL}")
+            if "Arduino Ready" in line:
+                return
+        print(f"{Fore.YELLOW}[SerialConnectionManager] Did not receive 'Arduino Ready', continuing anyway...{Style.RESET_ALL}")
+
+    def _negotiate_protocol(self) -> bool:
+        """Ask the firmware for binary framing; returns True if both sides agreed on it."""
+        if self.protocol == PROTOCOL_TEXT:
+            return False
+        self.serial.write(f"PROTO {PROTOCOL_VERSION}\n".encode('utf-8'))
+        self.serial.flush()
+        deadline = time.time() + max(self.ack_timeout * 2, 0.5)
+        while time.time() < deadline and not self._closing.is_set():
+            line = self.serial.readline().decode('utf-8', errors='ignore').strip()
+            if line == f"PROTO {PROTOCOL_VERSION}":
+                return True
+            if line and "Arduino Ready" not in line and not line.startswith(TELEMETRY_PREFIX):
+                # Older firmware rejects the line as an invalid pin command
+                break
+        if self.protocol == PROTOCOL_BINARY:
+            raise ConnectionError("Firmware does not support binary framing")
+        print(f"{Fore.YELLOW}[SerialConnectionManager] Firmware has no binary framing, using text protocol{Style.RESET_ALL}")
+        return False
+
+    def _on_telemetry(self, readings: Dict[str, float]):
+        if self.on_telemetry:
+            self.on_telemetry(readings)
+
+    def _backoff(self):
+        delay = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** max(0, self.failed_attempts - 1)))
+        delay *= random.uniform(0.8, 1.2)
+        print(f"{Fore.YELLOW}[SerialConnectionManager] Reconnecting to {self.port} in {delay:.1f}s{Style.RESET_ALL}")
+        deadline = time.monotonic() + delay
+        while not self._closing.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._expire_pending()
+            if self._wake.wait(min(remaining, 0.25)):
+                # Manual reconnect: skip the rest of the backoff
+                self._wake.clear()
+                break
+
+    def _heartbeat(self):
+        worker = self.worker
+        if worker is None:
+            return
+        try:
+            # Any reply proves the firmware is alive; newer firmware answers "PONG"
+            worker.submit("PING").result(timeout=self.ack_timeout * 2)
+            self.heartbeat_failures = 0
+            self.last_heartbeat = time.time()
+        except Exception as e:
+            self.heartbeat_failures += 1
+            print(f"{Fore.YELLOW}[SerialConnectionManager] Heartbeat missed ({self.heartbeat_failures}/{self.heartbeat_misses}): {e}{Style.RESET_ALL}")
+            if self.heartbeat_failures >= self.heartbeat_misses:
+                self.last_error = "Heartbeat timeout"
+                self._teardown()
+                self._set_state(DISCONNECTED)
+
+    def _on_worker_failed(self, error: Exception):
+        # Runs on the worker thread; re-route its unsent commands, then wake the supervisor
+        self.last_error = str(error)
+        worker = self.worker
+        self._set_state(DISCONNECTED)
+        if worker is not None:
+            for line, future in worker.take_unsent():
+                if line == "PING":
+                    # Heartbeats belong to the dead link; the supervisor is waiting on this one
+                    future.set_exception(error)
+                else:
+                    self._hold(line, future)
+        self._wake.set()
+
+    def _teardown(self):
+        worker, self.worker = self.worker, None
+        if worker is not None:
+            worker.on_fatal_error = None
+            worker.stop()
+        port, self.serial = self.serial, None
+        if port is not None:
+            try:
+                if port.is_open:
+                    port.close()
+            except Exception as e:
+                print(f"{Fore.RED}[SerialConnectionManager] Error closing serial: {e}{Style.RESET_ALL}")
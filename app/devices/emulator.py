@@ -0,0 +1,163 @@
+"""
+Pseudo-terminal Arduino firmware emulator.
+
+Opens a Linux pty pair and speaks the arduino_controller.ino protocol on the
+master side, so the slave path (e.g. /dev/pts/5) can be used as ARDUINO_PORT
+and exercise the real pyserial code in ArduinoController.
+
+Usage:
+    python -m app.devices.emulator [--profile realistic] [--seed 1] [--telemetry 2]
+"""
+
+from typing import Callable, Dict, Optional
+import argparse
+import os
+import random
+import select
+import threading
+import time
+import tty
+from colorama import Fore, Style, init
+from .simulation import FAULT_PROFILES, FirmwareSession, LinkFaultModel
+
+init(autoreset=True)
+
+
+class PtyArduinoEmulator:
+    """
+    Firmware stand-in on the master end of a pty pair.
+
+    Role:
+    - Print the "Arduino Ready" banner when started
+    - Answer "PIN:VALUE" / multi-pin lines with "OK" and "PING" with "PONG"
+    - Negotiate and speak the binary framing from protocol.py ("PROTO 1")
+    - Optionally pace replies and inject faults with a LinkFaultModel
+    - Optionally push sensor readings every `telemetry_interval` seconds
+      (`sensors()` supplies them; default: a drifting temperature and humidity)
+    """
+
+    def __init__(self, model: Optional[LinkFaultModel] = None, boot_delay: float = 0.0,
+                 telemetry_interval: float = 0.0, sensors: Optional[Callable[[], Dict[str, float]]] = None):
+        self.model = model or LinkFaultModel()
+        self.boot_delay = boot_delay
+        self.telemetry_interval = telemetry_interval
+        self.sensors = sensors or self._drifting_sensors
+        self._climate = {"temperature": 22.0, "humidity": 45.0}
+        self.session = FirmwareSession()
+        self.pins: Dict[int, int] = self.session.pins
+        self.commands_handled = 0
+        self._master_fd: Optional[int] = None
+        self._slave_fd: Optional[int] = None
+        self.port: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> str:
+        """Open the pty pair, start answering and return the slave device path."""
+        self._master_fd, self._slave_fd = os.openpty()
+        # Raw mode: no echo and no newline translation, like a USB CDC serial device
+        tty.setraw(self._slave_fd)
+        tty.setraw(self._master_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PtyArduinoEmulator", daemon=True)
+        self._thread.start()
+        print(f"{Fore.CYAN}[PtyArduinoEmulator] Listening on {self.port}{Style.RESET_ALL}")
+        return self.port
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master_fd = self._slave_fd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _send(self, data: bytes):
+        delay = self.model.transfer_time(len(data))
+        if delay:
+            time.sleep(delay)
+        os.write(self._master_fd, data)
+
+    def _run(self):
+        if self.boot_delay:
+            time.sleep(self.boot_delay)
+        self._send(b"Arduino Ready\r\n")
+        next_report = time.monotonic() + self.telemetry_interval
+
+        while not self._stop.is_set():
+            timeout = 0.1
+            if self.telemetry_interval > 0:
+                now = time.monotonic()
+                if now >= next_report:
+                    self._send(self.session.telemetry(self.sensors()))
+                    next_report = now + self.telemetry_interval
+                timeout = min(timeout, max(0.0, next_report - now))
+            readable, _, _ = select.select([self._master_fd], [], [], timeout)
+            if not readable:
+                continue
+            try:
+                chunk = os.read(self._master_fd, 1024)
+            except OSError:
+                # Slave side closed (host closed the port); wait for it to reopen
+                time.sleep(0.05)
+                continue
+            if not chunk:
+                continue
+            for length, reply in self.session.feed(chunk):
+                self._reply(length, reply)
+
+    def _reply(self, length: int, reply: bytes):
+        # Bytes already arrived through the pty; account for the modelled wire time
+        delay = self.model.transfer_time(length) + self.model.processing_time
+        if delay:
+            time.sleep(delay)
+        outcome = self.model.next_outcome() if self.model.enabled else "ok"
+        self.commands_handled += 1
+        if outcome in ("drop", "disconnect"):
+            return
+        self._send(self.model.garble(reply) if outcome == "garble" else reply)
+
+
+    def _drifting_sensors(self) -> Dict[str, float]:
+        for name in self._climate:
+            self._climate[name] = round(self._climate[name] + random.uniform(-0.2, 0.2), 2)
+        return dict(self._climate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emulate the Arduino controller firmware on a pty")
+    parser.add_argument("--profile", default="ideal", choices=sorted(FAULT_PROFILES),
+                        help="Link timing/fault profile (see app/devices/simulation.py)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for fault injection")
+    parser.add_argument("--telemetry", type=float, default=0.0,
+                        help="Push simulated sensor readings every N seconds (0 = off)")
+    args = parser.parse_args()
+
+    emulator = PtyArduinoEmulator(LinkFaultModel(seed=args.seed, **FAULT_PROFILES[args.profile]),
+                                  telemetry_interval=args.telemetry)
+    port = emulator.start()
+    print(f"Set ARDUINO_PORT={port} and USE_ARDUINO_SIMULATOR=false, then start the API. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
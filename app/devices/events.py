@@ -0,0 +1,102 @@
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Deque
+import threading
+import time
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+DeviceEvent = Dict[str, Any]
+
+
+class DeviceEventBus:
+    """
+    In-process publish/subscribe bus for device state changes.
+
+    Role:
+    - Stamp each change with a monotonically increasing version
+    - Fan changes out to subscribers (WebSocket clients, history, rules, ...)
+    - Keep a bounded backlog so clients can ask for "everything since version N"
+
+    Subscribers see every event in version order. They are called
+    synchronously on a publishing thread (the one already delivering, when
+    several publish at once) and must not block.
+    """
+
+    def __init__(self, backlog: int = 1024):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._backlog: Deque[DeviceEvent] = deque(maxlen=backlog)
+        self._subscribers: List[Callable[[DeviceEvent], None]] = []
+        self._undelivered: Deque[DeviceEvent] = deque()
+        self._delivering = False
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def publish(self, device_id: str, changes: Dict[str, Any], source: str = "") -> DeviceEvent:
+        with self._lock:
+            self._version += 1
+            event = {
+                "version": self._version,
+                "device_id": device_id,
+                "changes": dict(changes),
+                "source": source,
+                "timestamp": time.time(),
+            }
+            self._backlog.append(event)
+            self._undelivered.append(event)
+            if self._delivering:
+                # The delivering thread picks it up after the events before it
+                return event
+            self._delivering = True
+
+        self._deliver()
+        return event
+
+    def _deliver(self):
+        while True:
+            with self._lock:
+                if not self._undelivered:
+                    self._delivering = False
+                    return
+                event = self._undelivered.popleft()
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"{Fore.RED}[DeviceEventBus] Subscriber error: {e}{Style.RESET_ALL}")
+
+    def subscribe(self, callback: Callable[[DeviceEvent], None]) -> Callable[[], None]:
+        """Register a callback; returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def since(self, version: int) -> Optional[List[DeviceEvent]]:
+        """
+        Events newer than `version`, oldest first.
+        Returns None when the backlog no longer reaches back that far (or the
+        version is from before a restart) and the caller has to resynchronize
+        from a full device list.
+        """
+        with self._lock:
+            if version == self._version:
+                return []
+            if version > self._version:
+                return None
+            if not self._backlog or self._backlog[0]["version"] > version + 1:
+                return None
+            return [event for event in self._backlog if event["version"] > version]
+
+
+# Shared bus for the running process; the API and device controllers publish/subscribe here
+device_events = DeviceEventBus()
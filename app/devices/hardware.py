@@ -1,6 +1,13 @@
 from .base import DeviceControlInterface
-from typing import Dict, Any, Optional, List
-import json
+from .connection import SerialConnectionManager
+from .pool import BoardLink, ControllerPool, parse_controllers
+from .registry import DeviceRegistry, DEFAULT_CONTROLLER, controller_of
+from .persistence import DeviceStateStore
+from .events import DeviceEventBus, device_events
+from .simulation import LinkFaultModel, SimulatedSerialPort
+from .telemetry import SensorStore
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Tuple
 import os
 import serial
 import signal
@@ -42,101 +49,233 @@ signal.signal(signal.SIGTERM, _signal_handler)
 atexit.register(_global_cleanup)
 
 class DeviceConfigBase:
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, events: Optional[DeviceEventBus] = None):
         if not config_path:
             config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'devices.json')
         self.config_path = config_path
-        self.devices = self._load_devices(self.config_path)
-
-    def _load_devices(self, config_path: str) -> List[Dict[str, Any]]:
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"{Fore.RED}[DeviceConfigBase] Error loading config: {e}{Style.RESET_ALL}")
-            return []
+        self.store = DeviceStateStore(
+            config_path,
+            debounce=float(getattr(Settings, "DEVICE_SNAPSHOT_DEBOUNCE", "2.0")),
+            max_delay=float(getattr(Settings, "DEVICE_SNAPSHOT_MAX_DELAY", "10.0")),
+            fsync_journal=getattr(Settings, "DEVICE_JOURNAL_FSYNC", "false").lower() == "true",
+        )
+        self.devices = self.store.load()
+        self.registry = DeviceRegistry(self.devices)
+        self.events = events or device_events
 
     def _save_devices(self) -> bool:
-        try:
-            with open(self.config_path, 'w') as f:
-                json.dump(self.devices, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}[DeviceConfigBase] Error saving config: {e}{Style.RESET_ALL}")
-            return False
+        """Force an immediate atomic snapshot of the full config."""
+        return self.store.snapshot()
 
     def _find_device(self, device_id: str) -> Optional[Dict[str, Any]]:
-        for d in self.devices:
-            if d["id"] == device_id:
-                return d
-        return None
+        return self.registry.get(device_id)
 
     def _action_to_pin_value(self, action: str) -> Optional[int]:
         return 1 if action == "on" else 0 if action == "off" else None
 
     def _update_device_status(self, device: Dict[str, Any], action: str):
-        device["status"] = action
-        self._save_devices()
+        # Journaled now, written to devices.json by the store's debounced snapshot
+        previous = device.get("status")
+        self.registry.set_status(device, action)
+        self.store.record(device["id"], action)
+        if previous != action:
+            self.events.publish(device["id"], {"status": action}, source=type(self).__name__)
+
+    def _update_devices_status(self, updates: List[Tuple[Dict[str, Any], str]]):
+        for device, action in updates:
+            self._update_device_status(device, action)
+
+    def _resolve_command(self, command: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[int], str]:
+        """Validate a single command. Returns (device, pin_value, error); error is empty on success."""
+        device_id = command.get("device_id")
+        action = command.get("action", "").lower()
+
+        if not device_id:
+            return None, None, "Error: device_id required"
+
+        if action not in ["on", "off"]:
+            return None, None, "Error: action must be 'on' or 'off'"
+
+        device = self._find_device(device_id)
+        if not device:
+            return None, None, f"Error: Device '{device_id}' not found"
+
+        if device.get("pin") is None:
+            return None, None, f"Error: No pin for '{device_id}'"
+
+        return device, self._action_to_pin_value(action), ""
+
+    def _apply_commands(self, commands: List[Dict[str, Any]]) -> str:
+        """
+        Resolve a batch of commands and send every valid one in a single multi-pin frame per board.
+        Subclasses provide _set_pins_state(pin_values, controller) -> bool.
+        """
+        results: List[str] = []
+        resolved = []
+        for command in commands:
+            device, pin_value, error = self._resolve_command(command)
+            if error:
+                results.append(error)
+            else:
+                # Placeholder filled in once the frame is acknowledged, keeping input order
+                resolved.append((len(results), device, pin_value, command.get("action", "").lower()))
+                results.append("")
+
+        if resolved:
+            # One frame per board; later commands for the same pin win, matching
+            # sequential control_device calls
+            groups: Dict[str, Dict[int, int]] = {}
+            for _, device, pin_value, _ in resolved:
+                groups.setdefault(controller_of(device), {})[device["pin"]] = pin_value
+            outcomes = self._set_pins_state_by_controller(groups)
+            self._update_devices_status([(device, action) for _, device, _, action in resolved
+                                         if outcomes[controller_of(device)]])
+            for index, device, _, action in resolved:
+                if outcomes[controller_of(device)]:
+                    results[index] = f"{device['name']} turned {action}"
+                else:
+                    results[index] = f"Error controlling {device['name']}"
+
+        return "; ".join(results)
+
+    def _set_pins_state_by_controller(self, groups: Dict[str, Dict[int, int]]) -> Dict[str, bool]:
+        """Apply {controller: {pin: value}}; returns whether each controller acknowledged."""
+        return {controller: self._set_pins_state(pin_values, controller) for controller, pin_values in groups.items()}
 
 class ArduinoSimulator(DeviceControlInterface, DeviceConfigBase):
-    def __init__(self, config_path: Optional[str] = None):
-        DeviceConfigBase.__init__(self, config_path)
-        self.pins = {}
+    def __init__(self, config_path: Optional[str] = None, shared: Optional[DeviceConfigBase] = None):
+        if shared is not None:
+            # Stand-in for a controller: one store, registry and journal for the same devices.json
+            self.config_path = shared.config_path
+            self.store = shared.store
+            self.devices = shared.devices
+            self.registry = shared.registry
+            self.events = shared.events
+        else:
+            DeviceConfigBase.__init__(self, config_path)
+        # Simulated pin levels per board ("controller" field of each device)
+        self.boards: Dict[str, Dict[int, int]] = {}
+        self.pins = self.boards.setdefault(DEFAULT_CONTROLLER, {})
+        # Optional serial timing/fault model (ARDUINO_SIM_PROFILE); "ideal" keeps instant success
+        self.link = LinkFaultModel.from_settings()
+        self._link_lock = threading.Lock()
+        # Simulated pins start where the recovered statuses say they are
+        for device in self.devices:
+            if device.get("pin") is not None:
+                self.boards.setdefault(controller_of(device), {})[device["pin"]] = \
+                    self._action_to_pin_value(device.get("status", "off")) or 0
         print(f"{Fore.CYAN}[ArduinoSimulator] Init{Style.RESET_ALL}")
 
-    def _set_pin_state(self, pin: int, value: int) -> bool:
+    def _simulate_link(self, frame: str) -> Optional[bool]:
+        """
+        Spend the time the frame would take on the modelled link and draw its fault.
+        Returns None if the command never reached the board, otherwise whether its
+        acknowledgement made it back intact.
+        """
+        if not self.link.enabled:
+            return True
+
+        # One command on the wire at a time, like the real port
+        with self._link_lock:
+            if self.link.is_disconnected():
+                print(f"{Fore.RED}[ArduinoSimulator] Link down, dropping '{frame}'{Style.RESET_ALL}")
+                return None
+            outcome = self.link.next_outcome()
+            time.sleep(self.link.transfer_time(len(frame) + 1) + self.link.processing_time
+                       + self.link.transfer_time(len("OK\r\n")))
+
+        if outcome == "disconnect":
+            print(f"{Fore.RED}[ArduinoSimulator] Simulated disconnect{Style.RESET_ALL}")
+            return None
+        if outcome == "drop":
+            # The board applied it, but the host gives up waiting for the ack
+            time.sleep(float(getattr(Settings, "ARDUINO_ACK_TIMEOUT", "1.0")))
+            print(f"{Fore.YELLOW}[ArduinoSimulator] Simulated dropped ack for '{frame}'{Style.RESET_ALL}")
+            return False
+        if outcome == "garble":
+            print(f"{Fore.YELLOW}[ArduinoSimulator] Simulated garbled ack for '{frame}'{Style.RESET_ALL}")
+            return False
+        return True
+
+    def _set_pin_state(self, pin: int, value: int, controller: str = DEFAULT_CONTROLLER) -> bool:
         if not isinstance(pin, int) or pin < 0 or value not in [0, 1]:
             print(f"{Fore.RED}[ArduinoSimulator] Invalid pin or value{Style.RESET_ALL}")
             return False
 
-        self.pins[pin] = value
-        print(f"{Fore.GREEN}[ArduinoSimulator] Pin {pin}={value}{Style.RESET_ALL}")
-        return True
+        acked = self._simulate_link(f"{pin}:{value}")
+        if acked is None:
+            return False
 
-    def get_pin(self, pin: int) -> int:
-        return self.pins.get(pin, 0)
+        self.boards.setdefault(controller, {})[pin] = value
+        self._sync_pin_status(pin, value, controller)
+        print(f"{Fore.GREEN}[ArduinoSimulator] Pin {pin}={value} ({controller}){Style.RESET_ALL}")
+        return acked
 
-    def control_device(self, command: Dict[str, Any]) -> str:
-        device_id = command.get("device_id")
-        action = command.get("action", "").lower()
+    def _set_pins_state(self, pin_values: Dict[int, int], controller: str = DEFAULT_CONTROLLER) -> bool:
+        if any(not isinstance(pin, int) or pin < 0 or value not in [0, 1] for pin, value in pin_values.items()):
+            print(f"{Fore.RED}[ArduinoSimulator] Invalid pin or value in batch{Style.RESET_ALL}")
+            return False
 
-        if not device_id:
-            return "Error: device_id required"
+        acked = self._simulate_link(",".join(f"{pin}:{value}" for pin, value in pin_values.items()))
+        if acked is None:
+            return False
 
-        if action not in ["on", "off"]:
-            return "Error: action must be 'on' or 'off'"
+        self.boards.setdefault(controller, {}).update(pin_values)
+        for pin, value in pin_values.items():
+            self._sync_pin_status(pin, value, controller)
+        print(f"{Fore.GREEN}[ArduinoSimulator] Pins {pin_values} ({controller}){Style.RESET_ALL}")
+        return acked
 
-        device = self._find_device(device_id)
-        if not device:
-            return f"Error: Device '{device_id}' not found"
+    def _sync_pin_status(self, pin: int, value: int, controller: str = DEFAULT_CONTROLLER):
+        status = "on" if value == 1 else "off"
+        for device in self.registry.devices_on_pin(pin, controller):
+            if device.get("status") != status:
+                self._update_device_status(device, status)
 
-        pin = device.get("pin")
-        if pin is None:
-            return f"Error: No pin for '{device_id}'"
+    def get_pin(self, pin: int, controller: str = DEFAULT_CONTROLLER) -> int:
+        return self.boards.get(controller, {}).get(pin, 0)
 
-        pin_value = self._action_to_pin_value(action)
-        if pin_value is None:
-            return "Error: Invalid action"
+    def control_device(self, command: Dict[str, Any]) -> str:
+        device, pin_value, error = self._resolve_command(command)
+        if error:
+            return error
 
-        if self._set_pin_state(pin, pin_value):
+        action = command.get("action", "").lower()
+        if self._set_pin_state(device["pin"], pin_value, controller_of(device)):
             self._update_device_status(device, action)
             return f"{device['name']} turned {action}"
 
         return f"Error controlling {device['name']}"
 
+    def control_devices(self, commands: List[Dict[str, Any]]) -> str:
+        return self._apply_commands(commands)
+
     def get_device_states(self) -> Dict[str, Any]:
-        for device in self.devices:
-            pin = device.get("pin")
-            if pin is not None:
-                device["status"] = "on" if self.get_pin(pin) == 1 else "off"
-        return {device["id"]: device for device in self.devices}
+        # Statuses are kept in step with self.pins as pins change
+        return self.registry.by_id
+
+    def query_devices(self, location: Optional[str] = None, type: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.registry.query(location=location, type=type, status=status)
 
 class ArduinoController(DeviceControlInterface, DeviceConfigBase):
+    """
+    Device control over one or more Arduino boards.
+
+    Devices name their board in a "controller" field (default "default"), and
+    ARDUINO_CONTROLLERS maps board names to serial ports. Each board gets its
+    own managed connection, so commands for different boards go out in
+    parallel and one dead board does not block the others.
+    """
+
     def __init__(self, config_path: Optional[str] = None):
         DeviceConfigBase.__init__(self, config_path)
         use_sim = getattr(Settings, "USE_ARDUINO_SIMULATOR", "false").lower() == "true"
-        self.serial = None
         self.simulator = None
+        self.pool: Optional[ControllerPool] = None
+        self._sim_links: Dict[str, LinkFaultModel] = {}
+        # Sensor readings the boards push between command replies
+        self.sensors = SensorStore(int(getattr(Settings, "SENSOR_HISTORY_SIZE", "4096")))
         self._is_closing = False
         
         # Register this instance for cleanup
@@ -145,33 +284,96 @@ class ArduinoController(DeviceControlInterface, DeviceConfigBase):
         
         if use_sim:
             print(f"{Fore.YELLOW}[ArduinoController] Using simulator{Style.RESET_ALL}")
-            self.simulator = ArduinoSimulator(config_path)
-        else:
+            self.simulator = ArduinoSimulator(shared=self)
+            return
+
+        boards = parse_controllers(
+            getattr(Settings, "ARDUINO_CONTROLLERS", ""),
+            getattr(Settings, "ARDUINO_PORT", "COM3" if os.name == "nt" else "/dev/ttyACM0"),
+            int(getattr(Settings, "ARDUINO_BAUDRATE", "9600")),
+        )
+        for name in self.registry.controllers():
+            if name not in boards:
+                print(f"{Fore.YELLOW}[ArduinoController] Devices on controller '{name}' have no port in ARDUINO_CONTROLLERS{Style.RESET_ALL}")
+
+        # Opening is quick; a port that can't be opened now is retried in the background
+        initial_ports = {}
+        for name, (port, baud) in boards.items():
             try:
-                port = getattr(Settings, "ARDUINO_PORT", "COM3" if os.name == "nt" else "/dev/ttyACM0")
-                baud = int(getattr(Settings, "ARDUINO_BAUDRATE", "9600"))
-                self.serial = serial.Serial(port, baud, timeout=1.0)
-                
-                # Wait for Arduino to initialize and send "Arduino Ready"
-                start_time = time.time()
-                ready = False
-                print(f"{Fore.CYAN}[ArduinoController] Waiting for Arduino Ready...{Style.RESET_ALL}")
-                while time.time() - start_time < 10:  # wait up to 10 seconds
-                    line = self.serial.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        print(f"{Fore.MAGENTA}[ArduinoController] Arduino boot: '{line}'{Style.RESET_ALL}")
-                    if "Arduino Ready" in line:
-                        ready = True
-                        break
-                if not ready:
-                    print(f"{Fore.YELLOW}[ArduinoController] Did not receive 'Arduino Ready', continuing anyway...{Style.RESET_ALL}")
-                # Send test command
-                self.serial.write(f"10:1\n".encode('utf-8'))
-                print(f"{Fore.CYAN}[ArduinoController] Connected to {port} at {baud}{Style.RESET_ALL}")
+                initial_ports[name] = self._open_port(name, port, baud)
             except Exception as e:
-                print(f"{Fore.RED}[ArduinoController] Serial failed: {e}{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}[ArduinoController] Fallback to simulator{Style.RESET_ALL}")
-                self.simulator = ArduinoSimulator(config_path)
+                print(f"{Fore.RED}[ArduinoController] Serial failed for '{name}' ({port}): {e}{Style.RESET_ALL}")
+
+        if not initial_ports:
+            # No board at all: same fallback as before multi-board support
+            print(f"{Fore.YELLOW}[ArduinoController] Fallback to simulator{Style.RESET_ALL}")
+            self.simulator = ArduinoSimulator(shared=self)
+            return
+
+        # The ready handshakes, reconnects and heartbeats run in the background, per board
+        self.pool = ControllerPool({
+            name: BoardLink(
+                name, port, baud,
+                port_factory=lambda name=name, port=port, baud=baud: self._open_port(name, port, baud),
+                on_connected=self._on_connected,
+                on_pin_applied=self._on_pin_applied,
+                on_telemetry=self._on_telemetry,
+            )
+            for name, (port, baud) in boards.items()
+        })
+        for name, board in self.pool.boards.items():
+            board.start(initial_ports.get(name))
+
+    @property
+    def connection(self) -> Optional[SerialConnectionManager]:
+        """Connection of the default board (the only one in single-board setups)."""
+        board = self.pool.primary if self.pool else None
+        return board.connection if board else None
+
+    def _open_port(self, name: str, port: str, baud: int):
+        if port.startswith("sim://"):
+            # Firmware stand-in behind the ARDUINO_SIM_* link model, driven through the real serial stack
+            if name not in self._sim_links:
+                self._sim_links[name] = LinkFaultModel.from_settings()
+            return SimulatedSerialPort(self._sim_links[name])
+        return serial.Serial(port, baud, timeout=1.0)
+
+    def _on_connected(self, board: BoardLink):
+        if board.coalescer:
+            # The board may have reset; don't trust what the coalescer last saw applied
+            board.coalescer.forget()
+        # Send test command
+        board.submit_pins({10: 1})
+        # A board that reset has every output off; put back the states we know about
+        pin_values = {
+            device["pin"]: self._action_to_pin_value(device.get("status", "off")) or 0
+            for device in self.registry.devices_on_controller(board.name) if device.get("pin") is not None
+        }
+        if pin_values:
+            board.submit_pins(pin_values)
+
+    def _on_pin_applied(self, controller: str, pin: int, value: int):
+        # Runs once per acknowledged coalesced frame, in order, so statuses follow the board
+        status = "on" if value == 1 else "off"
+        for device in self.registry.devices_on_pin(pin, controller):
+            self._update_device_status(device, status)
+
+    def _on_telemetry(self, controller: str, readings: Dict[str, float]):
+        # Runs on the board's serial thread: a ring-buffer append, nothing more
+        self.sensors.record(readings, prefix="" if controller == DEFAULT_CONTROLLER else f"{controller}.")
+
+    def connection_status(self) -> Dict[str, Any]:
+        if self.simulator:
+            return {"state": "simulator"}
+        if not self.pool:
+            return {"state": "closed"}
+        return self.pool.status()
+
+    def reconnect(self, controller: Optional[str] = None) -> bool:
+        """Force the serial link(s) to reconnect without touching the rest of the app."""
+        if not self.pool or self._is_closing:
+            return False
+        return self.pool.reconnect(controller)
 
     def __enter__(self):
         """Context manager entry"""
@@ -187,16 +389,18 @@ class ArduinoController(DeviceControlInterface, DeviceConfigBase):
             return
             
         self._is_closing = True
+
+        self.store.close()
         
-        if self.serial and self.serial.is_open:
+        if self.pool:
             try:
                 print(f"{Fore.YELLOW}[ArduinoController] Closing serial connection...{Style.RESET_ALL}")
-                self.serial.close()
+                self.pool.close()
                 print(f"{Fore.GREEN}[ArduinoController] Serial connection closed{Style.RESET_ALL}")
             except Exception as e:
                 print(f"{Fore.RED}[ArduinoController] Error closing serial: {e}{Style.RESET_ALL}")
             finally:
-                self.serial = None
+                self.pool = None
 
     def __del__(self):
         """Destructor - ensure cleanup happens"""
@@ -206,70 +410,107 @@ class ArduinoController(DeviceControlInterface, DeviceConfigBase):
             pass  # Ignore errors in destructor
 
     def control_device(self, command: Dict[str, Any]) -> str:
-        device_id = command.get("device_id")
+        device, pin_value, error = self._resolve_command(command)
+        if error:
+            return error
+
         action = command.get("action", "").lower()
+        controller = controller_of(device)
+        if self._set_pin_state(device["pin"], pin_value, controller):
+            board = self.pool.get(controller) if self.pool else None
+            if not (board and board.coalescer):
+                # Coalesced commands update statuses from the acknowledged frame instead
+                self._update_device_status(device, action)
+            return f"{device['name']} turned {action}"
 
-        if not device_id:
-            return "Error: device_id required"
+        return f"Error controlling {device['name']}"
 
-        if action not in ["on", "off"]:
-            return "Error: action must be 'on' or 'off'"
+    def control_devices(self, commands: List[Dict[str, Any]]) -> str:
+        return self._apply_commands(commands)
 
-        device = self._find_device(device_id)
-        if not device:
-            return f"Error: Device '{device_id}' not found"
+    def _board(self, controller: str, what: str) -> Optional[BoardLink]:
+        board = self.pool.get(controller) if self.pool and not self._is_closing else None
+        if board is None:
+            print(f"{Fore.RED}[ArduinoController] No way to control {what} on controller '{controller}'{Style.RESET_ALL}")
+        return board
 
-        pin = device.get("pin")
-        if pin is None:
-            return f"Error: No pin for '{device_id}'" 
-               
-        pin_value = self._action_to_pin_value(action)
-        if pin_value is None:
-            return "Error: Invalid action"
+    def _ack_to_bool(self, ack: Future, what: str) -> Future:
+        result: Future = Future()
 
-        if self._set_pin_state(pin, pin_value):
-            self._update_device_status(device, action)
-            return f"{device['name']} turned {action}"
+        def _on_ack(done: Future):
+            try:
+                result.set_result(done.result() == "OK")
+            except Exception as e:
+                print(f"{Fore.RED}[ArduinoController] Command for {what} failed: {e}{Style.RESET_ALL}")
+                result.set_result(False)
 
-        return f"Error controlling {device['name']}"
+        ack.add_done_callback(_on_ack)
+        return result
 
-    def _set_pin_state(self, pin: int, value: int) -> bool:
+    def set_pin_state_async(self, pin: int, value: int, controller: str = DEFAULT_CONTROLLER) -> Future:
+        """
+        Queue a pin change on the board's serial I/O thread (held or failed during an outage, by policy).
+        Returns a Future resolved with True once the Arduino acknowledges with "OK".
+        """
+        if self.simulator:
+            result: Future = Future()
+            result.set_result(self.simulator._set_pin_state(pin, value, controller))
+            return result
+
+        board = self._board(controller, f"pin {pin}")
+        if board is None:
+            result = Future()
+            result.set_result(False)
+            return result
+        return self._ack_to_bool(board.submit_pin(pin, value), f"pin {pin}")
+
+    def set_pins_state_async(self, pin_values: Dict[int, int], controller: str = DEFAULT_CONTROLLER) -> Future:
+        """
+        Queue several pin changes on one board as one multi-pin frame (e.g. "8:0,9:0,12:0").
+        Returns a Future resolved with True once the combined acknowledgement is "OK".
+        """
         if self.simulator:
-            return self.simulator._set_pin_state(pin, value)
+            result: Future = Future()
+            result.set_result(self.simulator._set_pins_state(pin_values, controller))
+            return result
+
+        board = self._board(controller, f"pins {list(pin_values)}")
+        if board is None:
+            result = Future()
+            result.set_result(False)
+            return result
+        return self._ack_to_bool(board.submit_pins(pin_values), f"pins {list(pin_values)}")
+
+    def _wait_for_ack(self, future: Future, what: str, controller: str = DEFAULT_CONTROLLER) -> bool:
+        board = self.pool.get(controller) if self.pool else None
+        timeout = board.ack_wait() if board else float(getattr(Settings, "ARDUINO_ACK_TIMEOUT", "1.0")) * 4
+        try:
+            # Leave room for the commands queued ahead of this one
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"{Fore.RED}[ArduinoController] Timed out waiting for {what}: {e}{Style.RESET_ALL}")
+            return False
 
-        elif self.serial and not self._is_closing:
-            try:
-                # Check if serial connection is still open
-                if not self.serial.is_open:
-                    print(f"{Fore.RED}[ArduinoController] Serial connection is closed{Style.RESET_ALL}")
-                    return False
-                
-                command = f"{pin}:{value}\n".encode('utf-8')
-                self.serial.write(command)
-                self.serial.flush()
-                
-                # Wait for Arduino to process and send "OK"
-                response = self.serial.readline().decode('utf-8', errors='ignore').strip()
-                print(f"{Fore.MAGENTA}[ArduinoController] Arduino response: '{response}'{Style.RESET_ALL}")  # <-- Added print
-                return response == "OK"
-            
-            except serial.SerialException as e:
-                print(f"{Fore.RED}[ArduinoController] Serial communication error: {e}{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}[ArduinoController] Attempting to close connection...{Style.RESET_ALL}")
-                self._cleanup_serial()
-                return False
-            
-            except Exception as e:
-                print(f"{Fore.RED}[ArduinoController] Unexpected serial error: {e}{Style.RESET_ALL}")
-                self._cleanup_serial()
-                return False
+    def _set_pin_state(self, pin: int, value: int, controller: str = DEFAULT_CONTROLLER) -> bool:
+        return self._wait_for_ack(self.set_pin_state_async(pin, value, controller), f"pin {pin}", controller)
+
+    def _set_pins_state(self, pin_values: Dict[int, int], controller: str = DEFAULT_CONTROLLER) -> bool:
+        return self._wait_for_ack(self.set_pins_state_async(pin_values, controller), f"pins {list(pin_values)}", controller)
 
-        print(f"{Fore.RED}[ArduinoController] No way to control pin {pin}{Style.RESET_ALL}")
-        return False
+    def _set_pins_state_by_controller(self, groups: Dict[str, Dict[int, int]]) -> Dict[str, bool]:
+        # Send to every board first, then wait: boards work in parallel
+        futures = {controller: self.set_pins_state_async(pin_values, controller)
+                   for controller, pin_values in groups.items()}
+        return {controller: self._wait_for_ack(future, f"pins {list(groups[controller])} on '{controller}'", controller)
+                for controller, future in futures.items()}
 
     def get_device_states(self) -> Dict[str, Any]:
         if self.simulator:
             return self.simulator.get_device_states()
-        return {device["id"]: device for device in self.devices}
-
+        return self.registry.by_id
 
+    def query_devices(self, location: Optional[str] = None, type: Optional[str] = None,
+                      status: Optional[str] = None) -> List[Dict[str, Any]]:
+        if self.simulator:
+            return self.simulator.query_devices(location=location, type=type, status=status)
+        return self.registry.query(location=location, type=type, status=status)
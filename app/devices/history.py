@@ -0,0 +1,238 @@
+from typing import Dict, Any, Optional, List, Tuple, Callable
+import os
+import queue
+import sqlite3
+import threading
+import time
+from colorama import Fore, Style, init
+from .events import DeviceEventBus, DeviceEvent
+
+init(autoreset=True)
+
+HOUR = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    device_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS transitions_device_ts ON transitions (device_id, ts);
+CREATE TABLE IF NOT EXISTS hourly (
+    device_id TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    on_seconds REAL NOT NULL DEFAULT 0,
+    toggles INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (device_id, hour)
+) WITHOUT ROWID;
+"""
+
+
+def split_by_hour(start: float, end: float) -> List[Tuple[int, float]]:
+    """Split [start, end) into (hour start, seconds) pieces on hour boundaries."""
+    pieces = []
+    while start < end:
+        hour = int(start // HOUR) * HOUR
+        piece_end = min(end, hour + HOUR)
+        pieces.append((hour, piece_end - start))
+        start = piece_end
+    return pieces
+
+
+class DeviceHistoryStore:
+    """
+    Embedded time-series store for device state transitions (SQLite).
+
+    Role:
+    - Record every status change published on the device event bus
+    - Insert in batches from a background writer thread, off the control path
+    - Maintain hourly rollups (on-time seconds, toggle count) as transitions arrive
+    - Enforce retention: raw transitions for `retention_days`, rollups for
+      `rollup_retention_days`
+    - Answer downsampled history queries from the rollups
+
+    The interval a device has been "on" since its last transition is still open,
+    so it is not in the rollups yet; queries add it on the fly.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = 1.0, batch_size: int = 500,
+                 retention_days: float = 90, rollup_retention_days: float = 730):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self._queue: "queue.Queue[Optional[Tuple[str, float, str, str]]]" = queue.Queue()
+        self._db_lock = threading.Lock()
+        self._last: Dict[str, Tuple[str, float]] = {}
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._last_cleanup = 0.0
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        for device_id, status, ts in self._db.execute(
+                "SELECT device_id, status, MAX(ts) FROM transitions GROUP BY device_id"):
+            self._last[device_id] = (status, ts)
+
+    def start(self, events: Optional[DeviceEventBus] = None, devices: Optional[List[Dict[str, Any]]] = None):
+        """
+        Start the writer thread and follow `events`. Current device statuses are
+        recorded as a baseline when they differ from the last stored state.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="DeviceHistoryStore", daemon=True)
+        self._thread.start()
+        now = time.time()
+        for device in devices or []:
+            last = self._last.get(device["id"])
+            if device.get("status") and (last is None or last[0] != device["status"]):
+                self.record(device["id"], device["status"], now, "startup")
+        if events is not None:
+            self._unsubscribe = events.subscribe(self._on_event)
+
+    def close(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._thread = None
+        with self._db_lock:
+            self._db.close()
+
+    def _on_event(self, event: DeviceEvent):
+        status = event["changes"].get("status")
+        if status is not None:
+            self.record(event["device_id"], status, event["timestamp"], event.get("source", ""))
+
+    def record(self, device_id: str, status: str, ts: Optional[float] = None, source: str = ""):
+        """Queue a transition; cheap enough to call from the event publisher's thread."""
+        with self._flushed:
+            self._pending += 1
+        self._queue.put((device_id, ts if ts is not None else time.time(), status, source))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything recorded so far is written."""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_cleanup()
+                continue
+            batch = [item]
+            # Gather whatever else is waiting into the same transaction
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            rows = [row for row in batch if row is not None]
+            if rows:
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    print(f"{Fore.RED}[DeviceHistoryStore] Failed to write {len(rows)} transitions: {e}{Style.RESET_ALL}")
+                with self._flushed:
+                    self._pending -= len(rows)
+                    self._flushed.notify_all()
+            if stop:
+                return
+            self._maybe_cleanup()
+
+    def _write(self, rows: List[Tuple[str, float, str, str]]):
+        rollups: Dict[Tuple[str, int], List[float]] = {}
+        transitions = []
+        latest: Dict[str, Tuple[str, float]] = {}
+        for device_id, ts, status, source in sorted(rows, key=lambda row: row[1]):
+            last = latest.get(device_id) or self._last.get(device_id)
+            if last is not None and last[0] == status:
+                continue
+            if last is not None:
+                if last[0] == "on":
+                    for hour, seconds in split_by_hour(last[1], ts):
+                        rollups.setdefault((device_id, hour), [0.0, 0])[0] += seconds
+                rollups.setdefault((device_id, int(ts // HOUR) * HOUR), [0.0, 0])[1] += 1
+            latest[device_id] = (status, ts)
+            transitions.append((device_id, ts, status, source))
+
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT INTO transitions (device_id, ts, status, source) VALUES (?, ?, ?, ?)", transitions)
+            self._db.executemany(
+                "INSERT INTO hourly (device_id, hour, on_seconds, toggles) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (device_id, hour) DO UPDATE SET "
+                "on_seconds = on_seconds + excluded.on_seconds, toggles = toggles + excluded.toggles",
+                [(device_id, hour, totals[0], totals[1]) for (device_id, hour), totals in rollups.items()])
+            # Queries add the open interval from here, so move it only once the rollups are committed
+            self._last.update(latest)
+
+    def _maybe_cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < HOUR:
+            return
+        self._last_cleanup = now
+        try:
+            with self._db_lock, self._db:
+                raw = self._db.execute("DELETE FROM transitions WHERE ts < ?",
+                                       (now - self.retention_days * 86400,)).rowcount
+                hourly = self._db.execute("DELETE FROM hourly WHERE hour < ?",
+                                          (now - self.rollup_retention_days * 86400,)).rowcount
+            if raw or hourly:
+                print(f"{Fore.CYAN}[DeviceHistoryStore] Retention removed {raw} transitions and {hourly} hourly rollups{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}[DeviceHistoryStore] Retention cleanup failed: {e}{Style.RESET_ALL}")
+
+    def history(self, device_id: str, start: float, end: float, bucket: int = HOUR) -> List[Dict[str, Any]]:
+        """
+        On-time and toggle counts per `bucket` seconds (a whole number of hours,
+        aligned to UTC hour boundaries) for [start, end).
+        """
+        bucket = max(HOUR, int(bucket) // HOUR * HOUR)
+        first = int(start // bucket) * bucket
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT (hour / ?) * ? AS bucket, SUM(on_seconds), SUM(toggles) FROM hourly "
+                "WHERE device_id = ? AND hour >= ? AND hour < ? GROUP BY bucket ORDER BY bucket",
+                (bucket, bucket, device_id, first, end)).fetchall()
+        buckets = {row[0]: [row[1], row[2]] for row in rows}
+
+        # Still-open "on" interval since the last transition
+        last = self._last.get(device_id)
+        if last is not None and last[0] == "on":
+            for hour, seconds in split_by_hour(max(last[1], first), min(end, time.time())):
+                key = hour // bucket * bucket
+                buckets.setdefault(key, [0.0, 0])[0] += seconds
+
+        return [
+            {"start": key, "end": key + bucket, "on_seconds": round(totals[0], 3), "toggles": int(totals[1])}
+            for key, totals in sorted(buckets.items())
+        ]
+
+    def transitions(self, device_id: str, start: float, end: float, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Raw transitions (within the raw retention window), oldest first."""
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT ts, status, source FROM transitions WHERE device_id = ? AND ts >= ? AND ts < ? "
+                "ORDER BY ts LIMIT ?", (device_id, start, end, limit)).fetchall()
+        return [{"timestamp": ts, "status": status, "source": source} for ts, status, source in rows]
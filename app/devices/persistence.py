@@ -0,0 +1,185 @@
+from typing import Dict, Any, Optional, List
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+def atomic_write_text(path: str, text: str):
+    """Write to a temp file in the same directory, fsync it, then rename over the target."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class DeviceStateStore:
+    """
+    Write-behind persistence for the device list.
+
+    Role:
+    - Keep the in-memory device list authoritative
+    - Append every status change to a JSON-lines journal (no fsync on the hot path by default)
+    - Write debounced snapshots atomically (temp file + fsync + rename) from a background thread
+    - Replay the journal over the last snapshot on startup
+
+    Journal entries are plain "set status" records, so replaying entries that a
+    snapshot already contains is harmless.
+    """
+
+    def __init__(self, config_path: str, debounce: float = 2.0, max_delay: float = 10.0,
+                 fsync_journal: bool = False):
+        self.config_path = config_path
+        self.journal_path = f"{config_path}.journal"
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.fsync_journal = fsync_journal
+        self.devices: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._journal = None
+        self._first_dirty: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Load the snapshot, replay the journal on top of it and start the snapshot thread."""
+        try:
+            with open(self.config_path, 'r') as f:
+                self.devices = json.load(f)
+        except Exception as e:
+            print(f"{Fore.RED}[DeviceStateStore] Error loading config: {e}{Style.RESET_ALL}")
+            self.devices = []
+
+        replayed = self._replay_journal()
+        if replayed:
+            print(f"{Fore.YELLOW}[DeviceStateStore] Replayed {replayed} journal entries{Style.RESET_ALL}")
+            self.snapshot()
+
+        self._journal = open(self.journal_path, 'a')
+        self._thread = threading.Thread(target=self._run, name="DeviceStateStore", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self.devices
+
+    def _replay_journal(self) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+        by_id = {device["id"]: device for device in self.devices}
+        replayed = 0
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append; everything before it is intact
+                    print(f"{Fore.YELLOW}[DeviceStateStore] Skipping corrupt journal line{Style.RESET_ALL}")
+                    continue
+                device = by_id.get(entry.get("id"))
+                if device is not None:
+                    device["status"] = entry.get("status")
+                    replayed += 1
+        return replayed
+
+    def record(self, device_id: str, status: str):
+        """Journal a status change and schedule a debounced snapshot."""
+        with self._lock:
+            if self._closed or self._journal is None:
+                return
+            self._journal.write(json.dumps({"id": device_id, "status": status, "ts": time.time()}) + "\n")
+            self._journal.flush()
+            if self.fsync_journal:
+                os.fsync(self._journal.fileno())
+            now = time.monotonic()
+            self._last_change = now
+            if self._first_dirty is None:
+                self._first_dirty = now
+            self._wake.notify()
+
+    def snapshot(self) -> bool:
+        """Write the current device list atomically and compact the journal."""
+        with self._lock:
+            text = json.dumps(self.devices, indent=2)
+            offset = self._journal.tell() if self._journal else None
+            self._first_dirty = None
+            self._last_change = None
+
+        try:
+            atomic_write_text(self.config_path, text)
+        except Exception as e:
+            print(f"{Fore.RED}[DeviceStateStore] Error saving snapshot: {e}{Style.RESET_ALL}")
+            # The journal still holds every change; try again on the next debounce
+            with self._lock:
+                now = time.monotonic()
+                self._first_dirty = self._first_dirty or now
+                self._last_change = self._last_change or now
+            return False
+
+        if offset is not None:
+            self._compact_journal(offset)
+        return True
+
+    def _compact_journal(self, offset: int):
+        # Keep only entries written after the snapshot was taken
+        with self._lock:
+            if self._journal is None:
+                return
+            try:
+                self._journal.flush()
+                with open(self.journal_path, 'r') as f:
+                    f.seek(offset)
+                    tail = f.read()
+                self._journal.close()
+                atomic_write_text(self.journal_path, tail)
+            except Exception as e:
+                print(f"{Fore.RED}[DeviceStateStore] Error compacting journal: {e}{Style.RESET_ALL}")
+            finally:
+                self._journal = open(self.journal_path, 'a')
+
+    def _run(self):
+        with self._lock:
+            while not self._closed:
+                if self._first_dirty is None:
+                    self._wake.wait()
+                    continue
+                now = time.monotonic()
+                due = min(self._last_change + self.debounce, self._first_dirty + self.max_delay)
+                if now < due:
+                    self._wake.wait(due - now)
+                    continue
+                self._lock.release()
+                try:
+                    self.snapshot()
+                finally:
+                    self._lock.acquire()
+
+    def flush(self) -> bool:
+        """Snapshot immediately if there are unsaved changes."""
+        with self._lock:
+            dirty = self._first_dirty is not None
+        return self.snapshot() if dirty else True
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+            if self._journal:
+                self._journal.close()
+                self._journal = None
@@ -0,0 +1,161 @@
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from config.settings import Settings
+from colorama import Fore, Style, init
+from .coalescer import PinCommandCoalescer
+from .connection import SerialConnectionManager, CONNECTED
+from .registry import DEFAULT_CONTROLLER
+
+init(autoreset=True)
+
+
+def parse_controllers(spec: str, default_port: str, default_baud: int) -> Dict[str, Tuple[str, int]]:
+    """
+    Parse ARDUINO_CONTROLLERS, e.g. "kitchen=/dev/ttyACM0,garage=/dev/ttyUSB0@115200",
+    into {name: (port, baudrate)}. An empty spec means one "default" board on ARDUINO_PORT.
+    """
+    boards: Dict[str, Tuple[str, int]] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, target = item.partition("=")
+        if not separator:
+            name, target = DEFAULT_CONTROLLER, item
+        port, at, baud = target.strip().rpartition("@")
+        if not at:
+            port, baud = target.strip(), ""
+        boards[name.strip()] = (port, int(baud) if baud else default_baud)
+    if not boards:
+        boards[DEFAULT_CONTROLLER] = (default_port, default_baud)
+    return boards
+
+
+class BoardLink:
+    """
+    One Arduino board: its managed serial connection plus the per-pin command
+    coalescer in front of it. Everything runs on the board's own threads, so a
+    slow or dead board never holds up commands for another.
+    """
+
+    def __init__(self, name: str, port: str, baudrate: int, port_factory: Callable[[], Any],
+                 on_connected: Callable[["BoardLink"], None],
+                 on_pin_applied: Callable[[str, int, int], None],
+                 on_telemetry: Optional[Callable[[str, Dict[str, float]], None]] = None):
+        self.name = name
+        self.connection = SerialConnectionManager(
+            port,
+            baudrate,
+            ready_timeout=float(getattr(Settings, "ARDUINO_READY_TIMEOUT", "10")),
+            reconnect_base_delay=float(getattr(Settings, "ARDUINO_RECONNECT_BASE_DELAY", "0.5")),
+            reconnect_max_delay=float(getattr(Settings, "ARDUINO_RECONNECT_MAX_DELAY", "30")),
+            heartbeat_interval=float(getattr(Settings, "ARDUINO_HEARTBEAT_INTERVAL", "5")),
+            outage_policy=getattr(Settings, "ARDUINO_OUTAGE_POLICY", "queue"),
+            outage_queue_timeout=float(getattr(Settings, "ARDUINO_OUTAGE_QUEUE_TIMEOUT", "10")),
+            max_in_flight=int(getattr(Settings, "ARDUINO_MAX_IN_FLIGHT", "4")),
+            ack_timeout=float(getattr(Settings, "ARDUINO_ACK_TIMEOUT", "1.0")),
+            port_factory=port_factory,
+            protocol=getattr(Settings, "ARDUINO_PROTOCOL", "auto").strip().lower(),
+            frame_retries=int(getattr(Settings, "ARDUINO_FRAME_RETRIES", "2")),
+        )
+        self.connection.on_connected.append(lambda _connection: on_connected(self))
+        if on_telemetry:
+            self.connection.on_telemetry = lambda readings: on_telemetry(self.name, readings)
+        self.coalescer: Optional[PinCommandCoalescer] = None
+        coalesce_window = float(getattr(Settings, "ARDUINO_COALESCE_WINDOW", "0.02"))
+        if coalesce_window > 0:
+            # Rapid on/off/on bursts for one pin collapse into a single frame
+            self.coalescer = PinCommandCoalescer(
+                self.connection.submit_pin, coalesce_window,
+                on_applied=lambda pin, value: on_pin_applied(self.name, pin, value),
+                send_frame=self.connection.submit_pins,
+            )
+
+    def start(self, initial_port=None):
+        self.connection.start(initial_port)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connection.is_connected
+
+    def submit_pin(self, pin: int, value: int) -> Future:
+        if self.coalescer:
+            return self.coalescer.submit(pin, value)
+        return self.connection.submit_pin(pin, value)
+
+    def submit_pins(self, pin_values: Dict[int, int]) -> Future:
+        if self.coalescer:
+            # Through the coalescer, so it knows what the frame applied and keeps per-pin order
+            return self.coalescer.submit_frame(pin_values)
+        return self.connection.submit_pins(pin_values)
+
+    def ack_wait(self) -> float:
+        """How long a caller should wait for an acknowledgement from this board."""
+        timeout = self.connection.ack_timeout * 4
+        if self.connection.outage_policy == "queue" and not self.connection.is_connected:
+            # Held commands may wait for the link to come back
+            timeout += self.connection.outage_queue_timeout
+        return timeout
+
+    def status(self) -> Dict[str, Any]:
+        status = self.connection.status()
+        if self.coalescer:
+            status["coalescing"] = self.coalescer.stats()
+        return status
+
+    def close(self):
+        if self.coalescer:
+            self.coalescer.close()
+        self.connection.close()
+
+
+class ControllerPool:
+    """
+    The set of boards behind one ArduinoController.
+
+    Role:
+    - Route each device to the board named by its "controller" field
+    - Report per-board and aggregate link state
+    - Reconnect or close all boards together
+    """
+
+    def __init__(self, boards: Dict[str, BoardLink]):
+        self.boards = boards
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def get(self, name: str) -> Optional[BoardLink]:
+        return self.boards.get(name)
+
+    @property
+    def primary(self) -> Optional[BoardLink]:
+        return self.boards.get(DEFAULT_CONTROLLER) or next(iter(self.boards.values()), None)
+
+    def status(self) -> Dict[str, Any]:
+        if len(self.boards) == 1:
+            return self.primary.status()
+        boards = {name: board.status() for name, board in self.boards.items()}
+        connected = sum(1 for status in boards.values() if status["state"] == CONNECTED)
+        if connected == len(boards):
+            state = CONNECTED
+        elif connected:
+            state = "partial"
+        else:
+            state = "disconnected"
+        return {"state": state, "connected_boards": connected, "boards": boards}
+
+    def reconnect(self, name: Optional[str] = None) -> bool:
+        if name is not None and name not in self.boards:
+            return False
+        targets: List[BoardLink] = [self.boards[name]] if name else list(self.boards.values())
+        for board in targets:
+            board.connection.reconnect()
+        return True
+
+    def close(self):
+        for name, board in self.boards.items():
+            try:
+                board.close()
+            except Exception as e:
+                print(f"{Fore.RED}[ControllerPool] Error closing board '{name}': {e}{Style.RESET_ALL}")
@@ -0,0 +1,207 @@
+"""
+Binary framing for the Arduino serial link.
+
+Frame layout (version 1):
+
+    START | LEN | SEQ | OPCODE | PAYLOAD (LEN bytes) | CRC8
+
+START is 0xA5, LEN counts payload bytes only, and the CRC-8 (polynomial 0x07)
+covers LEN through the end of the payload. Every reply echoes the sequence
+number of the command it answers, so acknowledgements no longer rely on
+arrival order and a lost or corrupted frame can be retried on its own.
+
+The host opts in after the "Arduino Ready" banner by sending the text line
+"PROTO <version>". Firmware that understands frames answers "PROTO <version>";
+older firmware answers "ERROR:INVALID_COMMAND" and the link stays in text mode.
+Frames start with a non-ASCII byte, so a framed firmware keeps accepting text
+lines as well.
+
+The rest of the stack keeps speaking protocol lines ("8:1", "PING", "OK", ...);
+this module translates them to and from frames at the serial boundary.
+
+Sensor readings are pushed by the firmware unprompted: as text lines
+"T:<sensor>=<value>[,<sensor>=<value>...]", or in framed mode as TELEMETRY
+frames (sequence number 0, never used by commands) carrying the same text
+without the prefix.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+PROTOCOL_VERSION = 1
+START_BYTE = 0xA5
+MAX_PAYLOAD = 32
+
+# Host -> firmware
+OP_SET_PINS = 0x01
+OP_PING = 0x02
+# Firmware -> host
+OP_ACK = 0x81
+OP_PONG = 0x82
+OP_TELEMETRY = 0x83
+OP_ERROR = 0xE0
+
+ERROR_CODES: Dict[str, int] = {"INVALID_COMMAND": 1, "INVALID_PIN": 2, "BAD_FRAME": 3}
+ERROR_NAMES: Dict[int, str] = {code: name for name, code in ERROR_CODES.items()}
+
+Frame = Tuple[int, int, bytes]  # (seq, opcode, payload)
+
+TELEMETRY_PREFIX = "T:"
+
+
+def _build_crc8_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+
+_CRC8_TABLE = _build_crc8_table()
+
+
+def crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def encode_frame(seq: int, opcode: int, payload: bytes = b"") -> bytes:
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"Frame payload too long ({len(payload)} > {MAX_PAYLOAD})")
+    body = bytes((len(payload), seq & 0xFF, opcode)) + payload
+    return bytes((START_BYTE,)) + body + bytes((crc8(body),))
+
+
+def decode_frame(data: bytes) -> Optional[Frame]:
+    """Check one complete frame (starting at its start byte); None if it is malformed."""
+    if len(data) < 5 or data[0] != START_BYTE or data[1] != len(data) - 5:
+        return None
+    body = data[1:-1]
+    if crc8(body) != data[-1]:
+        return None
+    return body[1], body[2], bytes(body[3:])
+
+
+def frame_length(data: bytes) -> Optional[int]:
+    """Total length of the frame at the start of `data`, or None if LEN has not arrived yet."""
+    return data[1] + 5 if len(data) >= 2 else None
+
+
+class FrameDecoder:
+    """
+    Incremental frame parser for a byte stream.
+
+    Bytes outside a frame (text lines, line noise) are skipped, and a frame
+    whose CRC does not match is dropped by rescanning from the byte after its
+    start byte.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.crc_errors = 0
+
+    def feed(self, data: bytes) -> List[Frame]:
+        self._buffer.extend(data)
+        frames = []
+        while True:
+            start = self._buffer.find(START_BYTE)
+            if start < 0:
+                self._buffer.clear()
+                return frames
+            del self._buffer[:start]
+            total = frame_length(self._buffer)
+            if total is None:
+                return frames
+            if total > MAX_PAYLOAD + 5:
+                del self._buffer[0]
+                continue
+            if len(self._buffer) < total:
+                return frames
+            frame = decode_frame(bytes(self._buffer[:total]))
+            if frame is None:
+                self.crc_errors += 1
+                del self._buffer[0]
+                continue
+            frames.append(frame)
+            del self._buffer[:total]
+
+
+def line_to_frame(seq: int, line: str) -> bytes:
+    """Encode a protocol line ("PING", "8:1", "8:0,9:1") as a command frame."""
+    command = line.strip()
+    if command == "PING":
+        return encode_frame(seq, OP_PING)
+    payload = bytearray()
+    for pair in command.split(","):
+        pin_text, separator, value_text = pair.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid command '{line}'")
+        pin, value = int(pin_text), int(value_text)
+        if not 0 <= pin <= 0x7F:
+            raise ValueError(f"Pin {pin} cannot be framed")
+        # One byte per pin: pin number in the high 7 bits, value in the low bit
+        payload.append((pin << 1) | (1 if value == 1 else 0))
+    return encode_frame(seq, OP_SET_PINS, bytes(payload))
+
+
+def frame_to_line(opcode: int, payload: bytes) -> Optional[str]:
+    """Decode a command frame back to its protocol line (firmware side)."""
+    if opcode == OP_PING:
+        return "PING"
+    if opcode == OP_SET_PINS and payload:
+        return ",".join(f"{byte >> 1}:{byte & 1}" for byte in payload)
+    return None
+
+
+def reply_to_frame(seq: int, reply: str) -> bytes:
+    """Encode a firmware reply line ("OK", "PONG", "ERROR:...") as a reply frame."""
+    if reply == "OK":
+        return encode_frame(seq, OP_ACK)
+    if reply == "PONG":
+        return encode_frame(seq, OP_PONG)
+    name = reply.partition(":")[2]
+    return encode_frame(seq, OP_ERROR, bytes((ERROR_CODES.get(name, ERROR_CODES["INVALID_COMMAND"]),)))
+
+
+def frame_to_reply(opcode: int, payload: bytes) -> str:
+    """Decode a reply frame to the text reply the rest of the stack expects."""
+    if opcode == OP_ACK:
+        return "OK"
+    if opcode == OP_PONG:
+        return "PONG"
+    code = payload[0] if payload else ERROR_CODES["INVALID_COMMAND"]
+    return f"ERROR:{ERROR_NAMES.get(code, 'INVALID_COMMAND')}"
+
+
+def parse_telemetry(text: str) -> Dict[str, float]:
+    """Parse "temp=21.5,motion=1" (prefix already removed); malformed pairs are skipped."""
+    readings: Dict[str, float] = {}
+    for pair in text.split(","):
+        name, separator, value = pair.partition("=")
+        if not separator or not name.strip():
+            continue
+        try:
+            readings[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return readings
+
+
+def telemetry_to_line(readings: Dict[str, float]) -> str:
+    return TELEMETRY_PREFIX + ",".join(f"{name}={value:g}" for name, value in readings.items())
+
+
+def telemetry_to_frame(readings: Dict[str, float]) -> bytes:
+    """One or more TELEMETRY frames, split between readings when they don't fit one payload (as the firmware does)."""
+    frames, payload = [], b""
+    for name, value in readings.items():
+        reading = f"{name}={value:g}".encode("ascii")
+        if payload and len(payload) + 1 + len(reading) > MAX_PAYLOAD:
+            frames.append(encode_frame(0, OP_TELEMETRY, payload))
+            payload = b""
+        payload = payload + b"," + reading if payload else reading
+    frames.append(encode_frame(0, OP_TELEMETRY, payload))
+    return b"".join(frames)
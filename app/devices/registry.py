@@ -0,0 +1,135 @@
+from typing import Dict, Any, Optional, List, Set, Iterable
+import threading
+
+# Board that devices without a "controller" field belong to
+DEFAULT_CONTROLLER = "default"
+
+
+def controller_of(device: Dict[str, Any]) -> str:
+    """Name of the board a device is wired to (its "controller" field)."""
+    return str(device.get("controller") or DEFAULT_CONTROLLER)
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Normalize location/type values so 'Living Room' matches 'living_room'."""
+    return str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+class DeviceRegistry:
+    """
+    In-memory device registry indexed by id, location, type, status, controller
+    and (controller, pin).
+
+    Role:
+    - O(1) lookup by device id
+    - Filtered queries that only touch the matching index buckets
+    - Keep the indexes in step with status changes
+
+    The registry holds references to the same dicts as the backing device list,
+    so saving that list persists whatever the registry changed.
+    """
+
+    def __init__(self, devices: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.RLock()
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_location: Dict[str, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        self._by_controller: Dict[str, Set[str]] = {}
+        self._by_pin: Dict[Any, Set[str]] = {}
+        for device in devices:
+            self.add(device)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self.by_id
+
+    def _index(self, index: Dict[Any, Set[str]], key: Any, device_id: str):
+        index.setdefault(key, set()).add(device_id)
+
+    def _unindex(self, index: Dict[Any, Set[str]], key: Any, device_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(device_id)
+            if not bucket:
+                del index[key]
+
+    def add(self, device: Dict[str, Any]):
+        with self._lock:
+            device_id = device["id"]
+            if device_id in self.by_id:
+                self.remove(device_id)
+            self.by_id[device_id] = device
+            self._index(self._by_location, normalize_key(device.get("location")), device_id)
+            self._index(self._by_type, normalize_key(device.get("type")), device_id)
+            self._index(self._by_status, normalize_key(device.get("status")), device_id)
+            self._index(self._by_controller, controller_of(device), device_id)
+            if device.get("pin") is not None:
+                # Pin numbers repeat across boards
+                self._index(self._by_pin, (controller_of(device), device["pin"]), device_id)
+
+    def remove(self, device_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            device = self.by_id.pop(device_id, None)
+            if device is None:
+                return None
+            self._unindex(self._by_location, normalize_key(device.get("location")), device_id)
+            self._unindex(self._by_type, normalize_key(device.get("type")), device_id)
+            self._unindex(self._by_status, normalize_key(device.get("status")), device_id)
+            self._unindex(self._by_controller, controller_of(device), device_id)
+            if device.get("pin") is not None:
+                self._unindex(self._by_pin, (controller_of(device), device["pin"]), device_id)
+            return device
+
+    def get(self, device_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(device_id)
+
+    def set_status(self, device: Dict[str, Any], status: str):
+        with self._lock:
+            device_id = device["id"]
+            self._unindex(self._by_status, normalize_key(device.get("status")), device_id)
+            device["status"] = status
+            self._index(self._by_status, normalize_key(status), device_id)
+
+    def devices_on_pin(self, pin: int, controller: str = DEFAULT_CONTROLLER) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self.by_id[device_id] for device_id in self._by_pin.get((controller, pin), ())]
+
+    def devices_on_controller(self, controller: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self.by_id[device_id] for device_id in sorted(self._by_controller.get(controller, ()))]
+
+    def query(self, location: Optional[str] = None, type: Optional[str] = None,
+              status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return devices matching every given filter (None means no filter)."""
+        with self._lock:
+            buckets = []
+            if location:
+                buckets.append(self._by_location.get(normalize_key(location), set()))
+            if type:
+                buckets.append(self._by_type.get(normalize_key(type), set()))
+            if status:
+                buckets.append(self._by_status.get(normalize_key(status), set()))
+
+            if not buckets:
+                return list(self.by_id.values())
+
+            # Intersect starting from the smallest bucket
+            buckets.sort(key=len)
+            ids = set(buckets[0])
+            for bucket in buckets[1:]:
+                ids &= bucket
+                if not ids:
+                    break
+            return [self.by_id[device_id] for device_id in sorted(ids)]
+
+    def locations(self) -> List[str]:
+        return sorted(self._by_location)
+
+    def types(self) -> List[str]:
+        return sorted(self._by_type)
+
+    def controllers(self) -> List[str]:
+        return sorted(self._by_controller)
@@ -0,0 +1,253 @@
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Tuple, Deque
+import datetime
+import json
+import queue
+import threading
+import time
+from colorama import Fore, Style, init
+from .events import DeviceEventBus, DeviceEvent
+from .scheduler import parse_days, parse_time_of_day
+
+init(autoreset=True)
+
+Predicate = Callable[[DeviceEvent, datetime.datetime], bool]
+
+
+def _minutes(value: str) -> int:
+    hour, minute = parse_time_of_day(value)
+    return hour * 60 + minute
+
+
+class Rule:
+    """
+    One automation, compiled once from its config entry:
+
+        {
+          "id": "late_lamp",
+          "when": {"device_id": "living_lamp", "attribute": "status", "to": "on"},
+          "conditions": [{"after": "22:00", "before": "06:00"}, {"device_id": "tv", "status": "off"}],
+          "then": [{"device_id": "bedroom_light", "action": "off"}],
+          "cooldown": 0
+        }
+
+    "attribute" defaults to "status"; "from"/"to" are optional. Time windows may
+    wrap past midnight and can be limited to "days" ("weekdays", "mon,fri", ...).
+    """
+
+    def __init__(self, spec: Dict[str, Any], get_state: Callable[[str], Optional[Dict[str, Any]]]):
+        self.id = str(spec["id"])
+        self.enabled = spec.get("enabled", True)
+        when = spec["when"]
+        self.device_id = when["device_id"]
+        self.attribute = when.get("attribute", "status")
+        self.to = when.get("to")
+        self.from_ = when.get("from")
+        self.actions = [{"device_id": action["device_id"], "action": action["action"]} for action in spec["then"]]
+        if not self.actions:
+            raise ValueError(f"Rule '{self.id}' has no actions")
+        self.cooldown = float(spec.get("cooldown", 0))
+        self.spec = spec
+        self.fires = 0
+        self.last_fired: Optional[float] = None
+        self._checks: List[Predicate] = [self._compile(condition, get_state) for condition in spec.get("conditions", [])]
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.device_id, self.attribute
+
+    def _compile(self, condition: Dict[str, Any], get_state: Callable[[str], Optional[Dict[str, Any]]]) -> Predicate:
+        if "device_id" in condition:
+            device_id = condition["device_id"]
+            expected = {k: v for k, v in condition.items() if k != "device_id"}
+
+            def device_matches(event: DeviceEvent, now: datetime.datetime) -> bool:
+                device = get_state(device_id) or {}
+                return all(device.get(k) == v for k, v in expected.items())
+            return device_matches
+
+        after = _minutes(condition["after"]) if "after" in condition else 0
+        before = _minutes(condition["before"]) if "before" in condition else 24 * 60
+        days = set(parse_days(condition["days"])) if "days" in condition else None
+        if "after" not in condition and "before" not in condition and days is None:
+            raise ValueError(f"Rule '{self.id}': unknown condition {condition}")
+
+        def in_window(event: DeviceEvent, now: datetime.datetime) -> bool:
+            minute = now.hour * 60 + now.minute
+            if days is not None and now.weekday() not in days:
+                return False
+            if after <= before:
+                return after <= minute < before
+            return minute >= after or minute < before  # wraps past midnight
+        return in_window
+
+    def matches(self, event: DeviceEvent, previous: Any, now: datetime.datetime) -> bool:
+        value = event["changes"][self.attribute]
+        if self.to is not None and value != self.to:
+            return False
+        if self.from_ is not None and previous != self.from_:
+            return False
+        return all(check(event, now) for check in self._checks)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**self.spec, "enabled": self.enabled, "fires": self.fires, "last_fired": self.last_fired}
+
+
+class RuleEngine:
+    """
+    Declarative automations evaluated on device state events, no LLM involved.
+
+    Role:
+    - Load rules from a JSON file and index them by (device_id, attribute)
+    - On each event, evaluate only the rules indexed under the changed attributes
+    - Run matching rules' actions on one worker thread through `execute(commands)`
+    - Stop loops: a change caused by a rule carries that rule's chain, and a rule
+      that appears in its own chain, or a chain longer than `max_depth`, is suppressed
+    - Rate-limit every rule (per-rule `cooldown` plus `max_fires_per_minute`)
+
+    Matching runs on the publishing thread and only does dict lookups and the
+    precompiled condition checks; anything slow happens on the worker.
+    """
+
+    def __init__(self, path: str, execute: Callable[[List[Dict[str, Any]]], str],
+                 get_state: Callable[[str], Optional[Dict[str, Any]]],
+                 max_depth: int = 4, max_fires_per_minute: int = 30, cause_ttl: float = 10.0):
+        self.path = path
+        self.execute = execute
+        self.get_state = get_state
+        self.max_depth = max_depth
+        self.max_fires_per_minute = max_fires_per_minute
+        self.cause_ttl = cause_ttl
+        self.rules: Dict[str, Rule] = {}
+        self._index: Dict[Tuple[str, str], List[Rule]] = {}
+        self._lock = threading.Lock()
+        self._last_values: Dict[Tuple[str, str], Any] = {}
+        # (device_id, attribute, value) -> (rule chain, expiry) for changes a rule asked for
+        self._causes: Dict[Tuple[str, str, Any], Tuple[Tuple[str, ...], float]] = {}
+        self._recent_fires: Dict[str, Deque[float]] = {}
+        self._queue: "queue.Queue[Optional[Tuple[Rule, Tuple[str, ...]]]]" = queue.Queue()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self.evaluations = 0
+        self.loops_suppressed = 0
+        self.rate_limited = 0
+
+    def load(self) -> int:
+        """(Re)load rules from the file; returns how many are enabled."""
+        try:
+            with open(self.path, 'r') as f:
+                specs = json.load(f)
+        except FileNotFoundError:
+            specs = []
+        except Exception as e:
+            print(f"{Fore.RED}[RuleEngine] Error loading {self.path}: {e}{Style.RESET_ALL}")
+            return len(self._index)
+
+        rules: Dict[str, Rule] = {}
+        for spec in specs:
+            try:
+                rule = Rule(spec, self.get_state)
+            except Exception as e:
+                print(f"{Fore.RED}[RuleEngine] Skipping invalid rule {spec.get('id', '?')}: {e}{Style.RESET_ALL}")
+                continue
+            rules[rule.id] = rule
+        self.set_rules(rules.values())
+        enabled = sum(1 for rule in rules.values() if rule.enabled)
+        print(f"{Fore.CYAN}[RuleEngine] Loaded {enabled} enabled rules ({len(rules)} total){Style.RESET_ALL}")
+        return enabled
+
+    def set_rules(self, rules):
+        index: Dict[Tuple[str, str], List[Rule]] = {}
+        by_id = {}
+        for rule in rules:
+            by_id[rule.id] = rule
+            if rule.enabled:
+                index.setdefault(rule.key, []).append(rule)
+        with self._lock:
+            self.rules = by_id
+            self._index = index
+
+    def start(self, events: DeviceEventBus):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="RuleEngine", daemon=True)
+        self._thread.start()
+        self._unsubscribe = events.subscribe(self.on_event)
+
+    def close(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "enabled": sum(len(rules) for rules in self._index.values()),
+            "evaluations": self.evaluations,
+            "fires": sum(rule.fires for rule in self.rules.values()),
+            "loops_suppressed": self.loops_suppressed,
+            "rate_limited": self.rate_limited,
+        }
+
+    def on_event(self, event: DeviceEvent):
+        now = time.time()
+        wall = datetime.datetime.fromtimestamp(event["timestamp"])
+        device_id = event["device_id"]
+        with self._lock:
+            for attribute, value in event["changes"].items():
+                key = (device_id, attribute)
+                previous = self._last_values.get(key)
+                self._last_values[key] = value
+                cause = self._causes.pop((device_id, attribute, value), None)
+                chain = cause[0] if cause and cause[1] >= now else ()
+                for rule in self._index.get(key, ()):
+                    self.evaluations += 1
+                    if not rule.matches(event, previous, wall):
+                        continue
+                    if rule.id in chain or len(chain) >= self.max_depth:
+                        self.loops_suppressed += 1
+                        print(f"{Fore.YELLOW}[RuleEngine] Loop suppressed: {' -> '.join(chain + (rule.id,))}{Style.RESET_ALL}")
+                        continue
+                    if not self._allow(rule, now):
+                        self.rate_limited += 1
+                        continue
+                    rule.fires += 1
+                    rule.last_fired = now
+                    child = chain + (rule.id,)
+                    # Changes this rule causes inherit its chain
+                    for action in rule.actions:
+                        self._causes[(action["device_id"], "status", action["action"])] = (child, now + self.cause_ttl)
+                    self._queue.put((rule, child))
+
+    def _allow(self, rule: Rule, now: float) -> bool:
+        if rule.cooldown and rule.last_fired is not None and now - rule.last_fired < rule.cooldown:
+            return False
+        fires = self._recent_fires.setdefault(rule.id, deque())
+        while fires and fires[0] <= now - 60:
+            fires.popleft()
+        if len(fires) >= self.max_fires_per_minute:
+            return False
+        fires.append(now)
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            rule, chain = item
+            try:
+                result = self.execute(rule.actions)
+            except Exception as e:
+                result = f"Error running rule: {e}"
+            color = Fore.RED if "Error" in result else Fore.GREEN
+            print(f"{color}[RuleEngine] {' -> '.join(chain)}: {result}{Style.RESET_ALL}")
+            # Actions that changed nothing publish no event; drop their stale causes
+            now = time.time()
+            with self._lock:
+                for key in [key for key, (_, expiry) in self._causes.items() if expiry < now]:
+                    del self._causes[key]
@@ -0,0 +1,300 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Tuple
+import datetime
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from colorama import Fore, Style, init
+from .persistence import atomic_write_text
+
+init(autoreset=True)
+
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY_GROUPS = {
+    "daily": list(range(7)),
+    "weekdays": list(range(5)),
+    "weekends": [5, 6],
+}
+
+
+def parse_days(repeat: str) -> List[int]:
+    """'daily', 'weekdays', 'weekends' or a day list like 'mon,wed,fri' -> weekday numbers (Monday = 0)."""
+    key = repeat.strip().lower()
+    if key in DAY_GROUPS:
+        return DAY_GROUPS[key]
+    days = set()
+    for part in key.replace(" ", "").split(","):
+        if part[:3] not in DAY_NAMES:
+            raise ValueError(f"Unknown repeat '{repeat}': use daily, weekdays, weekends or days like 'mon,wed'")
+        days.add(DAY_NAMES.index(part[:3]))
+    return sorted(days)
+
+
+def parse_time_of_day(value: str) -> Tuple[int, int]:
+    hour, _, minute = value.strip().partition(":")
+    hour, minute = int(hour), int(minute or 0)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time of day '{value}'")
+    return hour, minute
+
+
+def next_occurrence(job: Dict[str, Any], after: float) -> Optional[float]:
+    """Next run strictly after `after` for a recurring job; None for one-shot jobs."""
+    if job.get("every"):
+        every = float(job["every"])
+        missed = max(0, int((after - job["next_run"]) // every) + 1)
+        return job["next_run"] + missed * every
+    if job.get("time"):
+        hour, minute = parse_time_of_day(job["time"])
+        days = job.get("days") or DAY_GROUPS["daily"]
+        # Wall-clock arithmetic, so "07:00" stays 07:00 across DST changes
+        start = datetime.datetime.fromtimestamp(after)
+        for offset in range(8):
+            day = start.date() + datetime.timedelta(days=offset)
+            if day.weekday() not in days:
+                continue
+            candidate = datetime.datetime.combine(day, datetime.time(hour, minute)).timestamp()
+            if candidate > after:
+                return candidate
+    return None
+
+
+def timing_from_request(delay_minutes: Optional[float] = None, at: Optional[str] = None,
+                        repeat: Optional[str] = None, every_minutes: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Turn the user-facing options (tool and API) into DeviceScheduler.schedule() keyword arguments:
+    - `delay_minutes`: once, that many minutes from now
+    - `at`: once at "HH:MM" (next occurrence) or an ISO date-time
+    - `repeat` + `at`: "daily", "weekdays", "weekends" or "mon,wed,..." at "HH:MM"
+    - `every_minutes`: repeat at a fixed interval (first run after `delay_minutes` if given)
+    """
+    if repeat and repeat.strip().lower() not in ("", "none", "once"):
+        if not at:
+            raise ValueError("A repeating schedule needs a time of day in 'at' (HH:MM)")
+        return {"time_of_day": at, "days": parse_days(repeat)}
+    if every_minutes:
+        timing: Dict[str, Any] = {"every": float(every_minutes) * 60}
+        if delay_minutes is not None:
+            timing["delay"] = float(delay_minutes) * 60
+        return timing
+    if delay_minutes is not None:
+        if float(delay_minutes) < 0:
+            raise ValueError("delay_minutes cannot be negative")
+        return {"delay": float(delay_minutes) * 60}
+    if at:
+        if ":" in at and "-" not in at and "T" not in at:
+            return {"run_at": next_occurrence({"time": at}, time.time())}
+        return {"run_at": datetime.datetime.fromisoformat(at).timestamp()}
+    raise ValueError("Give delay_minutes, at, repeat with at, or every_minutes")
+
+
+def describe_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job dict with readable local times added, for tool output and the API."""
+    described = dict(job)
+    described["next_run_at"] = datetime.datetime.fromtimestamp(job["next_run"]).isoformat(timespec="seconds")
+    return described
+
+
+class DeviceScheduler:
+    """
+    Timers and recurring device actions on a single timer thread.
+
+    Role:
+    - Keep jobs in a min-heap ordered by next run time; one thread sleeps until
+      the earliest is due, however many jobs there are
+    - Persist jobs atomically to a JSON file so they survive restarts (writes
+      are batched over `save_delay` seconds)
+    - Catch up after downtime: a run missed by at most `catch_up` seconds still
+      fires (once), older ones are skipped; recurring jobs then move to their
+      next future occurrence
+    - Hand due jobs to `execute(commands)` on a worker thread, so a slow board
+      never delays the timer
+
+    `execute` receives the job's [{"device_id", "action"}] list and returns the
+    controller's result string (the same path as the control_devices tool).
+    Cancelled or rescheduled jobs leave stale heap entries behind; they are
+    recognised by their run time and skipped when popped.
+    """
+
+    def __init__(self, path: str, execute: Callable[[List[Dict[str, Any]]], str],
+                 catch_up: float = 900.0, workers: int = 1, save_delay: float = 0.2):
+        self.path = path
+        self.execute = execute
+        self.catch_up = catch_up
+        self.save_delay = save_delay
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._dirty_since: Optional[float] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="DeviceScheduler")
+
+    def start(self):
+        self._load()
+        self._thread = threading.Thread(target=self._run, name="DeviceScheduler", daemon=True)
+        self._thread.start()
+        print(f"{Fore.CYAN}[DeviceScheduler] {len(self.jobs)} scheduled jobs{Style.RESET_ALL}")
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._executor.shutdown(wait=True)
+        self._save()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                jobs = json.load(f)
+        except Exception as e:
+            print(f"{Fore.RED}[DeviceScheduler] Error loading {self.path}: {e}{Style.RESET_ALL}")
+            return
+        with self._condition:
+            for job in jobs:
+                self.jobs[job["id"]] = job
+                heapq.heappush(self._heap, (job["next_run"], next(self._counter), job["id"]))
+
+    def _mark_dirty(self):
+        # Called with the condition held; the timer thread writes the file shortly after
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+            self._condition.notify()
+
+    def _save(self):
+        with self._condition:
+            self._dirty_since = None
+            text = json.dumps(sorted(self.jobs.values(), key=lambda job: job["next_run"]), indent=2)
+        # Serialised so an older snapshot never lands after a newer one
+        with self._save_lock:
+            try:
+                atomic_write_text(self.path, text)
+            except Exception as e:
+                print(f"{Fore.RED}[DeviceScheduler] Error saving jobs: {e}{Style.RESET_ALL}")
+
+    def schedule(self, commands: List[Dict[str, Any]], run_at: Optional[float] = None,
+                 delay: Optional[float] = None, time_of_day: Optional[str] = None,
+                 days: Optional[List[int]] = None, every: Optional[float] = None,
+                 name: str = "") -> Dict[str, Any]:
+        """
+        Add a job. Exactly one way of timing it:
+        - `delay` seconds from now, or an absolute `run_at` timestamp (one-shot)
+        - `time_of_day` "HH:MM" on `days` (weekday numbers, default every day)
+        - `every` seconds, first run at `run_at`/`delay` or one interval from now
+        """
+        if not commands:
+            raise ValueError("At least one command is required")
+        now = time.time()
+        job: Dict[str, Any] = {
+            "id": uuid.uuid4().hex[:8],
+            "name": name,
+            "commands": [{"device_id": c["device_id"], "action": c["action"]} for c in commands],
+            "created": now,
+            "last_run": None,
+            "last_result": None,
+        }
+        if time_of_day:
+            parse_time_of_day(time_of_day)
+            job["time"] = time_of_day.strip()
+            job["days"] = sorted(days) if days else DAY_GROUPS["daily"]
+            job["next_run"] = next_occurrence(job, now)
+        elif every:
+            if every <= 0:
+                raise ValueError("Interval must be positive")
+            job["every"] = float(every)
+            job["next_run"] = run_at if run_at is not None else now + (delay if delay is not None else every)
+        elif run_at is not None or delay is not None:
+            job["next_run"] = run_at if run_at is not None else now + delay
+        else:
+            raise ValueError("Give a delay, a time or an interval")
+
+        with self._condition:
+            self.jobs[job["id"]] = job
+            self._push(job)
+            self._mark_dirty()
+        return dict(job)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._condition:
+            job = self.jobs.pop(job_id, None)
+            # The heap entry stays and is skipped when it comes up
+            if job is not None:
+                self._mark_dirty()
+        return job is not None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            return [dict(job) for job in sorted(self.jobs.values(), key=lambda job: job["next_run"])]
+
+    def _push(self, job: Dict[str, Any]):
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (job["next_run"], next(self._counter), job["id"]))
+        if earliest is None or job["next_run"] < earliest:
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.time()
+                due: List[Tuple[Dict[str, Any], float]] = []
+                while self._heap and self._heap[0][0] <= now:
+                    run_at, _, job_id = heapq.heappop(self._heap)
+                    job = self.jobs.get(job_id)
+                    if job is None or job["next_run"] != run_at:
+                        continue  # cancelled or rescheduled
+                    due.append((job, run_at))
+                    # Runs missed while we were down collapse into this one
+                    following = next_occurrence(job, now)
+                    if following is None:
+                        del self.jobs[job_id]
+                    else:
+                        job["next_run"] = following
+                        heapq.heappush(self._heap, (following, next(self._counter), job_id))
+                    self._mark_dirty()
+                save_in = (self._dirty_since + self.save_delay - time.monotonic()
+                           if self._dirty_since is not None else None)
+                if not due and (save_in is None or save_in > 0):
+                    # Wake at least once a minute so wall-clock jumps are noticed
+                    timeout = min(60.0, self._heap[0][0] - now) if self._heap else 60.0
+                    if save_in is not None:
+                        timeout = min(timeout, save_in)
+                    self._condition.wait(max(0.0, timeout))
+                    continue
+
+            for job, run_at in due:
+                if now - run_at > self.catch_up:
+                    print(f"{Fore.YELLOW}[DeviceScheduler] Skipping job {job['id']} missed by {now - run_at:.0f}s{Style.RESET_ALL}")
+                    self._finish(job, run_at, "Skipped: missed while offline")
+                else:
+                    self._executor.submit(self._fire, job, run_at)
+            if save_in is not None and save_in <= 0:
+                # Batched: thousands of schedule() calls cost one write
+                self._save()
+
+    def _fire(self, job: Dict[str, Any], run_at: float):
+        try:
+            result = self.execute(job["commands"])
+        except Exception as e:
+            result = f"Error running scheduled job: {e}"
+        color = Fore.RED if "Error" in result else Fore.GREEN
+        print(f"{color}[DeviceScheduler] Job {job['id']} {job.get('name') or ''}: {result}{Style.RESET_ALL}")
+        self._finish(job, run_at, result)
+
+    def _finish(self, job: Dict[str, Any], run_at: float, result: str):
+        with self._condition:
+            job["last_run"] = run_at
+            job["last_result"] = result
+            if job["id"] in self.jobs:
+                self._mark_dirty()
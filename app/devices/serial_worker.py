@@ -0,0 +1,310 @@
+from concurrent.futures import Future
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
+import itertools
+import queue
+import threading
+import time
+import serial
+from colorama import Fore, Style, init
+from .protocol import (FrameDecoder, OP_TELEMETRY, TELEMETRY_PREFIX, frame_to_reply,
+                       line_to_frame, parse_telemetry)
+
+init(autoreset=True)
+
+
+class _InFlight:
+    """A command written to the port and still waiting for its reply."""
+
+    __slots__ = ("seq", "wire_seq", "future", "deadline", "payload", "attempts", "order", "pins")
+
+    def __init__(self, seq: int, wire_seq: int, future: Future, deadline: float,
+                 payload: bytes, order: int, pins: FrozenSet[int]):
+        self.seq = seq
+        self.wire_seq = wire_seq
+        self.future = future
+        self.deadline = deadline
+        self.payload = payload
+        self.attempts = 0
+        self.order = order
+        self.pins = pins
+
+
+def _line_pins(line: str) -> FrozenSet[int]:
+    pins = set()
+    for pair in line.split(","):
+        pin_text, separator, _ = pair.partition(":")
+        if separator and pin_text.strip().isdigit():
+            pins.add(int(pin_text))
+    return frozenset(pins)
+
+
+class SerialCommandWorker:
+    """
+    Dedicated I/O thread that owns a serial port.
+
+    Role:
+    - Take pin commands from a queue and write them to the port
+    - Keep up to `max_in_flight` commands outstanding at once
+    - Match each acknowledgement line to the future of the command it answers
+    - Keep reading while idle and hand unsolicited sensor readings to
+      `on_telemetry(readings)` instead of mistaking them for acknowledgements
+
+    In text mode the firmware handles commands strictly in order and replies
+    once per line, so acknowledgements are matched to in-flight commands by
+    sequence number in FIFO order. With `framed=True` commands go out as binary
+    frames (see protocol.py) whose replies echo the sequence number, so each
+    ack is matched directly and a lost or corrupted frame is resent up to
+    `retries` times without disturbing the rest of the window.
+    """
+
+    def __init__(self, port: serial.Serial, max_in_flight: int = 4,
+                 ack_timeout: float = 1.0, poll_interval: float = 0.01,
+                 framed: bool = False, retries: int = 2):
+        self.port = port
+        # Frames carry an 8-bit sequence number; keep the window well inside it
+        self.max_in_flight = max(1, min(max_in_flight, 128))
+        self.ack_timeout = ack_timeout
+        self.poll_interval = poll_interval
+        self.framed = framed
+        self.retries = retries
+        self.retransmits = 0
+        self.superseded = 0
+        self._decoder = FrameDecoder()
+        self._commands: "queue.Queue[Tuple[int, str, Future]]" = queue.Queue()
+        self._in_flight: Deque[_InFlight] = deque()
+        self._seq = itertools.count(1)
+        self._wire_seq = 0
+        self._write_order = itertools.count(1)
+        self._last_write: Dict[int, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.on_fatal_error = None
+        self.on_telemetry: Optional[Callable[[Dict[str, float]], None]] = None
+        self.telemetry_lines = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        # The worker polls with a short read timeout so it can interleave writes and reads
+        self.port.timeout = self.poll_interval
+        self._thread = threading.Thread(target=self._run, name="SerialCommandWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        self._fail_all(RuntimeError("Serial worker stopped"))
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    @property
+    def crc_errors(self) -> int:
+        return self._decoder.crc_errors
+
+    def submit(self, line: str) -> Future:
+        """
+        Queue a raw protocol line (without newline) for sending.
+        Returns a Future resolved with the firmware's reply line.
+        """
+        future: Future = Future()
+        if self._stop.is_set():
+            future.set_exception(RuntimeError("Serial worker stopped"))
+            return future
+        seq = next(self._seq)
+        self._commands.put((seq, line, future))
+        return future
+
+    def submit_pin(self, pin: int, value: int) -> Future:
+        return self.submit(f"{pin}:{value}")
+
+    def submit_pins(self, pin_values: Dict[int, int]) -> Future:
+        """Send several pin changes in one frame, answered by a single combined ack."""
+        return self.submit(",".join(f"{pin}:{value}" for pin, value in pin_values.items()))
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self._write_pending()
+                if self._in_flight:
+                    self._read_ack()
+                    self._expire_stale()
+                elif self.port.in_waiting:
+                    # Nothing outstanding: whatever arrives is telemetry or noise
+                    self._read_ack()
+                else:
+                    try:
+                        item = self._commands.get(timeout=self.poll_interval)
+                    except queue.Empty:
+                        continue
+                    self._write(*item)
+        except serial.SerialException as e:
+            print(f"{Fore.RED}[SerialCommandWorker] Serial communication error: {e}{Style.RESET_ALL}")
+            self._handle_fatal(e)
+        except Exception as e:
+            print(f"{Fore.RED}[SerialCommandWorker] Unexpected serial error: {e}{Style.RESET_ALL}")
+            self._handle_fatal(e)
+
+    def _write_pending(self):
+        while len(self._in_flight) < self.max_in_flight:
+            try:
+                item = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            self._write(*item)
+
+    def _next_wire_seq(self) -> int:
+        busy = {entry.wire_seq for entry in self._in_flight}
+        while True:
+            self._wire_seq = self._wire_seq % 255 + 1
+            if self._wire_seq not in busy:
+                return self._wire_seq
+
+    def _write(self, seq: int, line: str, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        wire_seq = 0
+        if self.framed:
+            wire_seq = self._next_wire_seq()
+            try:
+                payload = line_to_frame(wire_seq, line)
+            except ValueError as e:
+                future.set_exception(e)
+                return
+        else:
+            payload = f"{line}\n".encode('utf-8')
+        entry = _InFlight(seq, wire_seq, future, time.monotonic() + self.ack_timeout,
+                          payload, 0, _line_pins(line))
+        try:
+            self._send(entry)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        self._in_flight.append(entry)
+
+    def _send(self, entry: _InFlight):
+        self.port.write(entry.payload)
+        self.port.flush()
+        entry.order = next(self._write_order)
+        for pin in entry.pins:
+            self._last_write[pin] = entry.order
+
+    def _read_ack(self):
+        if self.framed:
+            self._read_frames()
+            return
+        line = self.port.readline()
+        if not line:
+            return
+        response = line.decode('utf-8', errors='ignore').strip()
+        if not response:
+            return
+        if response.startswith(TELEMETRY_PREFIX):
+            self._telemetry(response[len(TELEMETRY_PREFIX):])
+            return
+        if not self._in_flight:
+            print(f"{Fore.YELLOW}[SerialCommandWorker] Unsolicited line ignored: '{response}'{Style.RESET_ALL}")
+            return
+        entry = self._in_flight.popleft()
+        print(f"{Fore.MAGENTA}[SerialCommandWorker] #{entry.seq} Arduino response: '{response}'{Style.RESET_ALL}")
+        entry.future.set_result(response)
+
+    def _read_frames(self):
+        data = self.port.read(max(1, self.port.in_waiting))
+        if not data:
+            return
+        for wire_seq, opcode, payload in self._decoder.feed(data):
+            if opcode == OP_TELEMETRY:
+                self._telemetry(payload.decode('ascii', errors='ignore'))
+                continue
+            entry = next((item for item in self._in_flight if item.wire_seq == wire_seq), None)
+            if entry is None:
+                # Late ack for a command that was already retried and answered
+                continue
+            self._in_flight.remove(entry)
+            response = frame_to_reply(opcode, payload)
+            print(f"{Fore.MAGENTA}[SerialCommandWorker] #{entry.seq} Arduino response: '{response}'{Style.RESET_ALL}")
+            entry.future.set_result(response)
+            # The firmware answers in order, so anything written before this frame
+            # and still unanswered lost either its command or its reply
+            for earlier in [item for item in self._in_flight if item.order < entry.order]:
+                self._retry(earlier)
+
+    def _telemetry(self, text: str):
+        readings = parse_telemetry(text)
+        if not readings:
+            return
+        self.telemetry_lines += 1
+        if self.on_telemetry:
+            try:
+                self.on_telemetry(readings)
+            except Exception as e:
+                print(f"{Fore.RED}[SerialCommandWorker] Telemetry handler failed: {e}{Style.RESET_ALL}")
+
+    def _expire_stale(self):
+        if self.framed:
+            now = time.monotonic()
+            for entry in [item for item in self._in_flight if item.deadline <= now]:
+                self._retry(entry)
+            return
+        if not self._in_flight or self._in_flight[0].deadline > time.monotonic():
+            return
+        # A missing ack breaks FIFO matching for everything behind it, so fail the
+        # whole window and drop any late replies before continuing
+        print(f"{Fore.YELLOW}[SerialCommandWorker] No response for #{self._in_flight[0].seq}, resynchronizing{Style.RESET_ALL}")
+        while self._in_flight:
+            self._in_flight.popleft().future.set_exception(TimeoutError("No response from Arduino"))
+        self.port.reset_input_buffer()
+
+    def _retry(self, entry: _InFlight):
+        if any(self._last_write.get(pin) != entry.order for pin in entry.pins):
+            # A later command already set one of these pins; resending would undo it
+            self._in_flight.remove(entry)
+            self.superseded += 1
+            entry.future.set_exception(TimeoutError("No response from Arduino (superseded by a later command)"))
+            return
+        if entry.attempts >= self.retries:
+            print(f"{Fore.YELLOW}[SerialCommandWorker] No response for #{entry.seq} after {entry.attempts + 1} attempts{Style.RESET_ALL}")
+            self._in_flight.remove(entry)
+            entry.future.set_exception(TimeoutError("No response from Arduino"))
+            return
+        # Pin commands set absolute values, so sending the same frame again is harmless
+        self._send(entry)
+        entry.deadline = time.monotonic() + self.ack_timeout
+        entry.attempts += 1
+        self.retransmits += 1
+
+    def take_unsent(self) -> List[Tuple[str, Future]]:
+        """Remove and return commands that were queued but never written to the port."""
+        unsent = []
+        while True:
+            try:
+                _, line, future = self._commands.get_nowait()
+            except queue.Empty:
+                break
+            unsent.append((line, future))
+        return unsent
+
+    def _fail_all(self, error: Exception):
+        while self._in_flight:
+            future = self._in_flight.popleft().future
+            if not future.done():
+                future.set_exception(error)
+        for _, future in self.take_unsent():
+            if not future.done():
+                future.set_exception(error)
+
+    def _handle_fatal(self, error: Exception):
+        self._stop.set()
+        # Commands already written may or may not have been applied, so they fail;
+        # the error callback may still take the unsent ones to retry elsewhere
+        while self._in_flight:
+            self._in_flight.popleft().future.set_exception(error)
+        if self.on_fatal_error:
+            self.on_fatal_error(error)
+        self._fail_all(error)
@@ -0,0 +1,323 @@
+from typing import Dict, Any, Optional, List, Tuple
+import heapq
+import random
+import threading
+import time
+import serial
+from config.settings import Settings
+from .protocol import (
+    MAX_PAYLOAD, PROTOCOL_VERSION, START_BYTE,
+    decode_frame, frame_length, frame_to_line, reply_to_frame,
+    telemetry_to_frame, telemetry_to_line,
+)
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+# Firmware accepts pins 2..MAX_PIN (see arduino_controller.ino)
+MIN_PIN = 2
+MAX_PIN = 13
+
+# Named link/fault profiles selectable with ARDUINO_SIM_PROFILE; individual
+# ARDUINO_SIM_* settings override the profile's values
+FAULT_PROFILES: Dict[str, Dict[str, float]] = {
+    "ideal": {"baudrate": 0, "processing_ms": 0, "drop_rate": 0, "garble_rate": 0, "disconnect_rate": 0},
+    "realistic": {"baudrate": 9600, "processing_ms": 10, "drop_rate": 0, "garble_rate": 0, "disconnect_rate": 0},
+    "lossy": {"baudrate": 9600, "processing_ms": 10, "drop_rate": 0.02, "garble_rate": 0.02, "disconnect_rate": 0},
+    "flaky": {"baudrate": 9600, "processing_ms": 10, "drop_rate": 0.05, "garble_rate": 0.05, "disconnect_rate": 0.005},
+}
+
+
+def firmware_reply(line: str, pins: Dict[int, int]) -> str:
+    """
+    Apply one protocol line to `pins` exactly as arduino_controller.ino does and
+    return the reply it would print.
+    """
+    command = line.strip()
+    if command == "PING":
+        return "PONG"
+    if command.startswith("PROTO "):
+        # Framing negotiation: agree on the highest version both sides speak
+        try:
+            return f"PROTO {min(int(command[6:]), PROTOCOL_VERSION)}"
+        except ValueError:
+            return "ERROR:INVALID_COMMAND"
+    if not command:
+        return "ERROR:INVALID_COMMAND"
+
+    updates = {}
+    for pair in command.split(","):
+        pin_text, separator, value_text = pair.partition(":")
+        if not separator or not pin_text:
+            return "ERROR:INVALID_COMMAND"
+        try:
+            pin, value = int(pin_text), int(value_text)
+        except ValueError:
+            return "ERROR:INVALID_COMMAND"
+        if pin < MIN_PIN or pin > MAX_PIN:
+            return "ERROR:INVALID_PIN"
+        updates[pin] = 1 if value == 1 else 0
+
+    pins.update(updates)
+    return "OK"
+
+
+class FirmwareSession:
+    """
+    Byte-stream front end of the firmware: splits incoming bytes into text lines
+    and binary frames (see protocol.py) and answers each in the same format.
+    """
+
+    def __init__(self, pins: Optional[Dict[int, int]] = None):
+        self.pins = pins if pins is not None else {}
+        # Set by the first valid frame: the host negotiated framing, so pushed
+        # telemetry goes out as frames too
+        self.framed = False
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes]]:
+        """Consume bytes; returns (command length in bytes, reply bytes) per complete command."""
+        self._buffer.extend(data)
+        replies = []
+        while self._buffer:
+            if self._buffer[0] == START_BYTE:
+                total = frame_length(self._buffer)
+                if total is None:
+                    break
+                if total > MAX_PAYLOAD + 5:
+                    del self._buffer[0]
+                    continue
+                if len(self._buffer) < total:
+                    break
+                frame = decode_frame(bytes(self._buffer[:total]))
+                if frame is None:
+                    # Corrupted on the way in: drop it, the host retries on timeout
+                    del self._buffer[0]
+                    continue
+                del self._buffer[:total]
+                self.framed = True
+                seq, opcode, payload = frame
+                line = frame_to_line(opcode, payload)
+                reply = firmware_reply(line, self.pins) if line is not None else "ERROR:BAD_FRAME"
+                replies.append((total, reply_to_frame(seq, reply)))
+            else:
+                end = self._buffer.find(b"\n")
+                if end < 0:
+                    break
+                line = bytes(self._buffer[:end]).decode('utf-8', errors='ignore')
+                del self._buffer[:end + 1]
+                replies.append((end + 1, f"{firmware_reply(line, self.pins)}\r\n".encode('utf-8')))
+        return replies
+
+    def telemetry(self, readings: Dict[str, float]) -> bytes:
+        """Unsolicited sensor report in the format the host currently speaks."""
+        if self.framed:
+            return telemetry_to_frame(readings)
+        return f"{telemetry_to_line(readings)}\r\n".encode('utf-8')
+
+
+class LinkFaultModel:
+    """
+    Timing and fault model for a simulated Arduino serial link.
+
+    Role:
+    - Byte time from the baud rate (10 bits per byte: start + 8 data + stop)
+    - Fixed firmware processing delay per command
+    - Seeded random dropped acknowledgements, garbled reply lines and disconnects
+    """
+
+    def __init__(self, baudrate: float = 0, processing_ms: float = 0, drop_rate: float = 0,
+                 garble_rate: float = 0, disconnect_rate: float = 0, disconnect_seconds: float = 2.0,
+                 seed: Optional[int] = None):
+        self.baudrate = baudrate
+        self.processing_ms = processing_ms
+        self.drop_rate = drop_rate
+        self.garble_rate = garble_rate
+        self.disconnect_rate = disconnect_rate
+        self.disconnect_seconds = disconnect_seconds
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.disconnected_until = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "LinkFaultModel":
+        profile_name = getattr(Settings, "ARDUINO_SIM_PROFILE", "ideal").strip().lower()
+        if profile_name not in FAULT_PROFILES:
+            print(f"{Fore.YELLOW}[LinkFaultModel] Unknown profile '{profile_name}', using 'ideal'{Style.RESET_ALL}")
+            profile_name = "ideal"
+        options: Dict[str, Any] = dict(FAULT_PROFILES[profile_name])
+        overrides = {
+            "baudrate": "ARDUINO_SIM_BAUDRATE",
+            "processing_ms": "ARDUINO_SIM_PROCESSING_MS",
+            "drop_rate": "ARDUINO_SIM_DROP_RATE",
+            "garble_rate": "ARDUINO_SIM_GARBLE_RATE",
+            "disconnect_rate": "ARDUINO_SIM_DISCONNECT_RATE",
+            "disconnect_seconds": "ARDUINO_SIM_DISCONNECT_SECONDS",
+        }
+        for option, setting in overrides.items():
+            value = getattr(Settings, setting, None)
+            if value not in (None, ""):
+                options[option] = float(value)
+        seed = getattr(Settings, "ARDUINO_SIM_SEED", None)
+        options["seed"] = int(seed) if seed not in (None, "") else None
+        return cls(**options)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.baudrate or self.processing_ms or self.drop_rate or self.garble_rate or self.disconnect_rate)
+
+    def byte_time(self) -> float:
+        return 10.0 / self.baudrate if self.baudrate else 0.0
+
+    def transfer_time(self, num_bytes: int) -> float:
+        return num_bytes * self.byte_time()
+
+    @property
+    def processing_time(self) -> float:
+        return self.processing_ms / 1000.0
+
+    def is_disconnected(self) -> bool:
+        return time.monotonic() < self.disconnected_until
+
+    def next_outcome(self) -> str:
+        """Draw the fate of one command: "ok", "drop", "garble" or "disconnect"."""
+        with self._lock:
+            roll = self.rng.random()
+            if roll < self.disconnect_rate:
+                self.disconnected_until = time.monotonic() + self.disconnect_seconds
+                return "disconnect"
+            roll -= self.disconnect_rate
+            if roll < self.drop_rate:
+                return "drop"
+            roll -= self.drop_rate
+            if roll < self.garble_rate:
+                return "garble"
+            return "ok"
+
+    def garble(self, reply: bytes) -> bytes:
+        """Corrupt a reply: text lines turn into noise, frames get one bit flipped."""
+        with self._lock:
+            if reply.endswith(b"\r\n"):
+                noise = bytes(self.rng.randrange(0x20, 0x7f) for _ in range(max(2, len(reply) - 2)))
+                return noise + b"\r\n"
+            data = bytearray(reply)
+            data[self.rng.randrange(1, len(data))] ^= 1 << self.rng.randrange(8)
+            return bytes(data)
+
+
+class SimulatedSerialPort:
+    """
+    Drop-in stand-in for serial.Serial that behaves like the firmware behind a
+    LinkFaultModel, so the real worker/connection stack can be load tested
+    without hardware. Selected with ARDUINO_PORT=sim://.
+
+    Writes are serialized over one simulated wire, and replies become readable
+    once their bytes have "arrived".
+    """
+
+    def __init__(self, model: Optional[LinkFaultModel] = None, timeout: float = 1.0,
+                 pins: Optional[Dict[int, int]] = None):
+        self.model = model or LinkFaultModel()
+        if self.model.is_disconnected():
+            raise serial.SerialException("Simulated device is disconnected")
+        self.timeout = timeout
+        self.is_open = True
+        self.session = FirmwareSession(pins)
+        self.pins = self.session.pins
+        self._replies: List[Tuple[float, int, bytes]] = []
+        self._received = bytearray()
+        self._counter = 0
+        self._wire_free_at = time.monotonic()
+        self._firmware_free_at = time.monotonic()
+        self._ready = threading.Condition()
+        self._push(time.monotonic() + self.model.processing_time, b"Arduino Ready\r\n")
+
+    def _check(self):
+        if not self.is_open:
+            raise serial.SerialException("Port is closed")
+        if self.model.is_disconnected():
+            self.is_open = False
+            raise serial.SerialException("Simulated device disconnected")
+
+    def _push(self, ready_at: float, data: bytes):
+        with self._ready:
+            self._counter += 1
+            heapq.heappush(self._replies, (ready_at, self._counter, data))
+            self._ready.notify_all()
+
+    def write(self, data: bytes) -> int:
+        self._check()
+        now = time.monotonic()
+        # Host -> board bytes share one wire
+        self._wire_free_at = max(self._wire_free_at, now) + self.model.transfer_time(len(data))
+        for _, reply in self.session.feed(data):
+            self._handle_reply(reply)
+        return len(data)
+
+    def _handle_reply(self, reply: bytes):
+        outcome = self.model.next_outcome()
+        if outcome == "disconnect":
+            self.is_open = False
+            return
+        # The firmware handles one command at a time once it has fully arrived
+        start = max(self._wire_free_at, self._firmware_free_at)
+        self._firmware_free_at = start + self.model.processing_time
+        ready_at = self._firmware_free_at + self.model.transfer_time(len(reply))
+        if outcome == "drop":
+            return
+        self._push(ready_at, self.model.garble(reply) if outcome == "garble" else reply)
+
+    def flush(self):
+        # Like pyserial, block until the output has actually been transmitted
+        self._check()
+        remaining = self._wire_free_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _collect(self, now: float):
+        # Move replies whose bytes have arrived into the receive buffer (caller holds _ready)
+        while self._replies and self._replies[0][0] <= now:
+            self._received.extend(heapq.heappop(self._replies)[2])
+
+    def _read_until(self, done) -> bytes:
+        self._check()
+        deadline = time.monotonic() + (self.timeout if self.timeout is not None else 3600)
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                self._collect(now)
+                size = done(self._received)
+                if size:
+                    data = bytes(self._received[:size])
+                    del self._received[:size]
+                    return data
+                if now >= deadline:
+                    return b""
+                wait = deadline - now
+                if self._replies:
+                    wait = min(wait, self._replies[0][0] - now)
+                self._ready.wait(wait)
+                if not self.is_open:
+                    raise serial.SerialException("Simulated device disconnected")
+
+    def readline(self) -> bytes:
+        return self._read_until(lambda buffer: buffer.find(b"\n") + 1)
+
+    def read(self, size: int = 1) -> bytes:
+        return self._read_until(lambda buffer: min(size, len(buffer)))
+
+    @property
+    def in_waiting(self) -> int:
+        with self._ready:
+            self._collect(time.monotonic())
+            return len(self._received)
+
+    def reset_input_buffer(self):
+        with self._ready:
+            self._collect(time.monotonic())
+            self._received.clear()
+
+    def close(self):
+        self.is_open = False
+        with self._ready:
+            self._ready.notify_all()
@@ -0,0 +1,99 @@
+from typing import Dict, Any, Optional, List
+import threading
+import time
+import numpy as np
+
+
+class SensorRingBuffer:
+    """
+    Fixed-size ring of (timestamp, value) samples for one sensor, stored in two
+    preallocated NumPy arrays so appends never allocate and window aggregates
+    are single vectorized passes.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self._next = 0
+
+    def append(self, timestamp: float, value: float):
+        self.times[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self.count:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {"timestamp": float(self.times[index]), "value": float(self.values[index])}
+
+    def window(self, since: float) -> np.ndarray:
+        """Values with timestamp >= since (unordered; aggregates don't care)."""
+        times, values = self.times[:self.count], self.values[:self.count]
+        return values[times >= since]
+
+    def stats(self, since: float) -> Optional[Dict[str, float]]:
+        values = self.window(since)
+        if not values.size:
+            return None
+        return {
+            "count": int(values.size),
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "std": float(values.std()),
+        }
+
+
+class SensorStore:
+    """
+    Latest readings and short-term history for every sensor the boards report.
+
+    Role:
+    - Accept telemetry from any board's serial reader thread
+    - Keep the last `capacity` samples per sensor in a NumPy ring buffer
+    - Answer latest-value and windowed mean/min/max/std queries
+
+    Sensors on boards other than the default one are named "<board>.<sensor>".
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._buffers: Dict[str, SensorRingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def record(self, readings: Dict[str, float], timestamp: Optional[float] = None, prefix: str = ""):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, value in readings.items():
+                key = f"{prefix}{name}"
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = SensorRingBuffer(self.capacity)
+                buffer.append(timestamp, value)
+
+    def sensors(self) -> List[str]:
+        with self._lock:
+            return sorted(self._buffers)
+
+    def latest(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """Latest reading of one sensor, or of every sensor when `name` is None."""
+        with self._lock:
+            if name is not None:
+                buffer = self._buffers.get(name)
+                return {name: buffer.latest()} if buffer else {}
+            return {key: buffer.latest() for key, buffer in sorted(self._buffers.items())}
+
+    def stats(self, name: str, window: float = 3600.0) -> Optional[Dict[str, Any]]:
+        """Aggregates over the last `window` seconds; None for unknown sensors or an empty window."""
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                return None
+            stats = buffer.stats(time.time() - window)
+        if stats is None:
+            return None
+        return {"sensor": name, "window": window, **stats}
@@ -4,8 +4,10 @@ from config.settings import Settings
 from urllib.parse import urljoin
 import requests
 from ddgs import DDGS
+from app.devices.scheduler import timing_from_request, describe_job
 
 device_controller = None
+device_scheduler = None
 
 class GenericTools:
     @staticmethod
@@ -189,54 +191,46 @@ class GenericTools:
             return str(output)
     
     @staticmethod
-    def get_devices() -> str:
+    def get_devices(location: str = None, type: str = None, status: str = None) -> str:
         """
-        Returns a list of all available smart home devices and their current status.
+        Returns the smart home devices and their current status, optionally filtered.
         
         Args:
-            None
+            location (str, optional): Only devices in this location (e.g., "bedroom", "living room")
+            type (str, optional): Only devices of this type (e.g., "lamp", "ac", "tv")
+            status (str, optional): Only devices with this status ("on" or "off")
             
         Returns:
-            str: JSON string containing all devices with their properties (id, name, type, location, status)
+            str: JSON string containing the matching devices with their properties (id, name, type, location, status)
         
         Example call:
         {
-            "Question": "What devices can I control?",
-            "Thought": "The user wants to know what smart devices are available. I must use the get_devices tool to provide this information.",
+            "Question": "Which lights are on in the bedroom?",
+            "Thought": "The user wants the bedroom lamps that are on. I must use the get_devices tool with location, type and status filters.",
             "tools_used": ["get_devices"],
-            "Answer": "You have several devices in your home that I can control: 
-                      1. A bedroom light (currently off)
-                      2. A living room lamp (currently on)
-                      3. Kitchen light (currently off)
-                      4. Bedroom AC (currently off)
-                      5. Living room TV (currently off)"
+            "Answer": "The bedroom light is currently on."
         }
         """
         global device_controller
         
         if Settings.VERBOSE_LEVEL > 1:
-            print("GenericTools.get_devices called")
+            print(f"GenericTools.get_devices called with location={location}, type={type}, status={status}")
         
         if not device_controller:
             return "Error: Device controller is not initialized"
         
         try:
-            # Get devices from controller
-            devices = device_controller.get_device_states()
-            
-            # Format for better readability
-            formatted_devices = []
+            # Filtered lookups go through the device registry indexes
+            devices = device_controller.query_devices(location=location, type=type, status=status)
             
-            if isinstance(devices, dict):
-                # Convert dictionary to list
-                for device_id, device_data in devices.items():
-                    formatted_devices.append(device_data)
-            else:
-                # Already a list
-                formatted_devices = devices
+            if not devices and (location or type or status):
+                return json.dumps({
+                    "devices": [],
+                    "message": "No devices match the given filters"
+                }, indent=2)
                 
             # Convert to JSON string
-            return json.dumps(formatted_devices, indent=2)
+            return json.dumps(devices, indent=2)
         except Exception as e:
             return f"Error retrieving devices: {str(e)}"
     
@@ -283,5 +277,211 @@ class GenericTools:
         except Exception as e:
             return f"Error controlling device: {str(e)}"
 
+    @staticmethod
+    def control_devices(commands: list) -> str:
+        """
+        Controls several smart home devices at once, e.g. turning off every light in the house.
+        All commands are sent to the hardware together, so prefer this over repeated control_device calls.
+        
+        Args:
+            commands (list): List of {"device_id": str, "action": "on" | "off"} objects
+            
+        Returns:
+            str: Result of each control operation, separated by "; "
+        
+        Example call:
+        {
+            "Question": "Turn off all the lights",
+            "Thought": "The user wants every light off. I should get the devices, then use control_devices with all light IDs in one call.",
+            "tools_used": ["get_devices", "control_devices"],
+            "Answer": "I've turned off the bedroom light and the living room lamp."
+        }
+        """
+        global device_controller
+        
+        if Settings.VERBOSE_LEVEL > 1:
+            print(f"GenericTools.control_devices called with commands={commands}")
+        
+        if not device_controller:
+            return "Error: Device controller is not initialized"
+        
+        if not commands:
+            return "Error: At least one command is required"
+        
+        try:
+            return device_controller.control_devices([
+                {"device_id": c.get("device_id"), "action": c.get("action")}
+                for c in commands
+            ])
+        except Exception as e:
+            return f"Error controlling devices: {str(e)}"
 
+    @staticmethod
+    def schedule_device_action(device_id: str, action: str, delay_minutes: float = None, at: str = None,
+                               repeat: str = None, every_minutes: float = None) -> str:
+        """
+        Schedules a device to be turned on or off later, once or on a recurring basis.
+        
+        Args:
+            device_id (str): The ID of the device to control (e.g., "bedroom_light")
+            action (str): "on" or "off"
+            delay_minutes (float, optional): Run once, this many minutes from now
+            at (str, optional): Time of day "HH:MM" (24h, local time) or an ISO date-time
+            repeat (str, optional): "daily", "weekdays", "weekends" or days like "mon,wed,fri"; requires "at"
+            every_minutes (float, optional): Repeat at a fixed interval
+            
+        Returns:
+            str: JSON of the created schedule (id, next_run_at, ...) or an error message
+        
+        Example call:
+        {
+            "Question": "Turn off the bedroom light in 20 minutes",
+            "Thought": "The user wants a delayed action. I must use schedule_device_action with delay_minutes=20.",
+            "tools_used": ["schedule_device_action"],
+            "Answer": "Okay, the bedroom light will turn off in 20 minutes."
+        }
+        """
+        global device_controller, device_scheduler
+        
+        if Settings.VERBOSE_LEVEL > 1:
+            print(f"GenericTools.schedule_device_action called with device_id={device_id}, action={action}, "
+                  f"delay_minutes={delay_minutes}, at={at}, repeat={repeat}, every_minutes={every_minutes}")
+        
+        if not device_scheduler:
+            return "Error: Scheduler is not initialized"
+        
+        if action not in ["on", "off"]:
+            return "Error: Action must be 'on' or 'off'"
+        
+        if device_controller and device_id not in device_controller.get_device_states():
+            return f"Error: Device '{device_id}' not found"
+        
+        try:
+            timing = timing_from_request(delay_minutes, at, repeat, every_minutes)
+            job = device_scheduler.schedule([{"device_id": device_id, "action": action}],
+                                            name=f"{device_id} {action}", **timing)
+            return json.dumps(describe_job(job), indent=2)
+        except Exception as e:
+            return f"Error scheduling action: {str(e)}"
+    
+    @staticmethod
+    def list_schedules() -> str:
+        """
+        Lists the scheduled device actions, soonest first.
+        
+        Returns:
+            str: JSON list of schedules with their id, commands, next_run_at and recurrence
+        
+        Example call:
+        {
+            "Question": "What timers are set?",
+            "Thought": "The user wants the scheduled actions. I must use the list_schedules tool.",
+            "tools_used": ["list_schedules"],
+            "Answer": "The bedroom light turns off at 23:00 every day."
+        }
+        """
+        global device_scheduler
+        
+        if not device_scheduler:
+            return "Error: Scheduler is not initialized"
+        
+        jobs = [describe_job(job) for job in device_scheduler.list_jobs()]
+        if not jobs:
+            return json.dumps({"schedules": [], "message": "No scheduled actions"}, indent=2)
+        return json.dumps(jobs, indent=2)
+    
+    @staticmethod
+    def cancel_schedule(schedule_id: str) -> str:
+        """
+        Cancels a scheduled device action.
+        
+        Args:
+            schedule_id (str): The id returned by schedule_device_action or list_schedules
+            
+        Returns:
+            str: Confirmation or an error message
+        
+        Example call:
+        {
+            "Question": "Cancel the morning lights",
+            "Thought": "I need the schedule id, so I list the schedules first and then cancel the matching one.",
+            "tools_used": ["list_schedules", "cancel_schedule"],
+            "Answer": "I've cancelled the weekday 07:00 lights schedule."
+        }
+        """
+        global device_scheduler
+        
+        if not device_scheduler:
+            return "Error: Scheduler is not initialized"
+        
+        if device_scheduler.cancel(schedule_id):
+            return f"Schedule '{schedule_id}' cancelled"
+        return f"Error: Schedule '{schedule_id}' not found"
 
+    @staticmethod
+    def get_sensor_reading(sensor: str = None) -> str:
+        """
+        Returns the latest reading of a sensor reported by the Arduino boards (temperature, humidity, motion, ...).
+        
+        Args:
+            sensor (str, optional): Sensor name (e.g., "temperature"); omit to get every sensor
+            
+        Returns:
+            str: JSON mapping sensor names to {"timestamp", "value"}
+        
+        Example call:
+        {
+            "Question": "How warm is it inside?",
+            "Thought": "The user wants the current temperature. I must use get_sensor_reading for the temperature sensor.",
+            "tools_used": ["get_sensor_reading"],
+            "Answer": "It's 22.4°C inside right now."
+        }
+        """
+        global device_controller
+        
+        if Settings.VERBOSE_LEVEL > 1:
+            print(f"GenericTools.get_sensor_reading called with sensor={sensor}")
+        
+        sensors = getattr(device_controller, "sensors", None)
+        if sensors is None:
+            return "Error: Sensor telemetry is not available"
+        
+        readings = sensors.latest(sensor)
+        if not readings:
+            return json.dumps({"sensors": sensors.sensors(),
+                               "message": f"No readings for '{sensor}'" if sensor else "No sensor readings yet"}, indent=2)
+        return json.dumps(readings, indent=2)
+    
+    @staticmethod
+    def get_sensor_stats(sensor: str, window_minutes: float = 60) -> str:
+        """
+        Returns the mean, minimum and maximum of a sensor over a recent time window.
+        
+        Args:
+            sensor (str): Sensor name (e.g., "temperature")
+            window_minutes (float, optional): How far back to look, in minutes (default 60)
+            
+        Returns:
+            str: JSON with count, mean, min, max and std over the window
+        
+        Example call:
+        {
+            "Question": "What was the highest temperature in the last hour?",
+            "Thought": "The user wants the maximum over an hour. I must use get_sensor_stats with window_minutes=60.",
+            "tools_used": ["get_sensor_stats"],
+            "Answer": "The highest temperature in the last hour was 23.1°C."
+        }
+        """
+        global device_controller
+        
+        if Settings.VERBOSE_LEVEL > 1:
+            print(f"GenericTools.get_sensor_stats called with sensor={sensor}, window_minutes={window_minutes}")
+        
+        sensors = getattr(device_controller, "sensors", None)
+        if sensors is None:
+            return "Error: Sensor telemetry is not available"
+        
+        stats = sensors.stats(sensor, float(window_minutes) * 60)
+        if stats is None:
+            return f"Error: No readings for '{sensor}' in the last {window_minutes} minutes"
+        return json.dumps(stats, indent=2)
@@ -80,10 +80,24 @@ TOOLS = {
     
     # Device control tools
     "get_devices": {
-        "description": "Get a list of all available smart home devices and their current status.",
+        "description": "Get smart home devices and their current status. Use the optional filters to fetch only the devices you need.",
         "parameters": {
             "type": "object",
-            "properties": {},
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Only return devices in this location (e.g., 'bedroom', 'living_room')."
+                },
+                "type": {
+                    "type": "string",
+                    "description": "Only return devices of this type (e.g., 'lamp', 'ac', 'tv')."
+                },
+                "status": {
+                    "type": "string",
+                    "enum": ["on", "off"],
+                    "description": "Only return devices that are currently 'on' or 'off'."
+                }
+            },
             "required": []
         },
         "function_docstring": GenericTools.get_devices.__doc__,
@@ -109,5 +123,136 @@ TOOLS = {
         },
         "function_docstring": GenericTools.control_device.__doc__,
         "function": GenericTools.control_device
+    },
+    
+    "control_devices": {
+        "description": "Control several smart home devices at once (e.g. all lights in a room or the whole house) in a single step.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "commands": {
+                    "type": "array",
+                    "description": "Devices to control, each with its own action.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "device_id": {
+                                "type": "string",
+                                "description": "ID of the device to control (e.g., 'bedroom_light', 'living_lamp')."
+                            },
+                            "action": {
+                                "type": "string",
+                                "enum": ["on", "off"],
+                                "description": "Action to perform on the device, either 'on' or 'off'."
+                            }
+                        },
+                        "required": ["device_id", "action"]
+                    }
+                }
+            },
+            "required": ["commands"]
+        },
+        "function_docstring": GenericTools.control_devices.__doc__,
+        "function": GenericTools.control_devices
+    },
+    
+    "schedule_device_action": {
+        "description": "Schedule a device to turn on or off later: once after a delay or at a time, or repeating (daily, weekdays, given days, or every N minutes).",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "device_id": {
+                    "type": "string",
+                    "description": "ID of the device to control (e.g., 'bedroom_light', 'living_lamp')."
+                },
+                "action": {
+                    "type": "string",
+                    "enum": ["on", "off"],
+                    "description": "Action to perform on the device, either 'on' or 'off'."
+                },
+                "delay_minutes": {
+                    "type": "number",
+                    "description": "Run once, this many minutes from now."
+                },
+                "at": {
+                    "type": "string",
+                    "description": "Time of day 'HH:MM' (24h, local) or an ISO date-time."
+                },
+                "repeat": {
+                    "type": "string",
+                    "description": "'daily', 'weekdays', 'weekends' or days like 'mon,wed,fri'. Requires 'at'."
+                },
+                "every_minutes": {
+                    "type": "number",
+                    "description": "Repeat at this fixed interval in minutes."
+                }
+            },
+            "required": ["device_id", "action"]
+        },
+        "function_docstring": GenericTools.schedule_device_action.__doc__,
+        "function": GenericTools.schedule_device_action
+    },
+    
+    "list_schedules": {
+        "description": "List the scheduled device actions and when they run next.",
+        "parameters": {
+            "type": "object",
+            "properties": {},
+            "required": []
+        },
+        "function_docstring": GenericTools.list_schedules.__doc__,
+        "function": GenericTools.list_schedules
+    },
+    
+    "cancel_schedule": {
+        "description": "Cancel a scheduled device action by its id (from list_schedules).",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "schedule_id": {
+                    "type": "string",
+                    "description": "ID of the schedule to cancel."
+                }
+            },
+            "required": ["schedule_id"]
+        },
+        "function_docstring": GenericTools.cancel_schedule.__doc__,
+        "function": GenericTools.cancel_schedule
+    },
+    
+    "get_sensor_reading": {
+        "description": "Get the latest sensor readings (temperature, humidity, motion, ...) reported by the Arduino boards.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sensor": {
+                    "type": "string",
+                    "description": "Sensor name (e.g., 'temperature'). Omit to get every sensor."
+                }
+            },
+            "required": []
+        },
+        "function_docstring": GenericTools.get_sensor_reading.__doc__,
+        "function": GenericTools.get_sensor_reading
+    },
+    
+    "get_sensor_stats": {
+        "description": "Get the mean, min and max of a sensor over a recent time window.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sensor": {
+                    "type": "string",
+                    "description": "Sensor name (e.g., 'temperature')."
+                },
+                "window_minutes": {
+                    "type": "number",
+                    "description": "How far back to look, in minutes (default 60)."
+                }
+            },
+            "required": ["sensor"]
+        },
+        "function_docstring": GenericTools.get_sensor_stats.__doc__,
+        "function": GenericTools.get_sensor_stats
     }
 }
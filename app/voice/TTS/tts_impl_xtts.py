@@ -4,6 +4,7 @@ import torch
 from TTS.api import TTS
 from config.settings import Settings
 from .base import VoiceAssistantInterface
+from ..model_manager import idle_timeout, model_manager, should_preload
 from colorama import init, Fore, Style
 
 # Initialize colorama for Windows compatibility
@@ -32,13 +33,27 @@ class XTTS_TTS(VoiceAssistantInterface):
         self.speaker_female = Settings.XTTS_FEMALE_VOICE
         self.speech_rate = Settings.XTTS_SPEED
         
-        self._initialize_tts()
+        # Loaded on first use or at startup (MODEL_PRELOAD), unloaded when idle
+        model_manager.register("tts", load=self._load_tts, unload=self._unload_tts,
+                               warmup=self._warmup_tts, idle_timeout=idle_timeout())
+        if should_preload("tts"):
+            self._initialize_tts()
+
+    def _load_tts(self):
+        print(f"{Fore.YELLOW}Initializing XTTS model...{Style.RESET_ALL}")
+        return TTS(model_path=self.model_path, config_path=self.config_path).to(self.device)
+
+    def _unload_tts(self, model):
+        self.tts = None
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def _warmup_tts(self, model):
+        model.tts(text="Ready.", speaker=self.speaker_female, language="en")
 
     def _initialize_tts(self):
         """Lazy initialization of the TTS model"""
-        if self.tts is None:
-            print(f"{Fore.YELLOW}Initializing XTTS model...{Style.RESET_ALL}")
-            self.tts = TTS(model_path=self.model_path, config_path=self.config_path).to(self.device)
+        self.tts = model_manager.get("tts")
 
     
     def synthesize_to_file(self, text: str, output_path: str = None, voice: str = "male") -> str:
@@ -54,6 +69,10 @@ class XTTS_TTS(VoiceAssistantInterface):
         Returns:
             Filename (not full path) of the generated audio file in the download folder
         """
+        with model_manager.use("tts"):
+            return self._synthesize_to_file(text, output_path, voice)
+
+    def _synthesize_to_file(self, text: str, output_path: str, voice: str) -> str:
         try:
             
             self._initialize_tts()
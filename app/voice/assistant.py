@@ -0,0 +1,114 @@
+from typing import Iterable, Iterator, Optional
+import os
+import numpy as np
+from colorama import Fore, Style, init
+from config.settings import Settings
+from .base import VoiceAssistantInterface
+from .audio_decode import SAMPLE_RATE, decode_audio
+from .stt_stream import StreamingTranscription
+from .wake_word import WakeWordDetector, WakeWordModel
+from .whisper_stt import command_profile
+
+init(autoreset=True)
+
+
+class WakeWordAssistant(VoiceAssistantInterface):
+    """
+    Hands-free voice loop: wake word, then one command.
+
+    Role:
+    - Listen to the microphone continuously with the cheap WakeWordDetector
+    - After the wake word, collect the command with voice-activity endpointing
+      (StreamingTranscription) and hand only that utterance to Whisper
+    - Speak responses through the configured TTS engine
+
+    Whisper never sees audio before the wake word, so an idle assistant costs
+    the detector's few percent of a core instead of a transcription loop.
+    """
+
+    def __init__(self, stt, tts=None, detector: Optional[WakeWordDetector] = None,
+                 block_size: int = 512, command_timeout: Optional[float] = None):
+        self.stt = stt
+        self.tts = tts
+        if detector is None:
+            model = WakeWordModel.load(Settings.WAKE_WORD_MODEL_PATH)
+            threshold = getattr(Settings, "WAKE_WORD_THRESHOLD", "")
+            detector = WakeWordDetector(model, threshold=float(threshold) if threshold else None)
+        self.detector = detector
+        self.block_size = block_size
+        self.command_timeout = command_timeout if command_timeout is not None else \
+            float(getattr(Settings, "WAKE_WORD_COMMAND_TIMEOUT", "6"))
+
+    def wait_for_command(self) -> str:
+        """Block until the wake word is followed by a command; return its transcript."""
+        return self.listen(self._microphone())
+
+    def listen(self, blocks: Iterable[bytes]) -> str:
+        """
+        Same as wait_for_command over any source of 16 kHz 16-bit mono PCM blocks.
+        Returns "" if the source ends first.
+        """
+        blocks = iter(blocks)
+        while True:
+            if not self._wait_for_wake_word(blocks):
+                return ""
+            print(f"{Fore.GREEN}[WakeWordAssistant] Wake word detected (score "
+                  f"{self.detector.last_score:.2f}), listening for a command{Style.RESET_ALL}")
+            command = self._record_command(blocks)
+            text = self.stt.transcribe_audio(command, command_profile()).strip() if command is not None else ""
+            if text.startswith("[STT Error]"):
+                print(f"{Fore.RED}[WakeWordAssistant] {text}{Style.RESET_ALL}")
+            elif text:
+                return text
+            # Nothing usable; if the source ended, the next wait returns ""
+            print(f"{Fore.YELLOW}[WakeWordAssistant] No command heard, waiting for the wake word{Style.RESET_ALL}")
+
+    def speak(self, message: str) -> None:
+        if self.tts is None:
+            print(f"{Fore.MAGENTA}[WakeWordAssistant] {message}{Style.RESET_ALL}")
+            return
+        filename = self.tts.synthesize_to_file(message)
+        with open(os.path.join(Settings.DOWNLOAD_FOLDER_PATH, filename), "rb") as f:
+            audio = decode_audio(f.read())
+        if audio is None:
+            return
+        import sounddevice as sd
+        sd.play(audio, SAMPLE_RATE)
+        sd.wait()
+
+    def _wait_for_wake_word(self, blocks: Iterator[bytes]) -> bool:
+        self.detector.reset()
+        for block in blocks:
+            if self.detector.feed(np.frombuffer(block, dtype="<i2").astype(np.float32) / 32768.0):
+                return True
+        return False
+
+    def _record_command(self, blocks: Iterator[bytes]) -> Optional[np.ndarray]:
+        """Audio of the first utterance after the wake word; None if none starts within command_timeout or the source ends."""
+        stream = StreamingTranscription(
+            end_silence=int(getattr(Settings, "STT_STREAM_END_SILENCE_MS", "400")) / 1000)
+        deadline = self.command_timeout * SAMPLE_RATE
+        received = 0
+        started = False
+        for block in blocks:
+            received += len(block) // 2
+            for action in stream.feed(block):
+                if action["type"] == "speech_start":
+                    started = True
+                elif action["type"] == "final":
+                    return action["audio"]
+                elif action["type"] == "discard":
+                    started = False
+            if not started and received >= deadline:
+                break
+        return None
+
+    def _microphone(self) -> Iterator[bytes]:
+        import sounddevice as sd
+        with sd.RawInputStream(samplerate=SAMPLE_RATE, channels=1, dtype="int16",
+                               blocksize=self.block_size) as stream:
+            while True:
+                data, overflowed = stream.read(self.block_size)
+                if overflowed:
+                    print(f"{Fore.YELLOW}[WakeWordAssistant] Microphone overflow{Style.RESET_ALL}")
+                yield bytes(data)
@@ -0,0 +1,133 @@
+from typing import Optional, Tuple
+from math import gcd
+import io
+import struct
+import numpy as np
+from scipy.signal import resample_poly
+
+try:
+    import soundfile
+except ImportError:  # FLAC/Ogg then go through the ffmpeg fallback
+    soundfile = None
+
+SAMPLE_RATE = 16000  # What Whisper expects
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _parse_wav(data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Read a RIFF/WAVE file straight from memory. Returns (samples as float32,
+    shape (frames, channels), sample rate), or None for encodings other than
+    integer PCM and IEEE float.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = data[offset:offset + 4], struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (tag, channels, rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            # Recorders that stream often leave the size at 0 or 0xFFFFFFFF
+            payload = data[body:body + size] if 0 < size < len(data) else data[body:]
+            samples = _pcm_to_float(payload, *fmt)
+            return None if samples is None else (samples, fmt[2])
+        offset = body + size + (size & 1)
+    return None
+
+
+def _pcm_to_float(payload: bytes, tag: int, channels: int, rate: int, bits: int) -> Optional[np.ndarray]:
+    width = bits // 8
+    if not channels or not rate or width not in (1, 2, 3, 4):
+        return None
+    payload = payload[:len(payload) - len(payload) % (width * channels)]
+    if tag == _WAVE_FORMAT_FLOAT and width == 4:
+        samples = np.frombuffer(payload, dtype="<f4").astype(np.float32)
+    elif tag != _WAVE_FORMAT_PCM:
+        return None
+    elif width == 1:
+        samples = (np.frombuffer(payload, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        # Widen 24-bit little-endian samples to int32 by placing them in the top 3 bytes
+        raw = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((raw.shape[0], 4), dtype=np.uint8)
+        widened[:, 1:] = raw
+        samples = widened.view("<i4").ravel().astype(np.float32) / 2147483648.0
+    else:
+        samples = np.frombuffer(payload, dtype="<i4").astype(np.float32) / 2147483648.0
+    return samples.reshape(-1, channels)
+
+
+def _content_type_params(content_type: str) -> Tuple[str, dict]:
+    media_type, *params = [part.strip() for part in content_type.split(";")]
+    values = {}
+    for param in params:
+        key, _, value = param.partition("=")
+        values[key.strip().lower()] = value.strip()
+    return media_type.lower(), values
+
+
+def _parse_raw_pcm(data: bytes, content_type: str) -> Optional[Tuple[np.ndarray, int]]:
+    """Headerless 16-bit PCM, e.g. "audio/L16;rate=16000;channels=1" (big-endian per RFC 2586) or "audio/pcm"."""
+    media_type, params = _content_type_params(content_type)
+    if media_type not in ("audio/l16", "audio/pcm", "audio/x-raw"):
+        return None
+    try:
+        rate = int(params.get("rate", SAMPLE_RATE))
+        channels = int(params.get("channels", 1))
+    except ValueError:
+        return None
+    dtype = ">i2" if media_type == "audio/l16" else "<i2"
+    payload = data[:len(data) - len(data) % (2 * channels)]
+    samples = np.frombuffer(payload, dtype=dtype).astype(np.float32) / 32768.0
+    return samples.reshape(-1, channels), rate
+
+
+def _parse_with_soundfile(data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    if soundfile is None:
+        return None
+    try:
+        samples, rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except Exception:
+        return None
+    return samples, rate
+
+
+def to_model_input(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Mix down to mono and resample to 16 kHz float32 with a polyphase filter."""
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    if rate != SAMPLE_RATE and samples.size:
+        divisor = gcd(rate, SAMPLE_RATE)
+        samples = resample_poly(samples, SAMPLE_RATE // divisor, rate // divisor)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+def decode_audio(data: bytes, content_type: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Decode uploaded audio bytes into the 16 kHz mono float32 array Whisper
+    takes, without touching the disk or spawning ffmpeg.
+
+    Handles WAV (integer PCM and float), raw 16-bit PCM announced by its
+    content type and, when the soundfile package is installed, FLAC and Ogg.
+    Returns None for anything else so the caller can fall back to ffmpeg.
+    """
+    decoded = _parse_wav(data)
+    if decoded is None and content_type:
+        decoded = _parse_raw_pcm(data, content_type)
+    if decoded is None:
+        decoded = _parse_with_soundfile(data)
+    if decoded is None:
+        return None
+    samples, rate = decoded
+    return to_model_input(samples, rate)
@@ -0,0 +1,184 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import multiprocessing
+import re
+import numpy as np
+from .stt_backends import STTBackend, create_stt_backend
+from .stt_profiles import DecodingProfile
+from .vad import SAMPLE_RATE, detect_speech, frame_energy_db
+
+MAX_CHUNK_SECONDS = 28.0  # Stays inside Whisper's 30 s window with room for the overlap
+CUT_SEARCH_SECONDS = 5.0  # Continuous speech is cut at the quietest point of its last few seconds
+
+
+class Chunk:
+    """A span of a long recording, transcribed on its own. `overlap` samples repeat the end of the previous chunk."""
+
+    def __init__(self, index: int, start: int, end: int, overlap: int = 0):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.overlap = overlap
+
+    def describe(self, sample_rate: int = SAMPLE_RATE) -> Dict[str, Any]:
+        return {"index": self.index, "start": round(self.start / sample_rate, 2),
+                "end": round(self.end / sample_rate, 2)}
+
+
+def _quietest_cut(audio: np.ndarray, low: int, high: int, sample_rate: int) -> int:
+    """Sample index of the quietest 30 ms frame between `low` and `high`."""
+    frame_length = sample_rate * 30 // 1000
+    energy = frame_energy_db(audio[low:high], frame_length)
+    if energy.size == 0:
+        return high
+    return low + int(np.argmin(energy)) * frame_length + frame_length // 2
+
+
+def plan_chunks(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, max_seconds: float = MAX_CHUNK_SECONDS,
+                overlap_seconds: float = 1.0, **vad_options) -> List[Chunk]:
+    """
+    Split a recording into chunks of at most `max_seconds` for independent transcription.
+
+    Speech segments come from detect_speech; chunk boundaries fall in the
+    pauses between them, and silence longer than a pause is left out. A
+    segment longer than `max_seconds` (nobody paused) is cut at its quietest
+    point near the limit, and the next chunk starts `overlap_seconds` earlier
+    so a word cut there is heard whole by one of them; stitch() removes the
+    words both transcribed.
+    """
+    max_length = int(max_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    search = int(min(CUT_SEARCH_SECONDS, max_seconds / 2) * sample_rate)
+
+    pieces = []  # (start, end, overlap with the previous piece)
+    for start, end in detect_speech(audio, sample_rate, **vad_options):
+        carried = 0
+        while end - start > max_length:
+            cut = _quietest_cut(audio, start + max_length - search, start + max_length, sample_rate)
+            pieces.append((start, cut, carried))
+            start, carried = cut - overlap, overlap
+        pieces.append((start, end, carried))
+
+    chunks: List[Chunk] = []
+    for start, end, carried in pieces:
+        if chunks and not carried and end - chunks[-1].start <= max_length:
+            chunks[-1].end = end
+        else:
+            chunks.append(Chunk(len(chunks), start, end, carried))
+    return chunks
+
+
+def _word_key(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _dedupe_overlap(previous: List[str], following: List[str], max_words: int = 12) -> List[str]:
+    """
+    `following` without the words it repeats from the end of `previous`.
+
+    Looks for the longest run of words (case and punctuation ignored) that
+    ends `previous` and starts `following`. Up to two words at the cut may be
+    fragments only one side transcribed, so the run may end a word or two
+    before the end of `previous` and start a word or two into `following`.
+    """
+    prev_keys = [_word_key(word) for word in previous[-(max_words + 2):]]
+    next_keys = [_word_key(word) for word in following[:max_words + 2]]
+    for length in range(min(max_words, len(prev_keys), len(next_keys)), 0, -1):
+        for skipped in range(3):
+            for dropped in range(3):
+                if (skipped or dropped) and length < 2:
+                    continue
+                tail_end = len(prev_keys) - dropped
+                if tail_end - length < 0 or skipped + length > len(next_keys):
+                    continue
+                if prev_keys[tail_end - length:tail_end] == next_keys[skipped:skipped + length]:
+                    # Keep the previous side's copy; drop the fragment (if any) after it as well
+                    del previous[len(previous) - dropped:]
+                    return following[skipped + length:]
+    return following
+
+
+def stitch(texts: List[str], chunks: List[Chunk]) -> str:
+    """Join chunk transcripts in order, removing words repeated across overlapping cuts."""
+    words: List[str] = []
+    for text, chunk in zip(texts, chunks):
+        following = text.split()
+        if chunk.overlap and words:
+            following = _dedupe_overlap(words, following)
+        words.extend(following)
+    return " ".join(words)
+
+
+class LongFormTranscription:
+    """
+    Transcribes a long recording as many chunks at once.
+
+    Role:
+    - Split the audio at pauses (plan_chunks)
+    - Keep up to `max_in_flight` chunks running through `submit`, a callable
+      returning a Future for one chunk's transcript: a process pool, or the
+      in-process BatchedTranscriber
+    - Report each chunk as soon as it finishes, then the stitched transcript
+
+    `run` yields {"type": "plan", "chunks"}, one {"type": "chunk", "index",
+    "start", "end", "text"} per chunk in completion order, and finally
+    {"type": "final", "text", "chunks"}.
+    """
+
+    def __init__(self, submit: Callable[[np.ndarray, Optional[DecodingProfile]], Future],
+                 max_in_flight: int = 4, max_seconds: float = MAX_CHUNK_SECONDS, overlap_seconds: float = 1.0):
+        self.submit = submit
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_seconds = max_seconds
+        self.overlap_seconds = overlap_seconds
+
+    def run(self, audio: np.ndarray, profile: Optional[DecodingProfile] = None, **vad_options) -> Iterator[Dict[str, Any]]:
+        chunks = plan_chunks(audio, max_seconds=self.max_seconds, overlap_seconds=self.overlap_seconds, **vad_options)
+        yield {"type": "plan", "chunks": len(chunks), "duration": round(audio.size / SAMPLE_RATE, 2)}
+
+        texts: List[Optional[str]] = [None] * len(chunks)
+        pending: Dict[Future, Chunk] = {}
+        queued = iter(chunks)
+        try:
+            while True:
+                while len(pending) < self.max_in_flight:
+                    chunk = next(queued, None)
+                    if chunk is None:
+                        break
+                    pending[self.submit(audio[chunk.start:chunk.end], profile)] = chunk
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    texts[chunk.index] = future.result().strip()
+                    yield dict(chunk.describe(), type="chunk", text=texts[chunk.index])
+        finally:
+            for future in pending:
+                future.cancel()
+        yield {"type": "final", "text": stitch(texts, chunks), "chunks": len(chunks)}
+
+
+# One model per worker process, loaded by the pool initializer
+_worker_backend: Optional[STTBackend] = None
+
+
+def _init_worker(backend_name: str, options: Dict[str, Any]):
+    global _worker_backend
+    _worker_backend = create_stt_backend(backend_name, **options)
+    _worker_backend.load()
+
+
+def transcribe_chunk(audio: np.ndarray, profile: Optional[DecodingProfile] = None) -> str:
+    """Runs in a pool worker."""
+    return _worker_backend.transcribe(audio, profile)
+
+
+def start_pool(workers: int, backend_name: str, options: Dict[str, Any]) -> ProcessPoolExecutor:
+    """
+    Worker processes that each load their own copy of the backend. They are
+    spawned rather than forked, so they don't inherit the parent's threads or
+    its loaded model.
+    """
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(backend_name, options))
@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import gc
+import threading
+import time
+from colorama import Fore, Style, init
+from config.settings import Settings
+
+init(autoreset=True)
+
+
+class _Entry:
+    """One registered model and its load/use bookkeeping."""
+
+    def __init__(self, name: str, load: Callable[[], Any], unload: Optional[Callable[[Any], None]],
+                 warmup: Optional[Callable[[Any], None]], idle_timeout: float):
+        self.name = name
+        self.load = load
+        self.unload = unload
+        self.warmup = warmup
+        self.idle_timeout = idle_timeout
+        self.model = None
+        self.lock = threading.Lock()  # Held while loading/unloading so only one thread does it
+        self.in_use = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+
+
+class ModelManager:
+    """
+    Owns the lifecycle of the heavy voice models (Whisper, XTTS).
+
+    Role:
+    - Load each model on first use, or up front when the startup policy asks
+    - Run a warm-up inference right after loading so the first real request is fast
+    - Unload models nobody has used for `idle_timeout` seconds (0 keeps them resident)
+    - Never unload a model while a caller is inside `use()`
+
+    Loading goes through the callbacks given to `register`; memory mapping of
+    weight files is up to each loader (see OpenAIWhisperBackend).
+    """
+
+    def __init__(self, check_interval: float = 30.0):
+        self.check_interval = check_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, name: str, load: Callable[[], Any], unload: Optional[Callable[[Any], None]] = None,
+                 warmup: Optional[Callable[[Any], None]] = None, idle_timeout: float = 0.0):
+        """Add (or replace) a model. Replacing unloads the previous one first."""
+        with self._lock:
+            previous = self._entries.get(name)
+        if previous is not None:
+            self.unload(name)
+        with self._lock:
+            self._entries[name] = _Entry(name, load, unload, warmup, idle_timeout)
+            if idle_timeout > 0 and self._reaper is None:
+                self._stop.clear()
+                self._reaper = threading.Thread(target=self._reap, name="ModelManager", daemon=True)
+                self._reaper.start()
+
+    def is_registered(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading (and warming up) it first if needed."""
+        entry = self._entry(name)
+        entry.last_used = time.monotonic()
+        if entry.model is not None:
+            return entry.model
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            return entry.model
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """Hold the model for the duration of one inference; the idle reaper waits for it."""
+        entry = self._entry(name)
+        with entry.lock:
+            entry.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def unload(self, name: str) -> bool:
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None or entry.in_use:
+                return False
+            model, entry.model = entry.model, None
+            if entry.unload:
+                try:
+                    entry.unload(model)
+                except Exception as e:
+                    print(f"{Fore.YELLOW}[ModelManager] Unloading {name} failed: {e}{Style.RESET_ALL}")
+            del model
+        gc.collect()
+        print(f"{Fore.CYAN}[ModelManager] Unloaded {name}{Style.RESET_ALL}")
+        return True
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            entry.name: {
+                "loaded": entry.model is not None,
+                "in_use": entry.in_use,
+                "loads": entry.loads,
+                "load_seconds": round(entry.load_seconds, 3),
+                "warmup_seconds": round(entry.warmup_seconds, 3),
+                "idle_seconds": round(now - entry.last_used, 1) if entry.last_used else None,
+                "idle_timeout": entry.idle_timeout,
+            }
+            for entry in entries
+        }
+
+    def close(self):
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=2)
+            self._reaper = None
+
+    def _entry(self, name: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not registered")
+        return entry
+
+    def _load(self, entry: _Entry):
+        started = time.perf_counter()
+        model = entry.load()
+        entry.load_seconds = time.perf_counter() - started
+        entry.loads += 1
+        if entry.warmup:
+            started = time.perf_counter()
+            try:
+                entry.warmup(model)
+            except Exception as e:
+                print(f"{Fore.YELLOW}[ModelManager] Warm-up of {entry.name} failed: {e}{Style.RESET_ALL}")
+            entry.warmup_seconds = time.perf_counter() - started
+        entry.model = model
+        entry.last_used = time.monotonic()
+        print(f"{Fore.GREEN}[ModelManager] {entry.name} ready (load {entry.load_seconds:.2f}s, "
+              f"warm-up {entry.warmup_seconds:.2f}s){Style.RESET_ALL}")
+
+    def _reap(self):
+        while not self._stop.wait(self.check_interval):
+            now = time.monotonic()
+            with self._lock:
+                entries = list(self._entries.values())
+            for entry in entries:
+                if (entry.idle_timeout > 0 and entry.model is not None and not entry.in_use
+                        and now - entry.last_used >= entry.idle_timeout):
+                    self.unload(entry.name)
+
+
+def should_preload(name: str) -> bool:
+    """MODEL_PRELOAD lists the models loaded (and warmed up) at startup, e.g. "stt,tts" or "none"."""
+    policy = str(getattr(Settings, "MODEL_PRELOAD", "stt,tts")).lower()
+    return name in [part.strip() for part in policy.split(",")] or policy.strip() == "all"
+
+
+def idle_timeout() -> float:
+    return float(getattr(Settings, "MODEL_IDLE_UNLOAD_SECONDS", "0"))
+
+
+# Shared by WhisperSTT and the TTS engines in this process
+model_manager = ModelManager()
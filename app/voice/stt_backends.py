@@ -0,0 +1,338 @@
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Union
+import os
+import traceback
+import numpy as np
+from colorama import Fore, Style, init
+from .stt_profiles import DecodingProfile
+
+# Initialize colorama for Windows compatibility
+init(autoreset=True)
+
+STT_BACKENDS = ("whisper", "faster-whisper")
+WINDOW_SAMPLES = 30 * 16000  # Whisper's encoder always sees one 30-second window
+
+
+class STTBackend(ABC):
+    """
+    A speech-to-text engine behind WhisperSTT.
+
+    Role:
+    - Load the model once, lazily
+    - Turn an audio file, or 16 kHz mono float32 samples, into text
+    - Decode with the options of a DecodingProfile (None keeps the engine's defaults)
+    """
+
+    name = ""
+
+    def __init__(self, model_size: str = "base"):
+        self.model_size = model_size
+        self.model = None
+
+    @abstractmethod
+    def load(self) -> Any:
+        """Load the model if it is not loaded yet and return it."""
+        pass
+
+    def unload(self, model: Any = None):
+        """Drop the model so its memory can be reclaimed; the next load() reads it again."""
+        self.model = None
+
+    def cache_id(self) -> str:
+        """Identifies the model and decode options; part of every transcript cache key."""
+        return f"{self.name}:{self.model_size}"
+
+    @abstractmethod
+    def transcribe(self, audio: Union[str, np.ndarray], profile: Optional[DecodingProfile] = None) -> str:
+        """Transcribe one audio file or decoded clip and return the text."""
+        pass
+
+    def transcribe_batch(self, clips: List[np.ndarray], profile: Optional[DecodingProfile] = None) -> List[str]:
+        """Transcribe several decoded clips; backends that can batch the encoder override this."""
+        return [self.transcribe(clip, profile) for clip in clips]
+
+    @abstractmethod
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        """Decode any file the engine's own loader understands to 16 kHz mono float32."""
+        pass
+
+
+class OpenAIWhisperBackend(STTBackend):
+    """Reference openai-whisper PyTorch model (fp32 on CPU)."""
+
+    name = "whisper"
+
+    def __init__(self, model_size: str = "base", model_path: Optional[str] = None, cpu_threads: int = 0,
+                 mmap: bool = True):
+        super().__init__(model_size)
+        self.model_path = model_path
+        self.cpu_threads = cpu_threads
+        self.mmap = mmap
+
+    def _load_checkpoint(self, path: str):
+        """
+        Build the model around weights memory-mapped read-only from `path`, so
+        every worker process maps the same page-cache pages instead of holding
+        its own copy. Falls back to a normal load where torch can't mmap the file.
+        """
+        import torch
+        import whisper
+        if self.mmap:
+            try:
+                checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=False)
+                model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+                model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+                print(f"{Fore.CYAN}[STT DEBUG] Weights memory-mapped from {path}{Style.RESET_ALL}")
+                return model.eval()
+            except Exception as e:
+                print(f"{Fore.YELLOW}[STT] Memory-mapped load failed, loading normally: {str(e)}{Style.RESET_ALL}")
+        return whisper.load_model(path)
+
+    def _clear_corrupted_model(self, model_dir):
+        """Clear corrupted model files from the directory"""
+        # try:
+        #     if os.path.exists(model_dir):
+        #         print(f"{Fore.YELLOW}[STT] Clearing corrupted model files from {model_dir}{Style.RESET_ALL}")
+        #         shutil.rmtree(model_dir)
+        #         os.makedirs(model_dir, exist_ok=True)
+
+        # except Exception as e:
+        #     print(f"{Fore.RED}[STT] Warning: Could not clear model directory: {str(e)}{Style.RESET_ALL}")
+        pass
+
+    def load(self):
+        """Load the Whisper model if not already loaded"""
+        if self.model is not None:
+            return self.model
+        import whisper
+        if self.cpu_threads > 0:
+            import torch
+            torch.set_num_threads(self.cpu_threads)
+        print(f"{Fore.CYAN}[STT] Loading Whisper {self.model_size} model...{Style.RESET_ALL}")
+
+        # Use the local model file if it's the base model
+        if self.model_size == "base" and self.model_path:
+            try:
+                local_model_path = self.model_path
+                local_model_dir = os.path.dirname(local_model_path)
+                print(f"{Fore.CYAN}[STT DEBUG] Local model path: {local_model_path}{Style.RESET_ALL}")
+                print(f"{Fore.CYAN}[STT DEBUG] Local model directory: {local_model_dir}{Style.RESET_ALL}")
+
+                # Try loading existing model first
+                if os.path.exists(local_model_path):
+                    try:
+                        print(f"{Fore.GREEN}[STT] Using local model file: {local_model_path}{Style.RESET_ALL}")
+                        file_size = os.path.getsize(local_model_path)
+                        print(f"{Fore.CYAN}[STT DEBUG] Model file size: {file_size} bytes{Style.RESET_ALL}")
+                        self.model = self._load_checkpoint(local_model_path)
+                        print(f"{Fore.GREEN}[STT] Model loaded successfully{Style.RESET_ALL}")
+                        return self.model
+                    except Exception as e:
+                        print(f"{Fore.YELLOW}[STT] Local model file corrupted: {str(e)}{Style.RESET_ALL}")
+                        print(f"{Fore.RED}[STT DEBUG] Corruption error details:{Style.RESET_ALL}")
+                        print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+                        self._clear_corrupted_model(local_model_dir)
+                else:
+                    print(f"{Fore.YELLOW}[STT DEBUG] Local model file does not exist at: {local_model_path}{Style.RESET_ALL}")
+
+                # Download model with retry logic
+                max_retries = 3
+                for attempt in range(max_retries):
+                    try:
+                        print(f"{Fore.YELLOW}[STT] Downloading model (attempt {attempt + 1}/{max_retries})...{Style.RESET_ALL}")
+                        print(f"{Fore.CYAN}[STT DEBUG] Creating directory: {local_model_dir}{Style.RESET_ALL}")
+                        os.makedirs(local_model_dir, exist_ok=True)
+                        print(f"{Fore.CYAN}[STT DEBUG] Starting Whisper model download...{Style.RESET_ALL}")
+                        self.model = whisper.load_model(self.model_size, download_root=local_model_dir)
+                        print(f"{Fore.GREEN}[STT] Model downloaded and loaded successfully{Style.RESET_ALL}")
+                        break
+                    except Exception as e:
+                        print(f"{Fore.RED}[STT] Download attempt {attempt + 1} failed: {str(e)}{Style.RESET_ALL}")
+                        print(f"{Fore.RED}[STT DEBUG] Download error details:{Style.RESET_ALL}")
+                        print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+                        if "checksum" in str(e).lower() or "sha256" in str(e).lower():
+                            print(f"{Fore.YELLOW}[STT DEBUG] Checksum error detected, clearing corrupted files{Style.RESET_ALL}")
+                            self._clear_corrupted_model(local_model_dir)
+                        if attempt == max_retries - 1:
+                            print(f"{Fore.RED}[STT] All download attempts failed. Falling back to online model.{Style.RESET_ALL}")
+                            try:
+                                print(f"{Fore.CYAN}[STT DEBUG] Attempting fallback to online model{Style.RESET_ALL}")
+                                self.model = whisper.load_model(self.model_size)
+                                print(f"{Fore.GREEN}[STT] Fallback model loaded successfully{Style.RESET_ALL}")
+                            except Exception as fallback_e:
+                                print(f"{Fore.RED}[STT] Fallback model loading failed: {str(fallback_e)}{Style.RESET_ALL}")
+                                print(f"{Fore.RED}[STT DEBUG] Fallback error details:{Style.RESET_ALL}")
+                                print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+                                raise fallback_e
+            except Exception as e:
+                print(f"{Fore.RED}[STT] Critical error in model loading: {str(e)}{Style.RESET_ALL}")
+                print(f"{Fore.RED}[STT DEBUG] Critical error details:{Style.RESET_ALL}")
+                print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+                raise e
+        else:
+            try:
+                print(f"{Fore.CYAN}[STT DEBUG] Loading non-base model: {self.model_size}{Style.RESET_ALL}")
+                self.model = whisper.load_model(self.model_size)
+                print(f"{Fore.GREEN}[STT] Non-base model loaded successfully{Style.RESET_ALL}")
+            except Exception as e:
+                print(f"{Fore.RED}[STT] Non-base model loading failed: {str(e)}{Style.RESET_ALL}")
+                print(f"{Fore.RED}[STT DEBUG] Non-base model error details:{Style.RESET_ALL}")
+                print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+                raise e
+
+        print(f"{Fore.GREEN}[STT] Model loaded successfully{Style.RESET_ALL}")
+        return self.model
+
+    @staticmethod
+    def _decode_options(profile: DecodingProfile) -> dict:
+        """whisper.transcribe() arguments for a profile."""
+        return {
+            "language": profile.language,
+            "temperature": profile.temperatures if profile.fallback else profile.temperatures[0],
+            "beam_size": profile.beam_size if profile.beam_size > 1 else None,
+            "best_of": profile.best_of if profile.fallback else None,
+            "condition_on_previous_text": profile.condition_on_previous_text,
+            "no_speech_threshold": profile.no_speech_threshold,
+            "logprob_threshold": profile.logprob_threshold,
+            "compression_ratio_threshold": profile.compression_ratio_threshold,
+            "fp16": False,
+        }
+
+    def transcribe(self, audio: Union[str, np.ndarray], profile: Optional[DecodingProfile] = None) -> str:
+        if profile is None:
+            return self.load().transcribe(audio)["text"]
+        return self.load().transcribe(audio, **self._decode_options(profile))["text"]
+
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        import whisper
+        return whisper.load_audio(audio_path)
+
+    def transcribe_batch(self, clips: List[np.ndarray], profile: Optional[DecodingProfile] = None) -> List[str]:
+        """
+        Clips that fit one window are padded to 30 s, stacked into a single mel
+        batch and decoded together, so the encoder runs once for all of them,
+        at the profile's first temperature. Longer clips, and clips whose decode
+        fails the profile's fallback checks, go through transcribe() and its
+        sliding window and temperature cascade.
+        """
+        import torch
+        import whisper
+        model = self.load()
+        texts: List[Optional[str]] = [None] * len(clips)
+        short = [i for i, clip in enumerate(clips) if clip.size <= WINDOW_SAMPLES]
+        if short:
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clips[i])), model.dims.n_mels)
+                for i in short
+            ]).to(model.device)
+            if profile is None:
+                options = whisper.DecodingOptions(fp16=False, without_timestamps=True)
+            else:
+                options = whisper.DecodingOptions(
+                    language=profile.language, temperature=profile.temperatures[0],
+                    beam_size=profile.beam_size if profile.beam_size > 1 else None,
+                    fp16=False, without_timestamps=True)
+            for i, result in zip(short, whisper.decode(model, mels, options)):
+                if (profile is not None and profile.no_speech_threshold is not None
+                        and result.no_speech_prob > profile.no_speech_threshold
+                        and result.avg_logprob < profile.logprob_threshold):
+                    texts[i] = ""  # Silence, as whisper.transcribe() decides it
+                    continue
+                if profile is not None and profile.fallback and (
+                        result.compression_ratio > profile.compression_ratio_threshold
+                        or result.avg_logprob < profile.logprob_threshold):
+                    continue  # Left to transcribe() and its temperature fallback
+                texts[i] = result.text
+        for i, clip in enumerate(clips):
+            if texts[i] is None:
+                texts[i] = self.transcribe(clip, profile)
+        return texts
+
+
+def faster_whisper_model_dir(whisper_model_path: str, model_size: str) -> str:
+    """
+    CTranslate2 models live next to the openai-whisper checkpoint, one directory
+    per size: app/voice/base.pt -> app/voice/faster-whisper-base/.
+    """
+    return os.path.join(os.path.dirname(whisper_model_path), f"faster-whisper-{model_size}")
+
+
+class FasterWhisperBackend(STTBackend):
+    """
+    Whisper converted to CTranslate2 (faster-whisper) and run with int8 weights.
+
+    The model directory holds the converted files (model.bin, config.json,
+    tokenizer.json, vocabulary); it is downloaded there on first use.
+    `cpu_threads` = 0 lets CTranslate2 pick its default (OMP_NUM_THREADS or 4).
+    CTranslate2 copies the weights into its own buffers, so they can't be
+    shared between workers by memory mapping; int8 keeps each copy small.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = "base", model_dir: Optional[str] = None,
+                 compute_type: str = "int8", cpu_threads: int = 0, beam_size: int = 5):
+        super().__init__(model_size)
+        self.model_dir = model_dir
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+
+    def load(self):
+        if self.model is not None:
+            return self.model
+        try:
+            from faster_whisper import WhisperModel, download_model
+        except ImportError as e:
+            raise RuntimeError("STT_BACKEND=faster-whisper needs the faster-whisper package "
+                               "(pip install faster-whisper)") from e
+
+        model_source = self.model_size
+        if self.model_dir:
+            if not os.path.exists(os.path.join(self.model_dir, "model.bin")):
+                print(f"{Fore.YELLOW}[STT] Downloading faster-whisper {self.model_size} model to {self.model_dir}...{Style.RESET_ALL}")
+                os.makedirs(self.model_dir, exist_ok=True)
+                download_model(self.model_size, output_dir=self.model_dir)
+            model_source = self.model_dir
+        print(f"{Fore.CYAN}[STT] Loading faster-whisper {self.model_size} model "
+              f"({self.compute_type}, {self.cpu_threads or 'default'} threads)...{Style.RESET_ALL}")
+        self.model = WhisperModel(model_source, device="cpu", compute_type=self.compute_type,
+                                  cpu_threads=self.cpu_threads)
+        print(f"{Fore.GREEN}[STT] Model loaded successfully{Style.RESET_ALL}")
+        return self.model
+
+    def transcribe(self, audio: Union[str, np.ndarray], profile: Optional[DecodingProfile] = None) -> str:
+        if profile is None:
+            segments, _ = self.load().transcribe(audio, beam_size=self.beam_size)
+        else:
+            segments, _ = self.load().transcribe(
+                audio, language=profile.language, beam_size=profile.beam_size, best_of=profile.best_of,
+                temperature=list(profile.temperatures),
+                condition_on_previous_text=profile.condition_on_previous_text,
+                no_speech_threshold=profile.no_speech_threshold,
+                log_prob_threshold=profile.logprob_threshold,
+                compression_ratio_threshold=profile.compression_ratio_threshold)
+        # Segments are decoded lazily as the generator is consumed
+        return "".join(segment.text for segment in segments)
+
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        from faster_whisper import decode_audio
+        return decode_audio(audio_path, sampling_rate=16000)
+
+    def cache_id(self) -> str:
+        return f"{self.name}:{self.model_size}:{self.compute_type}:beam{self.beam_size}"
+
+
+def create_stt_backend(name: str, model_size: str = "base", whisper_model_path: Optional[str] = None,
+                       model_dir: Optional[str] = None, compute_type: str = "int8",
+                       cpu_threads: int = 0, mmap: bool = True) -> STTBackend:
+    """Build the backend named by STT_BACKEND."""
+    name = name.strip().lower()
+    if name == "whisper":
+        return OpenAIWhisperBackend(model_size, model_path=whisper_model_path, cpu_threads=cpu_threads, mmap=mmap)
+    if name in ("faster-whisper", "faster_whisper", "ctranslate2"):
+        if model_dir is None and whisper_model_path:
+            model_dir = faster_whisper_model_dir(whisper_model_path, model_size)
+        return FasterWhisperBackend(model_size, model_dir=model_dir, compute_type=compute_type,
+                                    cpu_threads=cpu_threads)
+    raise ValueError(f"Unsupported STT backend: {name} (expected one of {', '.join(STT_BACKENDS)})")
@@ -0,0 +1,122 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import threading
+import time
+import numpy as np
+from colorama import Fore, Style, init
+
+init(autoreset=True)
+
+
+class TranscriptionQueueFull(RuntimeError):
+    """Raised by submit() when `max_queue` clips are already waiting."""
+
+
+class BatchedTranscriber:
+    """
+    Single inference thread in front of a shared STT model.
+
+    Role:
+    - Queue decoded clips from any number of request threads
+    - Form micro-batches: wait at most `max_wait` seconds after the first clip
+      for up to `max_batch` clips, then run them through the model together
+    - Resolve each caller's future with its own transcript
+    - Refuse new clips once `max_queue` are waiting, so overload turns into
+      fast 503s instead of unbounded latency
+
+    `transcribe_batch(clips) -> texts` must return one text per clip, in order.
+    Clips submitted with decode `options` (a DecodingProfile) are batched only
+    with clips that share them, via `transcribe_batch(clips, options)`.
+    """
+
+    def __init__(self, transcribe_batch: Callable[..., List[str]],
+                 max_batch: int = 8, max_wait: float = 0.02, max_queue: int = 32):
+        self.transcribe_batch = transcribe_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._queue: "queue.Queue[Tuple[np.ndarray, Any, Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.clips = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="BatchedTranscriber", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        while True:
+            try:
+                _, _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("Transcriber stopped"))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, audio: np.ndarray, options: Any = None) -> Future:
+        """Queue one 16 kHz clip; the future resolves with its transcript."""
+        if self._queue.qsize() >= self.max_queue:
+            self.rejected += 1
+            raise TranscriptionQueueFull(f"{self.max_queue} transcriptions already queued")
+        future: Future = Future()
+        self._queue.put((audio, options, future))
+        return future
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.depth,
+            "batches": self.batches,
+            "clips": self.clips,
+            "mean_batch": round(self.clips / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch: List[Tuple[np.ndarray, Any, Future]]):
+        groups: Dict[int, List[Tuple[np.ndarray, Any, Future]]] = {}
+        for item in batch:
+            if item[2].set_running_or_notify_cancel():
+                groups.setdefault(id(item[1]), []).append(item)
+        for group in groups.values():
+            self._process_group([(audio, future) for audio, _, future in group], group[0][1])
+
+    def _process_group(self, batch: List[Tuple[np.ndarray, Future]], options: Any):
+        try:
+            clips = [audio for audio, _ in batch]
+            texts = self.transcribe_batch(clips) if options is None else self.transcribe_batch(clips, options)
+        except Exception as e:
+            print(f"{Fore.RED}[BatchedTranscriber] Batch of {len(batch)} failed: {e}{Style.RESET_ALL}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.clips += len(batch)
+        for (_, future), text in zip(batch, texts):
+            future.set_result(text)
@@ -0,0 +1,115 @@
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence
+import threading
+from config.settings import Settings
+
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+class DecodingProfile:
+    """
+    How Whisper decodes one request: a latency/accuracy trade-off with a name.
+
+    Role:
+    - Pin the language or leave it to auto-detection (`language` None)
+    - Choose greedy (`beam_size` 1) or beam search decoding
+    - Enable the temperature fallback cascade (more than one temperature) or not
+    - Carry the thresholds that decide fallback and "no speech"
+
+    Backends translate a profile into their own decode arguments.
+    """
+
+    def __init__(self, name: str, language: Optional[str] = "en", beam_size: int = 1,
+                 temperatures: Sequence[float] = (0.0,), condition_on_previous_text: bool = False,
+                 no_speech_threshold: Optional[float] = 0.6, logprob_threshold: float = -1.0,
+                 compression_ratio_threshold: float = 2.4, best_of: int = 5):
+        self.name = name
+        self.language = language or None
+        self.beam_size = max(1, beam_size)
+        self.temperatures = tuple(temperatures)
+        self.condition_on_previous_text = condition_on_previous_text
+        self.no_speech_threshold = no_speech_threshold
+        self.logprob_threshold = logprob_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.best_of = best_of
+
+    @property
+    def fallback(self) -> bool:
+        """Retry at higher temperatures when a decode looks like a hallucination or a loop."""
+        return len(self.temperatures) > 1
+
+    def cache_id(self) -> str:
+        """Every option that can change the transcript; part of the transcript cache key."""
+        return (f"{self.name}:{self.language or 'auto'}:beam{self.beam_size}:"
+                f"t{','.join(str(t) for t in self.temperatures)}:"
+                f"{'cond' if self.condition_on_previous_text else 'nocond'}:ns{self.no_speech_threshold}")
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "language": self.language or "auto",
+            "decoding": "greedy" if self.beam_size == 1 else f"beam search ({self.beam_size})",
+            "fallback": self.fallback,
+            "temperatures": list(self.temperatures),
+            "condition_on_previous_text": self.condition_on_previous_text,
+            "no_speech_threshold": self.no_speech_threshold,
+        }
+
+
+def _pinned_language() -> Optional[str]:
+    return getattr(Settings, "STT_LANGUAGE", "en") or None
+
+
+DECODING_PROFILES: Dict[str, DecodingProfile] = {
+    # Short spoken commands: one greedy pass, no fallback, no cross-window context
+    "command": DecodingProfile("command", language=_pinned_language()),
+    # Longer free speech: still greedy, but retries bad windows and keeps context between them
+    "dictation": DecodingProfile("dictation", language=_pinned_language(),
+                                 temperatures=FALLBACK_TEMPERATURES, condition_on_previous_text=True),
+    # Whisper's own defaults: language detection, beam search and the full fallback cascade
+    "accurate": DecodingProfile("accurate", language=None, beam_size=5,
+                                temperatures=FALLBACK_TEMPERATURES, condition_on_previous_text=True),
+}
+
+
+def get_profile(name: Optional[str] = None) -> DecodingProfile:
+    """The named profile; None gives STT_DEFAULT_PROFILE. Raises ValueError for unknown names."""
+    name = (name or getattr(Settings, "STT_DEFAULT_PROFILE", "dictation")).strip().lower()
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unknown STT profile: {name} (expected one of {', '.join(DECODING_PROFILES)})")
+    return DECODING_PROFILES[name]
+
+
+class LatencyStats:
+    """Inference latency and real-time factor of the most recent `window` transcriptions of one profile."""
+
+    def __init__(self, window: int = 256):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.audio_seconds = 0.0
+        self.compute_seconds = 0.0
+
+    def record(self, latency: float, audio_seconds: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self.count += 1
+            self.audio_seconds += audio_seconds
+            self.compute_seconds += latency
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            ordered = sorted(self._latencies)
+            count, audio, compute = self.count, self.audio_seconds, self.compute_seconds
+        if not ordered:
+            return {"count": 0}
+
+        def percentile(fraction):
+            return round(1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+        return {
+            "count": count,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(1000 * ordered[-1], 1),
+            "rtf": round(compute / audio, 3) if audio else None,
+        }
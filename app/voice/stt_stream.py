@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import numpy as np
+from .audio_decode import to_model_input
+from .vad import SAMPLE_RATE, StreamingVAD
+
+
+class StreamingTranscription:
+    """
+    Turns a stream of PCM frames from one client into utterances.
+
+    Role:
+    - Convert 16-bit little-endian mono PCM chunks to float32 at 16 kHz
+    - Run voice-activity detection frame by frame as audio arrives
+    - Decide when to transcribe: a partial every `partial_interval` seconds
+      of speech, a final once `end_silence` seconds of silence end the utterance
+
+    `feed` and `flush` return actions for the caller, which owns the model:
+    {"type": "speech_start"}, {"type": "partial", "utterance", "audio"} and
+    {"type": "final", "utterance", "audio"}. Blips shorter than `min_speech`
+    end with {"type": "discard"} instead of a final. `pre_roll` seconds before
+    the detected start are kept so soft word onsets aren't clipped.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, end_silence: float = 0.4,
+                 partial_interval: float = 0.7, min_speech: float = 0.2,
+                 pre_roll: float = 0.3, max_utterance: float = 28.0, vad: Optional[StreamingVAD] = None):
+        self.sample_rate = sample_rate
+        self.vad = vad or StreamingVAD()
+        frame_seconds = self.vad.frame_length / SAMPLE_RATE
+        self.end_silence_frames = max(1, round(end_silence / frame_seconds))
+        self.partial_frames = max(1, round(partial_interval / frame_seconds))
+        self.min_speech_frames = max(1, round(min_speech / frame_seconds))
+        self.max_frames = round(max_utterance / frame_seconds)
+        self.utterance = 0
+        self._pre_roll: Deque[np.ndarray] = deque(maxlen=max(1, round(pre_roll / frame_seconds)))
+        self._frames: List[np.ndarray] = []
+        self._in_speech = False
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._since_partial = 0
+        self._odd_byte = b""
+
+    def feed(self, pcm: bytes) -> List[Dict[str, Any]]:
+        pcm = self._odd_byte + pcm
+        self._odd_byte = pcm[len(pcm) - len(pcm) % 2:]
+        samples = np.frombuffer(pcm[:len(pcm) - len(self._odd_byte)], dtype="<i2").astype(np.float32) / 32768.0
+        if self.sample_rate != SAMPLE_RATE:
+            samples = to_model_input(samples, self.sample_rate)
+        frames, flags = self.vad.feed(samples)
+
+        actions = []
+        for frame, speech in zip(frames, flags):
+            if not self._in_speech:
+                if speech:
+                    self._start_utterance(frame)
+                    actions.append({"type": "speech_start", "utterance": self.utterance})
+                else:
+                    self._pre_roll.append(frame)
+                continue
+
+            self._frames.append(frame)
+            self._since_partial += 1
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+
+            if self._silence_run >= self.end_silence_frames or len(self._frames) >= self.max_frames:
+                actions.extend(self.flush())
+            elif speech and self._since_partial >= self.partial_frames:
+                self._since_partial = 0
+                actions.append({"type": "partial", "utterance": self.utterance, "audio": self._audio()})
+        return actions
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """End the current utterance now (end of stream, or the client asked for it)."""
+        if not self._in_speech:
+            return []
+        self._in_speech = False
+        audio = self._audio(trim=self._silence_run)
+        self._frames = []
+        if self._speech_frames < self.min_speech_frames:
+            return [{"type": "discard", "utterance": self.utterance}]
+        return [{"type": "final", "utterance": self.utterance, "audio": audio}]
+
+    def _start_utterance(self, frame: np.ndarray):
+        self.utterance += 1
+        self._in_speech = True
+        self._frames = list(self._pre_roll) + [frame]
+        self._pre_roll.clear()
+        self._speech_frames = 1
+        self._silence_run = 0
+        self._since_partial = 0
+
+    def _audio(self, trim: int = 0) -> np.ndarray:
+        # Keep a little of the trailing silence; Whisper ends words more reliably with it
+        keep = len(self._frames) - max(0, trim - 3)
+        return np.concatenate(self._frames[:keep]) if keep > 0 else np.zeros(0, dtype=np.float32)
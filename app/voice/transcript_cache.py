@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+import hashlib
+import os
+import threading
+import numpy as np
+from colorama import Fore, Style, init
+from app.devices.persistence import atomic_write_text
+
+init(autoreset=True)
+
+
+def transcript_key(audio: np.ndarray, model_id: str) -> str:
+    """Hash of the exact samples the model would see plus the model and its decode options."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Remembers transcripts of audio that was already transcribed.
+
+    Role:
+    - Keep up to `max_entries` transcripts in memory, least recently used out first
+    - Optionally keep every transcript on disk under `directory` as well, so
+      retries and replayed clips stay instant across restarts
+    - Run one inference for concurrent identical requests (single flight);
+      the others wait for its result
+
+    Failures are passed to every waiting caller and never cached.
+    """
+
+    def __init__(self, max_entries: int = 512, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return text
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.hits += 1
+        if not owner:
+            return future.result()
+
+        try:
+            text = self._read_disk(key)
+            if text is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                text = compute()
+                self._write_disk(key, text)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._remember(key, text)
+            del self._in_flight[key]
+        future.set_result(text)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._memory), "hits": self.hits,
+                    "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def _remember(self, key: str, text: str):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"{Fore.YELLOW}[TranscriptCache] Could not read {key}: {e}{Style.RESET_ALL}")
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+            atomic_write_text(self._path(key), text)
+        except OSError as e:
+            print(f"{Fore.YELLOW}[TranscriptCache] Could not write {key}: {e}{Style.RESET_ALL}")
@@ -0,0 +1,135 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from scipy.ndimage import minimum_filter1d, uniform_filter1d
+
+SAMPLE_RATE = 16000
+
+
+def frame_energy_db(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Mean-square energy in dBFS of each complete frame, computed in one pass."""
+    count = samples.size // frame_length
+    frames = samples[:count * frame_length].reshape(count, frame_length)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_length
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def zero_crossing_rate(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Fraction of sign changes between neighbouring samples in each complete frame."""
+    count = samples.size // frame_length
+    signs = np.signbit(samples[:count * frame_length].reshape(count, frame_length))
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_length - 1)
+
+
+def speech_frames(energy: np.ndarray, zcr: np.ndarray, noise_floor, threshold_db: float,
+                  min_energy_db: float, fricative_zcr: float = 0.3) -> np.ndarray:
+    """
+    Voiced frames stand `threshold_db` above the noise floor. Unvoiced consonants
+    ("s", "f", "sh") are quieter but cross zero often, so they only need half
+    that margin when their zero-crossing rate is high.
+    """
+    margin = energy - noise_floor
+    loud = margin > threshold_db
+    fricative = (zcr > fricative_zcr) & (margin > threshold_db / 2)
+    return (loud | fricative) & (energy > min_energy_db)
+
+
+def _runs(flags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indexes of every run of True."""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                  threshold_db: float = 9.0, min_energy_db: float = -50.0,
+                  min_speech_ms: int = 120, min_silence_ms: int = 300,
+                  padding_ms: int = 200, noise_window_ms: int = 2000) -> List[Tuple[int, int]]:
+    """
+    Speech segments of a whole clip as (start, end) sample indexes.
+
+    Every step is a vectorized pass over per-frame features: energy and
+    zero-crossing rate, a noise floor that follows the running minimum of the
+    energy over `noise_window_ms` (so it adapts to hum that changes during the
+    clip), gaps shorter than `min_silence_ms` bridged, bursts shorter than
+    `min_speech_ms` dropped, then `padding_ms` added on both sides.
+    """
+    frame_length = sample_rate * frame_ms // 1000
+    if audio.size < frame_length:
+        return []
+    energy = frame_energy_db(audio, frame_length)
+    zcr = zero_crossing_rate(audio, frame_length)
+
+    window = max(1, noise_window_ms // frame_ms)
+    noise_floor = uniform_filter1d(minimum_filter1d(energy, window, mode="nearest"), window, mode="nearest")
+    flags = speech_frames(energy, zcr, noise_floor, threshold_db, min_energy_db)
+
+    starts, ends = _runs(~flags)
+    short_gap = (ends - starts) < max(1, min_silence_ms // frame_ms)
+    interior = (starts > 0) & (ends < flags.size)
+    for start, end in zip(starts[short_gap & interior], ends[short_gap & interior]):
+        flags[start:end] = True
+
+    starts, ends = _runs(flags)
+    keep = (ends - starts) >= max(1, min_speech_ms // frame_ms)
+    padding = padding_ms * sample_rate // 1000
+    segments: List[Tuple[int, int]] = []
+    for start, end in zip(starts[keep] * frame_length - padding, ends[keep] * frame_length + padding):
+        start, end = max(0, int(start)), min(audio.size, int(end))
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, **options) -> Optional[np.ndarray]:
+    """The speech segments of `audio` joined together, or None when nobody spoke."""
+    segments = detect_speech(audio, sample_rate, **options)
+    if not segments:
+        return None
+    if len(segments) == 1:
+        start, end = segments[0]
+        return audio[start:end]
+    return np.concatenate([audio[start:end] for start, end in segments])
+
+
+class StreamingVAD:
+    """
+    Frame-level voice activity detection for audio that arrives in pieces.
+
+    Role:
+    - Split incoming float32 samples into fixed frames (leftovers wait for the next call)
+    - Track the background noise level with an adaptive floor
+    - Flag frames as speech with the same energy/zero-crossing test as detect_speech
+
+    The floor drops immediately to quieter frames and rises slowly
+    (`noise_adapt` per non-speech frame), so a steady fan or hum is learned
+    while speech is not.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                 threshold_db: float = 9.0, min_energy_db: float = -50.0, noise_adapt: float = 0.05):
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.noise_adapt = noise_adapt
+        self.noise_floor: Optional[float] = None
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def feed(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the complete frames now available, shape (n, frame_length), and a speech flag for each."""
+        self._pending = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        energies = frame_energy_db(self._pending, self.frame_length)
+        zcrs = zero_crossing_rate(self._pending, self.frame_length)
+        consumed = energies.size * self.frame_length
+        frames = self._pending[:consumed].reshape(-1, self.frame_length)
+        self._pending = self._pending[consumed:]
+
+        flags = np.zeros(energies.size, dtype=bool)
+        for i, (energy, zcr) in enumerate(zip(energies, zcrs)):
+            if self.noise_floor is None or energy < self.noise_floor:
+                self.noise_floor = float(energy)
+            speech = bool(speech_frames(energy, zcr, self.noise_floor, self.threshold_db, self.min_energy_db))
+            if not speech:
+                self.noise_floor += self.noise_adapt * (energy - self.noise_floor)
+            flags[i] = speech
+        return frames, flags
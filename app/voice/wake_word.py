@@ -0,0 +1,302 @@
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+import argparse
+import numpy as np
+from colorama import Fore, Style, init
+from .vad import SAMPLE_RATE, trim_silence
+
+init(autoreset=True)
+
+FRAME_LENGTH = 400  # 25 ms at 16 kHz
+HOP_LENGTH = 160  # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+
+
+@lru_cache(maxsize=4)
+def mel_filterbank(sample_rate: int = SAMPLE_RATE, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """Triangular filters evenly spaced on the mel scale, shape (n_mels, n_fft // 2 + 1)."""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(20.0), to_mel(sample_rate / 2), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _cepstral_basis(n_mfcc: int = N_MFCC, n_mels: int = N_MELS, lifter: int = 22) -> np.ndarray:
+    """Orthonormal DCT-II rows 1..n_mfcc-1 with sinusoidal liftering folded in, shape (n_mfcc - 1, n_mels)."""
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    dct = np.sqrt(2.0 / n_mels) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels))
+    lift = 1.0 + (lifter / 2.0) * np.sin(np.pi * np.arange(n_mfcc) / lifter)
+    # c0 is overall loudness; dropping it makes matching independent of speaking volume
+    return (dct * lift[:, None])[1:].astype(np.float32)
+
+
+def _frame_features(frames: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """MFCCs (without c0) of pre-emphasized frames, shape (n, N_MFCC - 1)."""
+    spectrum = np.fft.rfft(frames * np.hamming(FRAME_LENGTH).astype(np.float32), N_FFT)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    log_mel = np.log(power @ mel_filterbank(sample_rate).T + 1e-10)
+    return log_mel @ _cepstral_basis().T
+
+
+def mfcc(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """MFCCs of a whole clip, one row per 10 ms hop; identical to what MfccStream yields for the same samples."""
+    stream = MfccStream(sample_rate)
+    features, _ = stream.feed(samples, silence_db=None)
+    return features
+
+
+class MfccStream:
+    """
+    Incremental MFCC extraction for audio that arrives in blocks of any size.
+
+    Keeps the samples of a partial frame (and the one before it, for
+    pre-emphasis) between calls, so the frames match those of mfcc() on the
+    concatenated audio.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._pending = np.zeros(1, dtype=np.float32)
+
+    def feed(self, samples: np.ndarray, silence_db: Optional[float] = -60.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Features of every complete frame now available and a loudness flag per frame.
+
+        Frames quieter than `silence_db` dBFS are not transformed at all; their
+        rows are zero and their flag False. None transforms every frame.
+        """
+        self._pending = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        count = (self._pending.size - 1 - FRAME_LENGTH) // HOP_LENGTH + 1
+        if count <= 0:
+            return np.zeros((0, N_MFCC - 1), dtype=np.float32), np.zeros(0, dtype=bool)
+        used = self._pending[:(count - 1) * HOP_LENGTH + FRAME_LENGTH + 1]
+        emphasized = used[1:] - PRE_EMPHASIS * used[:-1]
+        frames = np.lib.stride_tricks.sliding_window_view(emphasized, FRAME_LENGTH)[::HOP_LENGTH]
+        self._pending = self._pending[count * HOP_LENGTH:]
+
+        if silence_db is None:
+            loud = np.ones(count, dtype=bool)
+        else:
+            power = np.einsum("ij,ij->i", frames, frames) / FRAME_LENGTH
+            loud = power > 10.0 ** (silence_db / 10.0)
+        features = np.zeros((count, N_MFCC - 1), dtype=np.float32)
+        if loud.any():
+            features[loud] = _frame_features(frames[loud], self.sample_rate)
+        return features, loud
+
+
+def _pairwise_distances(features: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """Euclidean distance of every feature row to every template row, shape (len(features), len(template))."""
+    squared = ((features ** 2).sum(1)[:, None] + (template ** 2).sum(1)[None, :]
+               - 2.0 * features @ template.T)
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+class TemplateMatcher:
+    """
+    Streaming subsequence DTW of incoming frames against one enrolled template.
+
+    Every input frame advances the alignment: the template position stays
+    (slow speech), moves one frame, or skips one (fast speech; the skipped
+    frame is still paid for). A match may start at any input frame, so no
+    segmentation is needed. `score` is the average frame distance of the best
+    alignment that ends on the last template frame right now.
+    """
+
+    def __init__(self, template: np.ndarray):
+        self.template = template
+        self.reset()
+
+    def reset(self):
+        size = len(self.template)
+        self._cost = np.full(size, np.inf)
+        self._terms = np.zeros(size)
+        self.score = np.inf
+
+    def step(self, distances: np.ndarray) -> float:
+        """Advance by one input frame given its distance to each template frame."""
+        cost, terms = self._cost, self._terms
+        diag = np.concatenate(([0.0], cost[:-1]))  # A fresh alignment may start at template frame 0
+        diag_terms = np.concatenate(([0.0], terms[:-1])) + 1
+        skip = np.concatenate(([np.inf, np.inf], cost[:-2] + distances[1:-1]))
+        skip_terms = np.concatenate(([0.0, 0.0], terms[:-2])) + 2
+
+        take_diag = diag <= cost
+        best = np.where(take_diag, diag, cost)
+        best_terms = np.where(take_diag, diag_terms, terms + 1)
+        take_skip = skip[1:] < best[1:]
+        best[1:] = np.where(take_skip, skip[1:], best[1:])
+        best_terms[1:] = np.where(take_skip, skip_terms[1:], best_terms[1:])
+
+        self._cost = best + distances
+        self._terms = best_terms
+        self.score = float(self._cost[-1] / self._terms[-1])
+        return self.score
+
+
+def best_match(features: np.ndarray, template: np.ndarray) -> float:
+    """Lowest score TemplateMatcher reaches anywhere in a clip's features."""
+    matcher = TemplateMatcher(template)
+    return min((matcher.step(row) for row in _pairwise_distances(features, template)), default=np.inf)
+
+
+class WakeWordModel:
+    """
+    Enrolled wake word: MFCC templates of a few recordings plus a decision threshold.
+
+    Role:
+    - Build templates from 3-10 recordings of the phrase (enroll)
+    - Pick a threshold from how well the recordings match each other
+    - Save to / load from a small .npz file (WAKE_WORD_MODEL_PATH)
+    """
+
+    def __init__(self, templates: Sequence[np.ndarray], threshold: float, phrase: str = "hey assistant"):
+        if not templates:
+            raise ValueError("A wake word model needs at least one template")
+        self.templates = [np.asarray(template, dtype=np.float32) for template in templates]
+        self.threshold = float(threshold)
+        self.phrase = phrase
+
+    @classmethod
+    def enroll(cls, clips: Sequence[np.ndarray], sample_rate: int = SAMPLE_RATE,
+               margin: float = 1.15, phrase: str = "hey assistant") -> "WakeWordModel":
+        """
+        Templates from recordings of the phrase (16 kHz float32). The threshold
+        is the worst score any recording reaches against another recording's
+        template, times `margin`.
+        """
+        templates = []
+        for clip in clips:
+            speech = trim_silence(clip, sample_rate, padding_ms=30)
+            if speech is None and np.sqrt(np.mean(np.square(clip))) > 0.01:
+                speech = clip  # Cut tightly around the phrase: no silence to learn a noise floor from
+            if speech is not None and speech.size >= FRAME_LENGTH:
+                templates.append(mfcc(speech, sample_rate))
+        if len(templates) < 2:
+            raise ValueError("Enrollment needs at least two recordings that contain speech")
+        scores = [best_match(templates[i], templates[j])
+                  for i in range(len(templates)) for j in range(len(templates)) if i != j]
+        return cls(templates, max(scores) * margin, phrase)
+
+    def save(self, path: str):
+        arrays = {f"template_{i}": template for i, template in enumerate(self.templates)}
+        np.savez(path, threshold=self.threshold, phrase=self.phrase, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "WakeWordModel":
+        with np.load(path) as data:
+            count = sum(1 for name in data.files if name.startswith("template_"))
+            templates = [data[f"template_{i}"] for i in range(count)]
+            return cls(templates, float(data["threshold"]), str(data["phrase"]))
+
+
+class WakeWordDetector:
+    """
+    Always-on wake word spotting over streamed microphone blocks.
+
+    Role:
+    - Compute MFCCs incrementally (MfccStream); frames quieter than
+      `silence_db` skip the FFT, so a quiet room costs almost nothing
+    - Match every frame against all templates with streaming DTW (TemplateMatcher)
+    - Report a detection when any template scores below the threshold, then
+      ignore the next `refractory` seconds so one utterance fires once
+
+    A pause longer than `max_pause` seconds restarts all alignments.
+    """
+
+    def __init__(self, model: WakeWordModel, sample_rate: int = SAMPLE_RATE, threshold: Optional[float] = None,
+                 silence_db: float = -60.0, max_pause: float = 0.5, refractory: float = 1.0):
+        self.model = model
+        self.threshold = model.threshold if threshold is None else threshold
+        self.silence_db = silence_db
+        self.max_pause_frames = int(max_pause * SAMPLE_RATE / HOP_LENGTH)
+        self.refractory_frames = int(refractory * SAMPLE_RATE / HOP_LENGTH)
+        self.sample_rate = sample_rate
+        self._stream = MfccStream(SAMPLE_RATE)
+        self._matchers = [TemplateMatcher(template) for template in model.templates]
+        self._quiet_frames = 0
+        self._refractory = 0
+        self.frames = 0
+        self.transformed_frames = 0
+        self.detections = 0
+        self.last_score = np.inf
+
+    def reset(self):
+        for matcher in self._matchers:
+            matcher.reset()
+        self._quiet_frames = 0
+
+    def feed(self, samples: np.ndarray) -> bool:
+        """Feed float32 mono samples; True if the wake word ended within them."""
+        if self.sample_rate != SAMPLE_RATE:
+            from .audio_decode import to_model_input
+            samples = to_model_input(samples, self.sample_rate)
+        features, loud = self._stream.feed(samples, self.silence_db)
+        self.frames += loud.size
+        self.transformed_frames += int(loud.sum())
+        if not loud.any():
+            self._quiet_frames += loud.size
+            if self._quiet_frames >= self.max_pause_frames:
+                self.reset()
+            self._refractory = max(0, self._refractory - loud.size)
+            return False
+
+        distances = [_pairwise_distances(features, matcher.template) for matcher in self._matchers]
+        detected = False
+        for i in range(loud.size):
+            if self._refractory:
+                self._refractory -= 1
+                continue
+            if not loud[i]:
+                self._quiet_frames += 1
+                if self._quiet_frames >= self.max_pause_frames:
+                    self.reset()
+                continue
+            self._quiet_frames = 0
+            score = min(matcher.step(rows[i]) for matcher, rows in zip(self._matchers, distances))
+            self.last_score = score
+            if score < self.threshold:
+                detected = True
+                self.detections += 1
+                self._refractory = self.refractory_frames
+                self.reset()
+        return detected
+
+
+def main():
+    from .audio_decode import decode_audio
+    parser = argparse.ArgumentParser(description="Enroll a wake word from a few recordings of it.")
+    parser.add_argument("output", help="Model file to write (.npz), e.g. the WAKE_WORD_MODEL_PATH")
+    parser.add_argument("recordings", nargs="+", help="WAV files of the phrase, 3-10 recommended")
+    parser.add_argument("--phrase", default="hey assistant")
+    parser.add_argument("--margin", type=float, default=1.15, help="Threshold headroom over the enrollment scores")
+    args = parser.parse_args()
+
+    clips = []
+    for path in args.recordings:
+        with open(path, "rb") as f:
+            audio = decode_audio(f.read())
+        if audio is None:
+            parser.error(f"Unsupported audio file: {path}")
+        clips.append(audio)
+    model = WakeWordModel.enroll(clips, margin=args.margin, phrase=args.phrase)
+    model.save(args.output)
+    print(f"{Fore.GREEN}[WakeWord] Enrolled '{model.phrase}' from {len(model.templates)} recordings, "
+          f"threshold {model.threshold:.2f} -> {args.output}{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 from .base import VoiceAssistantInterface
 import os
-import whisper
 #import sounddevice as sd
 import numpy as np
 import tempfile
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Union
 #import scipy.io.wavfile
 from config.settings import Settings
+from .stt_backends import STTBackend, create_stt_backend
+from .audio_decode import SAMPLE_RATE, decode_audio, to_model_input
+from .stt_batching import BatchedTranscriber, TranscriptionQueueFull
+from .vad import detect_speech, trim_silence
+from .model_manager import ModelManager, idle_timeout, model_manager, should_preload
+from .transcript_cache import TranscriptCache, transcript_key
+from .stt_profiles import DECODING_PROFILES, DecodingProfile, LatencyStats, get_profile
+from .long_form import LongFormTranscription, start_pool, transcribe_chunk
 from colorama import Fore, Style, init
 import shutil
+import threading
+import time
 import traceback
 
 # Initialize colorama for Windows compatibility
@@ -17,107 +29,96 @@ init(autoreset=True)
 class WhisperSTT:
     """
     Handles speech-to-text transcription using Whisper.
+
+    The engine is pluggable (see stt_backends.py): STT_BACKEND picks the
+    reference openai-whisper model or the CTranslate2/int8 faster-whisper one.
+    The model itself is loaded, warmed up and unloaded by the ModelManager
+    under the name "stt". Every request decodes with a named profile
+    (stt_profiles.py): "command" is the fast path for short voice commands.
     """
     
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", backend: STTBackend = None, manager: ModelManager = None):
         """Initialize with specified Whisper model size"""
-        self.model = None
         self.model_size = model_size
-        self._load_model()  # Load model on initialization
-    
-    def _clear_corrupted_model(self, model_dir):
-        """Clear corrupted model files from the directory"""
-        # try:
-        #     if os.path.exists(model_dir):
-        #         print(f"{Fore.YELLOW}[STT] Clearing corrupted model files from {model_dir}{Style.RESET_ALL}")
-        #         shutil.rmtree(model_dir)
-        #         os.makedirs(model_dir, exist_ok=True)
-                
-        # except Exception as e:
-        #     print(f"{Fore.RED}[STT] Warning: Could not clear model directory: {str(e)}{Style.RESET_ALL}")
-        pass
+        self.manager = manager or model_manager
+        # One resident model serves every caller; Whisper's decoder is not re-entrant
+        self._model_lock = threading.Lock()
+        backend_name = getattr(Settings, "STT_BACKEND", "whisper")
+        backend_options = dict(
+            model_size=model_size,
+            whisper_model_path=Settings.WHISPER_MODEL_PATH,
+            model_dir=getattr(Settings, "FASTER_WHISPER_MODEL_PATH", None) or None,
+            compute_type=getattr(Settings, "STT_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(getattr(Settings, "STT_CPU_THREADS", "0")),
+            mmap=str(getattr(Settings, "WHISPER_MMAP", "true")).lower() in ("1", "true", "yes"),
+        )
+        self.backend = backend or create_stt_backend(backend_name, **backend_options)
+        self.manager.register("stt", load=self.backend.load, unload=self.backend.unload,
+                              warmup=self._warmup, idle_timeout=idle_timeout())
+        if should_preload("stt"):
+            self._load_model()
+        # Decoded clips from every endpoint share one inference thread and are batched there
+        self.batcher = BatchedTranscriber(
+            self._transcribe_batch,
+            max_batch=int(getattr(Settings, "STT_BATCH_SIZE", "8")),
+            max_wait=int(getattr(Settings, "STT_BATCH_MAX_WAIT_MS", "20")) / 1000,
+            max_queue=int(getattr(Settings, "STT_QUEUE_LIMIT", "32")),
+        )
+        self.batcher.start()
+        # Silence is cut before inference; clips without speech never reach the model
+        self.vad_enabled = str(getattr(Settings, "STT_VAD", "true")).lower() in ("1", "true", "yes")
+        self.vad_threshold_db = float(getattr(Settings, "STT_VAD_THRESHOLD_DB", "9"))
+        # Retried uploads and replayed clips are answered from here without inference
+        cache_size = int(getattr(Settings, "STT_CACHE_SIZE", "512"))
+        cache_dir = getattr(Settings, "STT_CACHE_DIR", "") or None
+        self.cache = TranscriptCache(cache_size, cache_dir) if cache_size > 0 or cache_dir else None
+        self.latency = {name: LatencyStats() for name in DECODING_PROFILES}
+        # Recordings longer than this are split at pauses and transcribed chunk by chunk in parallel
+        self.long_form_seconds = float(getattr(Settings, "STT_LONG_FORM_SECONDS", "60"))
+        self.long_form_overlap = int(getattr(Settings, "STT_LONG_FORM_OVERLAP_MS", "1000")) / 1000
+        workers = int(getattr(Settings, "STT_LONG_FORM_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+        # Workers rebuild the backend from settings, which an injected backend can't offer
+        self.long_form_workers = workers if backend is None else 1
+        if self.long_form_workers > 1:
+            # Each worker gets its share of the cores instead of every one spawning a thread per core
+            pool_options = dict(backend_options, cpu_threads=backend_options["cpu_threads"]
+                                or max(1, (os.cpu_count() or workers) // workers))
+            self.manager.register(
+                "stt_pool", load=lambda: start_pool(workers, backend_name, pool_options),
+                unload=lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+                warmup=self._warmup_pool, idle_timeout=idle_timeout())
+            if should_preload("stt_pool"):
+                self.manager.get("stt_pool")
     
+    @property
+    def model(self):
+        return self.backend.model
+
     def _load_model(self):
-        """Load the Whisper model if not already loaded"""
-        if self.model is None:
-            print(f"{Fore.CYAN}[STT] Loading Whisper {self.model_size} model...{Style.RESET_ALL}")
-            
-            # Use the local model file if it's the base model
-            if self.model_size == "base":
-                try:
-                    local_model_path = Settings.WHISPER_MODEL_PATH
-                    local_model_dir = os.path.dirname(local_model_path)
-                    print(f"{Fore.CYAN}[STT DEBUG] Local model path: {local_model_path}{Style.RESET_ALL}")
-                    print(f"{Fore.CYAN}[STT DEBUG] Local model directory: {local_model_dir}{Style.RESET_ALL}")
-                    
-                    # Try loading existing model first
-                    if os.path.exists(local_model_path):
-                        try:
-                            print(f"{Fore.GREEN}[STT] Using local model file: {local_model_path}{Style.RESET_ALL}")
-                            file_size = os.path.getsize(local_model_path)
-                            print(f"{Fore.CYAN}[STT DEBUG] Model file size: {file_size} bytes{Style.RESET_ALL}")
-                            self.model = whisper.load_model(local_model_path)
-                            print(f"{Fore.GREEN}[STT] Model loaded successfully{Style.RESET_ALL}")
-                            return self.model
-                        except Exception as e:
-                            print(f"{Fore.YELLOW}[STT] Local model file corrupted: {str(e)}{Style.RESET_ALL}")
-                            print(f"{Fore.RED}[STT DEBUG] Corruption error details:{Style.RESET_ALL}")
-                            print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                            self._clear_corrupted_model(local_model_dir)
-                    else:
-                        print(f"{Fore.YELLOW}[STT DEBUG] Local model file does not exist at: {local_model_path}{Style.RESET_ALL}")
-                    
-                    # Download model with retry logic
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        try:
-                            print(f"{Fore.YELLOW}[STT] Downloading model (attempt {attempt + 1}/{max_retries})...{Style.RESET_ALL}")
-                            print(f"{Fore.CYAN}[STT DEBUG] Creating directory: {local_model_dir}{Style.RESET_ALL}")
-                            os.makedirs(local_model_dir, exist_ok=True)
-                            print(f"{Fore.CYAN}[STT DEBUG] Starting Whisper model download...{Style.RESET_ALL}")
-                            self.model = whisper.load_model(self.model_size, download_root=local_model_dir)
-                            print(f"{Fore.GREEN}[STT] Model downloaded and loaded successfully{Style.RESET_ALL}")
-                            break
-                        except Exception as e:
-                            print(f"{Fore.RED}[STT] Download attempt {attempt + 1} failed: {str(e)}{Style.RESET_ALL}")
-                            print(f"{Fore.RED}[STT DEBUG] Download error details:{Style.RESET_ALL}")
-                            print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                            if "checksum" in str(e).lower() or "sha256" in str(e).lower():
-                                print(f"{Fore.YELLOW}[STT DEBUG] Checksum error detected, clearing corrupted files{Style.RESET_ALL}")
-                                self._clear_corrupted_model(local_model_dir)
-                            if attempt == max_retries - 1:
-                                print(f"{Fore.RED}[STT] All download attempts failed. Falling back to online model.{Style.RESET_ALL}")
-                                try:
-                                    print(f"{Fore.CYAN}[STT DEBUG] Attempting fallback to online model{Style.RESET_ALL}")
-                                    self.model = whisper.load_model(self.model_size)
-                                    print(f"{Fore.GREEN}[STT] Fallback model loaded successfully{Style.RESET_ALL}")
-                                except Exception as fallback_e:
-                                    print(f"{Fore.RED}[STT] Fallback model loading failed: {str(fallback_e)}{Style.RESET_ALL}")
-                                    print(f"{Fore.RED}[STT DEBUG] Fallback error details:{Style.RESET_ALL}")
-                                    print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                                    raise fallback_e
-                except Exception as e:
-                    print(f"{Fore.RED}[STT] Critical error in model loading: {str(e)}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}[STT DEBUG] Critical error details:{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                    raise e
-            else:
-                try:
-                    print(f"{Fore.CYAN}[STT DEBUG] Loading non-base model: {self.model_size}{Style.RESET_ALL}")
-                    self.model = whisper.load_model(self.model_size)
-                    print(f"{Fore.GREEN}[STT] Non-base model loaded successfully{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}[STT] Non-base model loading failed: {str(e)}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}[STT DEBUG] Non-base model error details:{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                    raise e
-                
-            print(f"{Fore.GREEN}[STT] Model loaded successfully{Style.RESET_ALL}")
-        return self.model
+        """Load the backend's model if not already loaded"""
+        return self.manager.get("stt")
+
+    def _warmup(self, model):
+        # One second of silence runs a full 30 s encoder window and a short decode
+        self.backend.transcribe_batch([np.zeros(SAMPLE_RATE, dtype=np.float32)], command_profile())
+
+    def _warmup_pool(self, pool):
+        # Starts every worker process and loads its model before the first real recording
+        wait([pool.submit(transcribe_chunk, np.zeros(SAMPLE_RATE, dtype=np.float32))
+              for _ in range(self.long_form_workers)])
+
+    def _transcribe_batch(self, clips, profile: DecodingProfile = None):
+        with self.manager.use("stt"), self._model_lock:
+            return self.backend.transcribe_batch(clips, profile)
 
-    def transcribe(self, audio_path: str) -> str:
+    def profile_stats(self) -> dict:
+        """Settings and recent inference latency of every decoding profile."""
+        return {name: dict(profile.describe(), latency=self.latency[name].summary())
+                for name, profile in DECODING_PROFILES.items()}
+
+    def transcribe(self, audio_path: str, profile: Union[str, DecodingProfile] = None) -> str:
         """
-        Input: str — Path to audio file
+        Input: str — Path to audio file; optional decoding profile name (STT_DEFAULT_PROFILE if omitted)
         Output: str — Transcribed text
         Calls: Whisper STT engine
         """
@@ -137,20 +138,171 @@ class WhisperSTT:
             except Exception as e:
                 print(f"{Fore.RED}[STT DEBUG] Error checking file size: {str(e)}{Style.RESET_ALL}")
             
-            print(f"{Fore.CYAN}[STT DEBUG] Loading model for transcription{Style.RESET_ALL}")
-            model = self._load_model()
+            # Decode to samples (in memory when possible, else via the backend's ffmpeg/PyAV
+            # loader) so files get the same silence trimming and batching as uploads
+            with open(audio_path, "rb") as f:
+                audio = decode_audio(f.read())
+            if audio is None:
+                print(f"{Fore.CYAN}[STT DEBUG] Decoding {audio_path} with {self.backend.name}{Style.RESET_ALL}")
+                audio = self.backend.load_audio(audio_path)
             print(f"{Fore.CYAN}[STT] Transcribing file: {audio_path}{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}[STT DEBUG] Starting Whisper transcription...{Style.RESET_ALL}")
-            result = model.transcribe(audio_path)
-            print(f"{Fore.MAGENTA}{result['text']}{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}[STT] Transcription complete{Style.RESET_ALL}")
-            return result["text"]
+            return self.transcribe_audio(audio, profile)
+        except TranscriptionQueueFull:
+            raise
         except Exception as e:
             print(f"{Fore.RED}[STT] Transcription error: {str(e)}{Style.RESET_ALL}")
             print(f"{Fore.RED}[STT DEBUG] Transcription error details:{Style.RESET_ALL}")
             print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
             return f"[STT Error] {str(e)}"
 
+    def transcribe_audio(self, audio: np.ndarray, profile: Union[str, DecodingProfile] = None) -> str:
+        """
+        Input: np.ndarray — 16 kHz mono float32 samples; optional decoding profile
+        Output: str — Transcribed text
+        Calls: BatchedTranscriber, Whisper STT engine
+
+        Silence is trimmed first (see vad.py); a clip with no speech returns ""
+        without running the model. Raises TranscriptionQueueFull when too many
+        clips are already waiting, ValueError for an unknown profile name.
+        """
+        if not isinstance(profile, DecodingProfile):
+            profile = get_profile(profile)
+        if audio.size == 0:
+            return "[STT Error] Audio file is empty"
+        if self.long_form_seconds > 0 and audio.size > self.long_form_seconds * SAMPLE_RATE:
+            return self._transcribe_long_text(audio, profile)
+        if self.vad_enabled:
+            speech = trim_silence(audio, threshold_db=self.vad_threshold_db)
+            if speech is None:
+                print(f"{Fore.YELLOW}[STT] No speech detected, skipping transcription{Style.RESET_ALL}")
+                return ""
+            audio = speech
+        try:
+            print(f"{Fore.CYAN}[STT] Transcribing {audio.size / SAMPLE_RATE:.1f}s of decoded audio "
+                  f"({profile.name} profile){Style.RESET_ALL}")
+            if self.cache is not None:
+                key = transcript_key(audio, f"{self.backend.cache_id()}|{profile.cache_id()}")
+                text = self.cache.get_or_compute(key, lambda: self._infer(audio, profile))
+            else:
+                text = self._infer(audio, profile)
+            print(f"{Fore.MAGENTA}{text}{Style.RESET_ALL}")
+            print(f"{Fore.GREEN}[STT] Transcription complete{Style.RESET_ALL}")
+            return text
+        except TranscriptionQueueFull:
+            raise
+        except Exception as e:
+            print(f"{Fore.RED}[STT] Transcription error: {str(e)}{Style.RESET_ALL}")
+            print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+            return f"[STT Error] {str(e)}"
+
+    def _infer(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        started = time.perf_counter()
+        text = self.batcher.submit(audio, profile).result()
+        self.latency[profile.name].record(time.perf_counter() - started, audio.size / SAMPLE_RATE)
+        return text
+
+    def transcribe_long(self, audio: np.ndarray, profile: Union[str, DecodingProfile] = None) -> Iterator[dict]:
+        """
+        Input: np.ndarray — 16 kHz mono float32 samples of any length; optional decoding profile
+        Output: events from LongFormTranscription.run — the chunk plan, each chunk's
+                text as soon as it finishes, then the stitched transcript
+        Calls: long_form.LongFormTranscription, the worker pool or BatchedTranscriber
+
+        With more than one STT_LONG_FORM_WORKERS the chunks run in worker
+        processes, each with its own model; otherwise they are batched through
+        the shared in-process model.
+        """
+        if not isinstance(profile, DecodingProfile):
+            profile = get_profile(profile)
+        options = dict(profile=profile, threshold_db=self.vad_threshold_db)
+        if self.long_form_workers > 1:
+            try:
+                with self.manager.use("stt_pool") as pool:
+                    runner = LongFormTranscription(lambda clip, p: pool.submit(transcribe_chunk, clip, p),
+                                                   max_in_flight=2 * self.long_form_workers,
+                                                   overlap_seconds=self.long_form_overlap)
+                    yield from runner.run(audio, **options)
+            except BrokenProcessPool:
+                # A worker died (crash, out of memory); start fresh ones on the next request
+                self.manager.unload("stt_pool")
+                raise
+        else:
+            runner = LongFormTranscription(self.batcher.submit, max_in_flight=self.batcher.max_batch,
+                                           overlap_seconds=self.long_form_overlap)
+            yield from runner.run(audio, **options)
+
+    def _transcribe_long_text(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        def compute():
+            text = ""
+            for event in self.transcribe_long(audio, profile):
+                if event["type"] == "plan":
+                    print(f"{Fore.CYAN}[STT] Long recording ({event['duration']:.0f}s): {event['chunks']} chunks "
+                          f"on {self.long_form_workers} worker(s){Style.RESET_ALL}")
+                elif event["type"] == "chunk":
+                    print(f"{Fore.CYAN}[STT DEBUG] Chunk {event['index']} "
+                          f"({event['start']:.1f}-{event['end']:.1f}s) done{Style.RESET_ALL}")
+                elif event["type"] == "final":
+                    text = event["text"]
+            return text
+
+        try:
+            if self.cache is not None:
+                key = transcript_key(audio, f"{self.backend.cache_id()}|{profile.cache_id()}|long")
+                text = self.cache.get_or_compute(key, compute)
+            else:
+                text = compute()
+            print(f"{Fore.GREEN}[STT] Long transcription complete{Style.RESET_ALL}")
+            return text
+        except TranscriptionQueueFull:
+            raise
+        except Exception as e:
+            print(f"{Fore.RED}[STT] Long transcription error: {str(e)}{Style.RESET_ALL}")
+            print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
+            return f"[STT Error] {str(e)}"
+
+    def decode_bytes(self, data: bytes, content_type: str = None, filename: str = None) -> np.ndarray:
+        """
+        Input: bytes — An uploaded audio file
+        Output: np.ndarray — 16 kHz mono float32 samples
+        Calls: audio_decode.decode_audio, else the backend's own loader via a temporary file
+        """
+        try:
+            audio = decode_audio(data, content_type)
+        except Exception as e:
+            print(f"{Fore.YELLOW}[STT] In-memory decode failed, falling back to ffmpeg: {str(e)}{Style.RESET_ALL}")
+            audio = None
+        if audio is not None:
+            return audio
+        suffix = os.path.splitext(filename or "")[1] or ".wav"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            temp_file.write(data)
+            temp_file_path = temp_file.name
+        try:
+            return self.backend.load_audio(temp_file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+
+    def transcribe_bytes(self, data: bytes, content_type: str = None, filename: str = None,
+                         profile: Union[str, DecodingProfile] = None) -> str:
+        """
+        Input: bytes — An uploaded audio file
+        Output: str — Transcribed text
+        Calls: audio_decode.decode_audio, Whisper STT engine
+
+        WAV, raw PCM, FLAC and Ogg are decoded in memory and handed to the
+        model as an array; other formats are written to a temporary file and
+        left to ffmpeg as before.
+        """
+        if not data:
+            return "[STT Error] Audio file is empty"
+        try:
+            audio = self.decode_bytes(data, content_type, filename)
+        except Exception as e:
+            print(f"{Fore.RED}[STT] Could not decode upload: {str(e)}{Style.RESET_ALL}")
+            return f"[STT Error] {str(e)}"
+        return self.transcribe_audio(audio, profile)
+
     def transcribe_live(self, silence_threshold=100, silence_duration=2, samplerate=16000) -> str:
         """
         Transcribe live audio from microphone.
@@ -180,11 +332,12 @@ class WhisperSTT:
                     audio_chunks.append(chunk)
                     chunk_count += 1
                     
-                    # Check if audio is silent
+                    # Check if audio is silent: quiet overall, or no frame that looks like speech
                     rms = np.sqrt(np.mean(chunk.astype(np.float32)**2))
-                    print(f"{Fore.CYAN}[STT DEBUG] Chunk {chunk_count}: RMS={rms:.2f}, Threshold={silence_threshold}{Style.RESET_ALL}")
+                    speech = rms >= silence_threshold and bool(detect_speech(chunk[:, 0].astype(np.float32) / 32768.0, samplerate))
+                    print(f"{Fore.CYAN}[STT DEBUG] Chunk {chunk_count}: RMS={rms:.2f}, Threshold={silence_threshold}, Speech={speech}{Style.RESET_ALL}")
                     
-                    if rms < silence_threshold:
+                    if not speech:
                         silence_chunks += 1
                         print(f"{Fore.YELLOW}[STT DEBUG] Silent chunk detected ({silence_chunks}/{max_silence_chunks}){Style.RESET_ALL}")
                     else:
@@ -206,42 +359,18 @@ class WhisperSTT:
             audio = np.concatenate(audio_chunks, axis=0)
             print(f"{Fore.CYAN}[STT DEBUG] Combined audio shape: {audio.shape}{Style.RESET_ALL}")
 
-            # Save to temporary file for transcription
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                temp_file = f.name
-                print(f"{Fore.CYAN}[STT DEBUG] Saving audio to temporary file: {temp_file}{Style.RESET_ALL}")
-                try:
-                    scipy.io.wavfile.write(temp_file, samplerate, audio)
-                    temp_file_size = os.path.getsize(temp_file)
-                    print(f"{Fore.CYAN}[STT DEBUG] Temporary file size: {temp_file_size} bytes{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}[STT DEBUG] Error writing temporary file: {str(e)}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                    raise e
-                
-                # Transcribe the audio
-                print(f"{Fore.CYAN}[STT] Recording complete, transcribing...{Style.RESET_ALL}")
-                try:
-                    model = self._load_model()
-                    print(f"{Fore.CYAN}[STT DEBUG] Starting transcription of temporary file{Style.RESET_ALL}")
-                    result = model.transcribe(temp_file)
-                    print(f"{Fore.GREEN}[STT DEBUG] Transcription result obtained{Style.RESET_ALL}")
-                except Exception as e:
-                    print(f"{Fore.RED}[STT DEBUG] Error during transcription: {str(e)}{Style.RESET_ALL}")
-                    print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
-                    raise e
-                
-                # Clean up
-                try:
-                    print(f"{Fore.CYAN}[STT DEBUG] Cleaning up temporary file{Style.RESET_ALL}")
-                    os.unlink(temp_file)
-                except Exception as e:
-                    print(f"{Fore.YELLOW}[STT DEBUG] Warning: Could not delete temporary file: {str(e)}{Style.RESET_ALL}")
-                    
-                return result["text"]
+            # Transcribe the audio in memory; silence is trimmed on the way
+            print(f"{Fore.CYAN}[STT] Recording complete, transcribing...{Style.RESET_ALL}")
+            samples = audio[:, 0].astype(np.float32) / 32768.0
+            return self.transcribe_audio(to_model_input(samples, samplerate), command_profile())
                 
         except Exception as e:
             print(f"{Fore.RED}[STT] Live transcription error: {str(e)}{Style.RESET_ALL}")
             print(f"{Fore.RED}[STT DEBUG] Live transcription error details:{Style.RESET_ALL}")
             print(f"{Fore.RED}{traceback.format_exc()}{Style.RESET_ALL}")
             return f"[STT Error] Live transcription failed: {str(e)}"
+
+
+def command_profile() -> DecodingProfile:
+    """Profile for spoken commands (microphone, /voice/chat, /ws/stt): STT_COMMAND_PROFILE."""
+    return get_profile(getattr(Settings, "STT_COMMAND_PROFILE", "command"))
@@ -16,9 +16,68 @@ class Settings:
     USE_ARDUINO_SIMULATOR = os.getenv("USE_ARDUINO_SIMULATOR", "false")
     ARDUINO_PORT = os.getenv("ARDUINO_PORT", "COM3" if os.name == "nt" else "/dev/ttyACM0")
     ARDUINO_BAUDRATE = os.getenv("ARDUINO_BAUDRATE", "9600")
+    # Several boards: "name=port[@baud],..."; devices pick one with their "controller" field
+    ARDUINO_CONTROLLERS = os.getenv("ARDUINO_CONTROLLERS", "")
+    ARDUINO_MAX_IN_FLIGHT = os.getenv("ARDUINO_MAX_IN_FLIGHT", "4")  # Pipelined commands awaiting an ack
+    ARDUINO_ACK_TIMEOUT = os.getenv("ARDUINO_ACK_TIMEOUT", "1.0")  # Seconds to wait for "OK"
+    ARDUINO_READY_TIMEOUT = os.getenv("ARDUINO_READY_TIMEOUT", "10")  # Seconds to wait for "Arduino Ready" after opening
+    ARDUINO_RECONNECT_BASE_DELAY = os.getenv("ARDUINO_RECONNECT_BASE_DELAY", "0.5")  # First reconnect delay, doubled per failure
+    ARDUINO_RECONNECT_MAX_DELAY = os.getenv("ARDUINO_RECONNECT_MAX_DELAY", "30")
+    ARDUINO_HEARTBEAT_INTERVAL = os.getenv("ARDUINO_HEARTBEAT_INTERVAL", "5")  # Seconds between PING probes
+    ARDUINO_OUTAGE_POLICY = os.getenv("ARDUINO_OUTAGE_POLICY", "queue")  # "queue" or "fail_fast" while disconnected
+    ARDUINO_OUTAGE_QUEUE_TIMEOUT = os.getenv("ARDUINO_OUTAGE_QUEUE_TIMEOUT", "10")  # Seconds a held command waits for reconnect
+    ARDUINO_PROTOCOL = os.getenv("ARDUINO_PROTOCOL", "auto")  # auto | text | binary (framed, CRC-checked)
+    ARDUINO_FRAME_RETRIES = os.getenv("ARDUINO_FRAME_RETRIES", "2")  # Resends of an unanswered binary frame
+    ARDUINO_COALESCE_WINDOW = os.getenv("ARDUINO_COALESCE_WINDOW", "0.02")  # Seconds to merge repeated commands per pin (0 = off)
+    ARDUINO_SIM_PROFILE = os.getenv("ARDUINO_SIM_PROFILE", "ideal")  # ideal, realistic, lossy or flaky (see app/devices/simulation.py)
+    ARDUINO_SIM_BAUDRATE = os.getenv("ARDUINO_SIM_BAUDRATE")  # Overrides for the selected profile
+    ARDUINO_SIM_PROCESSING_MS = os.getenv("ARDUINO_SIM_PROCESSING_MS")
+    ARDUINO_SIM_DROP_RATE = os.getenv("ARDUINO_SIM_DROP_RATE")
+    ARDUINO_SIM_GARBLE_RATE = os.getenv("ARDUINO_SIM_GARBLE_RATE")
+    ARDUINO_SIM_DISCONNECT_RATE = os.getenv("ARDUINO_SIM_DISCONNECT_RATE")
+    ARDUINO_SIM_DISCONNECT_SECONDS = os.getenv("ARDUINO_SIM_DISCONNECT_SECONDS")
+    ARDUINO_SIM_SEED = os.getenv("ARDUINO_SIM_SEED")
     DEVICES_CONFIG_PATH = os.getenv("DEVICES_CONFIG_PATH", os.path.join(os.path.dirname(__file__), '..', 'config', 'devices.json'))
+    DEVICE_SNAPSHOT_DEBOUNCE = os.getenv("DEVICE_SNAPSHOT_DEBOUNCE", "2.0")  # Quiet seconds before devices.json is rewritten
+    DEVICE_SNAPSHOT_MAX_DELAY = os.getenv("DEVICE_SNAPSHOT_MAX_DELAY", "10.0")  # Upper bound on snapshot delay under constant toggling
+    DEVICE_JOURNAL_FSYNC = os.getenv("DEVICE_JOURNAL_FSYNC", "false")  # fsync each journal append (slower, survives power loss)
+    DEVICE_HISTORY_DB = os.getenv("DEVICE_HISTORY_DB", os.path.join(os.path.dirname(__file__), '..', 'config', 'device_history.db'))  # SQLite state history; empty disables it
+    DEVICE_HISTORY_FLUSH_INTERVAL = os.getenv("DEVICE_HISTORY_FLUSH_INTERVAL", "1.0")  # Max seconds a transition waits before its batch insert
+    DEVICE_HISTORY_RETENTION_DAYS = os.getenv("DEVICE_HISTORY_RETENTION_DAYS", "90")  # Raw transitions kept this long
+    DEVICE_HISTORY_ROLLUP_RETENTION_DAYS = os.getenv("DEVICE_HISTORY_ROLLUP_RETENTION_DAYS", "730")  # Hourly rollups kept this long
+    DEVICE_SCHEDULES_PATH = os.getenv("DEVICE_SCHEDULES_PATH", os.path.join(os.path.dirname(__file__), '..', 'config', 'schedules.json'))  # Persisted timers and recurring actions
+    DEVICE_SCHEDULE_CATCH_UP_SECONDS = os.getenv("DEVICE_SCHEDULE_CATCH_UP_SECONDS", "900")  # Runs missed by less than this still fire after downtime
+    DEVICE_RULES_PATH = os.getenv("DEVICE_RULES_PATH", os.path.join(os.path.dirname(__file__), '..', 'config', 'rules.json'))  # Declarative automations
+    DEVICE_RULES_MAX_DEPTH = os.getenv("DEVICE_RULES_MAX_DEPTH", "4")  # Longest chain of rules triggering rules
+    DEVICE_RULES_MAX_FIRES_PER_MINUTE = os.getenv("DEVICE_RULES_MAX_FIRES_PER_MINUTE", "30")  # Per-rule rate limit
+    SENSOR_HISTORY_SIZE = os.getenv("SENSOR_HISTORY_SIZE", "4096")  # Samples kept in memory per sensor
     DOWNLOAD_FOLDER_PATH = os.getenv("DOWNLOAD_FOLDER_PATH", os.path.join(os.path.dirname(__file__), '..', 'downloads'))
     WHISPER_MODEL_PATH = os.getenv("WHISPER_MODEL_PATH", os.path.join(os.path.dirname(__file__), '..', 'app', 'voice', 'base.pt'))
+    STT_BACKEND = os.getenv("STT_BACKEND", "whisper")  # whisper (openai-whisper, fp32) or faster-whisper (CTranslate2)
+    FASTER_WHISPER_MODEL_PATH = os.getenv("FASTER_WHISPER_MODEL_PATH", "")  # Defaults to faster-whisper-<size>/ next to WHISPER_MODEL_PATH
+    STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")  # faster-whisper weights: int8, int8_float32, float32
+    STT_CPU_THREADS = os.getenv("STT_CPU_THREADS", "0")  # Inference threads; 0 keeps the library default
+    STT_STREAM_END_SILENCE_MS = os.getenv("STT_STREAM_END_SILENCE_MS", "400")  # /ws/stt: silence that ends an utterance
+    STT_STREAM_PARTIAL_INTERVAL_MS = os.getenv("STT_STREAM_PARTIAL_INTERVAL_MS", "700")  # /ws/stt: speech between partial transcripts
+    STT_BATCH_SIZE = os.getenv("STT_BATCH_SIZE", "8")  # Clips decoded together in one encoder pass; 1 disables batching
+    STT_BATCH_MAX_WAIT_MS = os.getenv("STT_BATCH_MAX_WAIT_MS", "20")  # How long the first clip waits for others to join its batch
+    STT_QUEUE_LIMIT = os.getenv("STT_QUEUE_LIMIT", "32")  # Queued clips beyond this get 503 Retry-After
+    STT_VAD = os.getenv("STT_VAD", "true")  # Trim silence before inference and skip clips without speech
+    STT_VAD_THRESHOLD_DB = os.getenv("STT_VAD_THRESHOLD_DB", "9")  # Speech must be this far above the noise floor
+    MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "stt,tts")  # Models loaded and warmed up at startup ("none" loads on first use; "stt_pool" starts the long-form workers)
+    MODEL_IDLE_UNLOAD_SECONDS = os.getenv("MODEL_IDLE_UNLOAD_SECONDS", "0")  # Unload models unused this long; 0 keeps them resident
+    WHISPER_MMAP = os.getenv("WHISPER_MMAP", "true")  # Memory-map the local Whisper checkpoint so workers share its pages
+    STT_CACHE_SIZE = os.getenv("STT_CACHE_SIZE", "512")  # Transcripts kept in memory, keyed by audio hash; 0 disables
+    STT_CACHE_DIR = os.getenv("STT_CACHE_DIR", "")  # Optional on-disk transcript cache shared across restarts
+    STT_LANGUAGE = os.getenv("STT_LANGUAGE", "en")  # Language pinned by the command and dictation profiles
+    STT_DEFAULT_PROFILE = os.getenv("STT_DEFAULT_PROFILE", "dictation")  # /stt/transcribe: command, dictation or accurate
+    STT_COMMAND_PROFILE = os.getenv("STT_COMMAND_PROFILE", "command")  # /voice/chat, /ws/stt and the wake word assistant
+    STT_LONG_FORM_SECONDS = os.getenv("STT_LONG_FORM_SECONDS", "60")  # Longer recordings are chunked at pauses and run in parallel; 0 disables
+    STT_LONG_FORM_WORKERS = os.getenv("STT_LONG_FORM_WORKERS", "0")  # Worker processes with their own model; 0 = half the cores, 1 = in-process batching
+    STT_LONG_FORM_OVERLAP_MS = os.getenv("STT_LONG_FORM_OVERLAP_MS", "1000")  # Audio repeated across a cut through continuous speech
+    WAKE_WORD_MODEL_PATH = os.getenv("WAKE_WORD_MODEL_PATH", os.path.join(os.path.dirname(__file__), '..', 'app', 'voice', 'wake_word.npz'))  # Enrolled with python -m app.voice.wake_word
+    WAKE_WORD_THRESHOLD = os.getenv("WAKE_WORD_THRESHOLD", "")  # Overrides the enrolled threshold; lower means fewer false accepts
+    WAKE_WORD_COMMAND_TIMEOUT = os.getenv("WAKE_WORD_COMMAND_TIMEOUT", "6")  # Seconds to start speaking after the wake word
     HF_TOKEN = os.getenv("HF_TOKEN")
     TTS_MODEL = os.getenv("TTS_MODEL", "XTTS")  # Default to XTTS if not set
     XTTS_PATH = os.getenv("XTTS_PATH")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the indexed device registry.
+
+Generates 10k synthetic devices, then compares the registry's id lookup and
+filtered queries against the linear scans they replaced.
+
+Usage:
+    python tests/benchmark_device_registry.py [num_devices]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.devices.hardware import ArduinoSimulator
+
+LOCATIONS = ["bedroom", "living_room", "kitchen", "bathroom", "office", "garage", "hall", "garden"]
+TYPES = ["lamp", "ac", "tv", "fan", "heater", "blinds"]
+
+
+def make_devices(count: int):
+    rng = random.Random(42)
+    devices = []
+    for i in range(count):
+        location = f"{rng.choice(LOCATIONS)}_{i % 50}"
+        device_type = rng.choice(TYPES)
+        devices.append({
+            "id": f"device_{i}",
+            "name": f"Device {i}",
+            "description": f"Synthetic {device_type} #{i}",
+            "type": device_type,
+            "location": location,
+            "pin": 2 + i % 12,
+            "status": rng.choice(["on", "off"]),
+        })
+    return devices
+
+
+def timed(label: str, fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / repeat * 1e6:>10.2f} us/op")
+    return elapsed / repeat
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    devices = make_devices(count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "devices.json")
+        with open(config_path, "w") as f:
+            json.dump(devices, f)
+
+        start = time.perf_counter()
+        sim = ArduinoSimulator(config_path)
+        print(f"Loaded and indexed {count} devices in {(time.perf_counter() - start) * 1e3:.1f} ms\n")
+
+        ids = [f"device_{i}" for i in random.Random(1).sample(range(count), 1000)]
+
+        def linear_find():
+            for device_id in ids:
+                next((d for d in sim.devices if d["id"] == device_id), None)
+
+        def indexed_find():
+            for device_id in ids:
+                sim._find_device(device_id)
+
+        linear = timed("linear _find_device x1000", linear_find, 3)
+        indexed = timed("indexed _find_device x1000", indexed_find, 100)
+        print(f"{'speedup':<40} {linear / indexed:>10.0f}x\n")
+
+        def linear_query():
+            [d for d in sim.devices if d["location"] == "kitchen_7" and d["type"] == "lamp" and d["status"] == "off"]
+
+        def indexed_query():
+            sim.query_devices(location="kitchen_7", type="lamp", status="off")
+
+        linear = timed("linear filter (location+type+status)", linear_query, 50)
+        indexed = timed("indexed query_devices", indexed_query, 1000)
+        print(f"{'speedup':<40} {linear / indexed:>10.0f}x\n")
+
+        def rebuild_states():
+            {device["id"]: device for device in sim.devices}
+
+        linear = timed("rebuild get_device_states dict", rebuild_states, 50)
+        indexed = timed("registry get_device_states", sim.get_device_states, 1000)
+        print(f"{'speedup':<40} {linear / indexed:>10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
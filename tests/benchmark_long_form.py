@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Wall-clock time of long-form transcription against the number of worker processes.
+
+Builds a long recording by repeating the fixture clips in tests/fixtures/stt
+with short pauses between them (see benchmark_stt_backends.py --generate),
+then transcribes it:
+- sequentially, the whole file through the backend's own 30 s sliding window
+- chunked at pauses (long_form.py) across 1, 2, 4 ... worker processes
+
+Worker start-up and model loading are done before timing. With enough cores
+the chunked time should fall close to sequential time / workers.
+
+Usage:
+    python tests/benchmark_long_form.py [minutes] [workers] [profile]
+    python tests/benchmark_long_form.py 5 1,2,4 dictation
+"""
+
+import glob
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from app.voice.audio_decode import SAMPLE_RATE, decode_audio
+from app.voice.long_form import LongFormTranscription, start_pool, transcribe_chunk
+from app.voice.stt_backends import create_stt_backend
+from app.voice.stt_profiles import get_profile
+
+
+def long_recording(minutes):
+    clips = []
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "stt", "*.wav"))):
+        with open(path, "rb") as f:
+            clips.append(decode_audio(f.read()))
+    if not clips:
+        return None
+    rng = np.random.default_rng(0)
+    parts, samples = [], 0
+    while samples < minutes * 60 * SAMPLE_RATE:
+        for clip in clips:
+            pause = (0.002 * rng.standard_normal(int(rng.uniform(0.4, 1.2) * SAMPLE_RATE))).astype(np.float32)
+            parts += [clip, pause]
+            samples += clip.size + pause.size
+    return np.concatenate(parts)
+
+
+def backend_options(cpu_threads):
+    return dict(
+        model_size="base",
+        whisper_model_path=Settings.WHISPER_MODEL_PATH,
+        model_dir=Settings.FASTER_WHISPER_MODEL_PATH or None,
+        compute_type=Settings.STT_COMPUTE_TYPE,
+        cpu_threads=cpu_threads,
+    )
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    worker_counts = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else "1,2,4").split(",")]
+    profile = get_profile(sys.argv[3] if len(sys.argv) > 3 else "dictation")
+    cores = os.cpu_count() or 1
+
+    audio = long_recording(minutes)
+    if audio is None:
+        print("No fixture clips in tests/fixtures/stt (run benchmark_stt_backends.py --generate)")
+        return
+    duration = audio.size / SAMPLE_RATE
+    print(f"{duration / 60:.1f} min recording, {Settings.STT_BACKEND} backend, {profile.name} profile, {cores} cores")
+
+    backend = create_stt_backend(Settings.STT_BACKEND, **backend_options(int(Settings.STT_CPU_THREADS)))
+    backend.load()
+    started = time.perf_counter()
+    backend.transcribe(audio, profile)
+    sequential = time.perf_counter() - started
+    print(f"\n{'mode':<22}{'wall s':>9}{'RTF':>8}{'speed-up':>10}")
+    print(f"{'sequential':<22}{sequential:>9.1f}{sequential / duration:>8.3f}{1.0:>10.2f}")
+
+    for workers in worker_counts:
+        pool = start_pool(workers, Settings.STT_BACKEND, backend_options(max(1, cores // workers)))
+        wait([pool.submit(transcribe_chunk, np.zeros(SAMPLE_RATE, dtype=np.float32)) for _ in range(workers)])
+        runner = LongFormTranscription(lambda clip, p: pool.submit(transcribe_chunk, clip, p),
+                                       max_in_flight=2 * workers)
+        started = time.perf_counter()
+        first_chunk = None
+        for event in runner.run(audio, profile):
+            if event["type"] == "chunk" and first_chunk is None:
+                first_chunk = time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+        label = f"chunked x{workers}"
+        print(f"{label:<22}{elapsed:>9.1f}{elapsed / duration:>8.3f}{sequential / elapsed:>10.2f}"
+              f"   first chunk after {first_chunk:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
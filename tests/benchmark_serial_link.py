@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the serial command path against the simulated link.
+
+Drives SerialConnectionManager (worker, timeouts, reconnects) over a
+SimulatedSerialPort using one of the ARDUINO_SIM_* fault profiles, so the
+queueing and recovery logic can be measured on a machine with no Arduino.
+Each profile runs with text lines and with the binary framing (protocol.py).
+
+Usage:
+    python tests/benchmark_serial_link.py [profile] [commands] [clients] [seed]
+    python tests/benchmark_serial_link.py realistic 500 8
+    python tests/benchmark_serial_link.py flaky 2000 8 42
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.devices.connection import SerialConnectionManager
+from app.devices.simulation import FAULT_PROFILES, LinkFaultModel, SimulatedSerialPort
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(profile: str, commands: int, clients: int, max_in_flight: int, seed: int, protocol: str):
+    model = LinkFaultModel(seed=seed, disconnect_seconds=0.5, **FAULT_PROFILES[profile])
+    manager = SerialConnectionManager(
+        "sim://",
+        ready_timeout=1.0,
+        reconnect_base_delay=0.05,
+        reconnect_max_delay=1.0,
+        heartbeat_interval=1.0,
+        outage_queue_timeout=5.0,
+        max_in_flight=max_in_flight,
+        ack_timeout=0.2,
+        port_factory=lambda: SimulatedSerialPort(model),
+        protocol=protocol,
+    )
+    manager.start()
+    deadline = time.monotonic() + 5
+    while manager.state != "connected" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    per_client = commands // clients
+
+    def client(index: int):
+        for i in range(per_client):
+            pin = 2 + (index + i) % 12
+            start = time.perf_counter()
+            try:
+                reply = manager.submit_pin(pin, i % 2).result(timeout=10)
+                ok = reply == "OK"
+            except Exception as e:
+                ok, reply = False, type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    failures.append(reply)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    status = manager.status()
+    manager.close()
+
+    total = per_client * clients
+    print(f"{profile:<10} {protocol:<6} in_flight={max_in_flight:<2} "
+          f"{total / wall:>8.1f} cmd/s  p50={percentile(latencies, 0.5) * 1e3:>7.1f} ms  "
+          f"p99={percentile(latencies, 0.99) * 1e3:>7.1f} ms  failed={len(failures):<4} "
+          f"reconnects={status['reconnect_count']}")
+
+
+def main():
+    profile = sys.argv[1] if len(sys.argv) > 1 else "realistic"
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    if profile not in FAULT_PROFILES:
+        print(f"Unknown profile '{profile}'. Choose from: {', '.join(FAULT_PROFILES)}")
+        sys.exit(1)
+
+    for protocol, max_in_flight in (("text", 1), ("text", 4), ("binary", 4)):
+        run(profile, commands, clients, max_in_flight, seed, protocol)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of ArduinoController over a real serial port.
+
+Starts the pty firmware emulator (app/devices/emulator.py), points ARDUINO_PORT
+at its slave device and drives control_device() from several threads, so the
+whole path (pyserial, SerialCommandWorker, SerialConnectionManager, device
+state updates) is measured. Linux/macOS only.
+
+Usage:
+    python tests/benchmark_serial_pty.py [profile] [commands] [clients] [protocol]
+    python tests/benchmark_serial_pty.py ideal 2000 8
+    python tests/benchmark_serial_pty.py lossy 400 8 text
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from app.devices.emulator import PtyArduinoEmulator
+from app.devices.hardware import ArduinoController
+from app.devices.simulation import FAULT_PROFILES, LinkFaultModel
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(profile: str, commands: int, clients: int, max_in_flight: int, config_path: str, protocol: str):
+    with open(config_path, "r", encoding="utf-8") as f:
+        device_ids = [device["id"] for device in json.load(f) if device.get("pin") is not None]
+
+    with PtyArduinoEmulator(LinkFaultModel(seed=1, **FAULT_PROFILES[profile])) as emulator:
+        Settings.USE_ARDUINO_SIMULATOR = "false"
+        Settings.ARDUINO_PORT = emulator.port
+        Settings.ARDUINO_MAX_IN_FLIGHT = str(max_in_flight)
+        Settings.ARDUINO_PROTOCOL = protocol
+        Settings.ARDUINO_READY_TIMEOUT = "5"
+        Settings.ARDUINO_HEARTBEAT_INTERVAL = "30"
+
+        controller = ArduinoController(config_path)
+        if controller.connection is None:
+            print("Could not open the emulator port; ArduinoController fell back to the simulator")
+            sys.exit(1)
+        deadline = time.monotonic() + 10
+        while not controller.connection.is_connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        per_client = commands // clients
+
+        def client(index: int):
+            for i in range(per_client):
+                device_id = device_ids[(index + i) % len(device_ids)]
+                action = "on" if i % 2 else "off"
+                start = time.perf_counter()
+                result = controller.control_device({"device_id": device_id, "action": action})
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if result.startswith("Error"):
+                        failures.append(result)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        frames = controller.connection_status().get("coalescing", {}).get("frames_sent", "-")
+        controller._cleanup_serial()
+
+    total = per_client * clients
+    print(f"{profile:<10} {protocol:<6} in_flight={max_in_flight:<2} "
+          f"{total / wall:>8.1f} cmd/s  p50={percentile(latencies, 0.5) * 1e3:>7.2f} ms  "
+          f"p99={percentile(latencies, 0.99) * 1e3:>7.2f} ms  failed={len(failures)}  frames={frames}")
+
+
+def main():
+    profile = sys.argv[1] if len(sys.argv) > 1 else "ideal"
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    protocol = sys.argv[4] if len(sys.argv) > 4 else "auto"
+    if profile not in FAULT_PROFILES:
+        print(f"Unknown profile '{profile}'. Choose from: {', '.join(FAULT_PROFILES)}")
+        sys.exit(1)
+
+    # Work on a copy so the benchmark never touches the real device states
+    workdir = tempfile.mkdtemp(prefix="pty_bench_")
+    try:
+        config_path = os.path.join(workdir, "devices.json")
+        shutil.copy(os.path.join(project_root, "config", "devices.json"), config_path)
+        for max_in_flight in (1, 4):
+            run(profile, commands, clients, max_in_flight, config_path, protocol)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Compare STT backends on the fixture clips in tests/fixtures/stt.
+
+For every backend the model is loaded once (not timed), each clip is
+transcribed once to warm up and then `repeats` more times with every decoding
+profile (stt_profiles.py). Reported per backend and profile: real-time factor
+(transcription time / audio duration, lower is better) and word error rate
+against the reference transcripts in clips.json.
+
+The clips are short spoken commands, 16 kHz mono WAV. Record them yourself or
+let the configured TTS engine (TTS_MODEL) speak the reference texts once with
+--generate.
+
+Usage:
+    python tests/benchmark_stt_backends.py [backends] [repeats] [profiles] [--generate]
+    python tests/benchmark_stt_backends.py whisper,faster-whisper 3 command,dictation,accurate
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import wave
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from app.voice.stt_backends import create_stt_backend
+from app.voice.stt_profiles import get_profile
+
+CLIPS_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "stt")
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """(substitutions + deletions + insertions) / reference words, by word-level edit distance."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def wav_duration(path):
+    with wave.open(path, "rb") as audio:
+        return audio.getnframes() / float(audio.getframerate())
+
+
+def load_clips():
+    with open(os.path.join(CLIPS_DIR, "clips.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    clips = [dict(clip, path=os.path.join(CLIPS_DIR, clip["file"])) for clip in manifest]
+    missing = [clip["file"] for clip in clips if not os.path.exists(clip["path"])]
+    if missing:
+        print(f"Skipping {len(missing)} missing clip(s): {', '.join(missing)} (use --generate)")
+    return [clip for clip in clips if os.path.exists(clip["path"])]
+
+
+def generate_clips():
+    from app.voice.TTS.tts_impl_xtts import XTTS_TTS
+    from app.voice.TTS.tts_impl_daya import DAYA_TTS
+    tts = DAYA_TTS() if Settings.TTS_MODEL.strip().split()[0] == "DAYA" else XTTS_TTS()
+    with open(os.path.join(CLIPS_DIR, "clips.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for clip in manifest:
+        path = os.path.join(CLIPS_DIR, clip["file"])
+        if not os.path.exists(path):
+            tts.synthesize_to_file(clip["text"], output_path=path)
+            print(f"Generated {clip['file']}")
+
+
+def run_backend(name, clips, repeats, profiles):
+    backend = create_stt_backend(
+        name, "base",
+        whisper_model_path=Settings.WHISPER_MODEL_PATH,
+        model_dir=Settings.FASTER_WHISPER_MODEL_PATH or None,
+        compute_type=Settings.STT_COMPUTE_TYPE,
+        cpu_threads=int(Settings.STT_CPU_THREADS),
+    )
+    started = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - started
+
+    results = []
+    for profile in profiles:
+        audio_seconds = compute_seconds = errors = 0.0
+        for clip in clips:
+            backend.transcribe(clip["path"], profile)  # warm-up
+            duration = wav_duration(clip["path"])
+            for _ in range(repeats):
+                started = time.perf_counter()
+                text = backend.transcribe(clip["path"], profile)
+                compute_seconds += time.perf_counter() - started
+                audio_seconds += duration
+            errors += word_error_rate(clip["text"], text)
+            print(f"  [{name}/{profile.name}] {clip['file']}: {text.strip()!r}")
+        results.append({
+            "backend": name,
+            "profile": profile.name,
+            "load_s": load_time,
+            "rtf": compute_seconds / audio_seconds,
+            "wer": errors / len(clips),
+            "latency_ms": 1000 * compute_seconds / (repeats * len(clips)),
+        })
+    return results
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    backends = (args[0] if args else "whisper,faster-whisper").split(",")
+    repeats = int(args[1]) if len(args) > 1 else 3
+    profiles = [get_profile(name) for name in (args[2] if len(args) > 2 else "command,dictation,accurate").split(",")]
+    if "--generate" in sys.argv:
+        generate_clips()
+
+    clips = load_clips()
+    if not clips:
+        print(f"No fixture clips in {CLIPS_DIR}")
+        return
+    print(f"{len(clips)} clips, {sum(wav_duration(c['path']) for c in clips):.1f}s of audio, "
+          f"{repeats} timed runs each, STT_CPU_THREADS={Settings.STT_CPU_THREADS}")
+
+    results = []
+    for name in backends:
+        try:
+            results.extend(run_backend(name, clips, repeats, profiles))
+        except Exception as e:
+            print(f"  [{name}] unavailable: {e}")
+
+    print(f"\n{'backend':<16}{'profile':<11}{'load s':>8}{'RTF':>8}{'ms/clip':>10}{'WER':>8}")
+    for result in results:
+        print(f"{result['backend']:<16}{result['profile']:<11}{result['load_s']:>8.2f}{result['rtf']:>8.3f}"
+              f"{result['latency_ms']:>10.0f}{result['wer']:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
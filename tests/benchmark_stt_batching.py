@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Throughput and tail latency of BatchedTranscriber under concurrent load.
+
+`clients` threads each transcribe `requests` clips back to back through one
+BatchedTranscriber in front of the configured STT backend (STT_BACKEND),
+once per batch size. Batch size 1 is the unbatched baseline. Uses the
+fixture clips in tests/fixtures/stt when present, otherwise 3 s of noise.
+
+Usage:
+    python tests/benchmark_stt_batching.py [clients] [requests] [batch sizes]
+    python tests/benchmark_stt_batching.py 8 4 1,4,8
+"""
+
+import glob
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from app.voice.audio_decode import SAMPLE_RATE, decode_audio
+from app.voice.stt_backends import create_stt_backend
+from app.voice.stt_batching import BatchedTranscriber
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def load_clips():
+    clips = []
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "stt", "*.wav"))):
+        with open(path, "rb") as f:
+            clips.append(decode_audio(f.read()))
+    if not clips:
+        rng = np.random.default_rng(0)
+        clips = [(0.05 * rng.standard_normal(3 * SAMPLE_RATE)).astype(np.float32)]
+    return clips
+
+
+def run(backend, clips, clients, requests, batch_size):
+    transcriber = BatchedTranscriber(backend.transcribe_batch, max_batch=batch_size,
+                                     max_wait=int(Settings.STT_BATCH_MAX_WAIT_MS) / 1000,
+                                     max_queue=clients * requests)
+    transcriber.start()
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        for i in range(requests):
+            clip = clips[(index + i) % len(clips)]
+            started = time.perf_counter()
+            transcriber.submit(clip).result()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats = transcriber.stats()
+    transcriber.close()
+    return elapsed, latencies, stats
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    batch_sizes = [int(size) for size in (sys.argv[3] if len(sys.argv) > 3 else "1,4,8").split(",")]
+
+    backend = create_stt_backend(
+        Settings.STT_BACKEND, "base",
+        whisper_model_path=Settings.WHISPER_MODEL_PATH,
+        model_dir=Settings.FASTER_WHISPER_MODEL_PATH or None,
+        compute_type=Settings.STT_COMPUTE_TYPE,
+        cpu_threads=int(Settings.STT_CPU_THREADS),
+    )
+    backend.load()
+    clips = load_clips()
+    backend.transcribe_batch(clips[:1])  # warm-up
+    print(f"{backend.name}: {clients} clients x {requests} requests, {len(clips)} distinct clip(s)")
+
+    print(f"{'batch':>6}{'clips/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'mean batch':>12}")
+    for batch_size in batch_sizes:
+        elapsed, latencies, stats = run(backend, clips, clients, requests, batch_size)
+        print(f"{batch_size:>6}{len(latencies) / elapsed:>10.2f}"
+              f"{1000 * percentile(latencies, 0.5):>10.0f}{1000 * percentile(latencies, 0.95):>10.0f}"
+              f"{1000 * max(latencies):>10.0f}{stats['mean_batch']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+False-accept / false-reject rates and CPU cost of the wake word detector.
+
+Fixture clips live in tests/fixtures/wake_word (see phrases.json): recordings
+of the wake phrase ("positive") and other speech ("negative"). The command
+clips in tests/fixtures/stt are used as extra negatives when present. Record
+them yourself or let the configured TTS engine (TTS_MODEL) speak the
+phrases once with --generate.
+
+The first `enroll` positives build the model (unless --model loads one); the
+remaining positives measure false rejects, each surrounded by a second of
+background noise and fed in 32 ms blocks like the microphone would. All
+negatives are streamed back to back through one detector for false accepts
+per hour. CPU is process time divided by audio time, as % of one core, for
+that stream and for a minute of silence and of room noise.
+
+Usage:
+    python tests/benchmark_wake_word.py [enroll] [--model path] [--generate]
+    python tests/benchmark_wake_word.py 3
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from config.settings import Settings
+from app.voice.audio_decode import SAMPLE_RATE, decode_audio
+from app.voice.wake_word import WakeWordDetector, WakeWordModel
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "wake_word")
+STT_CLIPS_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "stt")
+BLOCK = 512
+
+
+def load_manifest():
+    with open(os.path.join(FIXTURES_DIR, "phrases.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def generate_clips():
+    from app.voice.TTS.tts_impl_xtts import XTTS_TTS
+    from app.voice.TTS.tts_impl_daya import DAYA_TTS
+    tts = DAYA_TTS() if Settings.TTS_MODEL.strip().split()[0] == "DAYA" else XTTS_TTS()
+    manifest = load_manifest()
+    for clip in manifest["positive"] + manifest["negative"]:
+        path = os.path.join(FIXTURES_DIR, clip["file"])
+        if not os.path.exists(path):
+            tts.synthesize_to_file(clip["text"], output_path=path, voice=clip["voice"])
+            print(f"Generated {clip['file']}")
+
+
+def read_clip(path):
+    with open(path, "rb") as f:
+        return decode_audio(f.read())
+
+
+def load_clips(kind):
+    paths = [os.path.join(FIXTURES_DIR, clip["file"]) for clip in load_manifest()[kind]]
+    if kind == "negative":
+        paths += sorted(glob.glob(os.path.join(STT_CLIPS_DIR, "*.wav")))
+    present = [path for path in paths if os.path.exists(path)]
+    if len(present) < len(paths):
+        print(f"Skipping {len(paths) - len(present)} missing {kind} clip(s) (use --generate)")
+    return [read_clip(path) for path in present]
+
+
+def room_noise(seconds, level_db=-50.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return (10 ** (level_db / 20) * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def stream(detector, audio):
+    """Feed `audio` in microphone-sized blocks; return (detections, CPU seconds)."""
+    found = 0
+    started = time.process_time()
+    for i in range(0, audio.size, BLOCK):
+        found += detector.feed(audio[i:i + BLOCK])
+    return found, time.process_time() - started
+
+
+def evaluate(model, threshold, positives, negative_stream):
+    rejects = sum(stream(WakeWordDetector(model, threshold=threshold),
+                         np.concatenate([room_noise(1, seed=i), clip, room_noise(1, seed=i + 1)]))[0] == 0
+                  for i, clip in enumerate(positives))
+    accepts, cpu = stream(WakeWordDetector(model, threshold=threshold), negative_stream)
+    return rejects, accepts, cpu
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if "--generate" in sys.argv:
+        generate_clips()
+    positives, negatives = load_clips("positive"), load_clips("negative")
+
+    if "--model" in sys.argv:
+        model = WakeWordModel.load(sys.argv[sys.argv.index("--model") + 1])
+        held_out = positives
+    else:
+        enroll = int(args[0]) if args else 3
+        if len(positives) <= enroll:
+            print(f"Need more than {enroll} positive clips in {FIXTURES_DIR}")
+            return
+        model = WakeWordModel.enroll(positives[:enroll])
+        held_out = positives[enroll:]
+    if not held_out or not negatives:
+        print(f"Need held-out positive and negative clips in {FIXTURES_DIR}")
+        return
+
+    negative_stream = np.concatenate([part for clip in negatives for part in (clip, room_noise(1.5))])
+    hours = negative_stream.size / SAMPLE_RATE / 3600
+    print(f"{len(model.templates)} templates, threshold {model.threshold:.2f}; "
+          f"{len(held_out)} held-out positives, {len(negatives)} negatives ({hours * 60:.1f} min)")
+
+    print(f"\n{'threshold':>10}{'FR':>8}{'FA':>6}{'FA/hour':>10}{'CPU %':>8}")
+    for factor in (0.8, 0.9, 1.0, 1.1, 1.2):
+        threshold = model.threshold * factor
+        rejects, accepts, cpu = evaluate(model, threshold, held_out, negative_stream)
+        print(f"{threshold:>10.2f}{rejects / len(held_out):>8.1%}{accepts:>6}{accepts / hours:>10.1f}"
+              f"{100 * cpu / (negative_stream.size / SAMPLE_RATE):>8.2f}")
+
+    print("\nIdle cost (60 s each):")
+    for name, audio in (("digital silence", np.zeros(60 * SAMPLE_RATE, dtype=np.float32)),
+                        ("room noise -50 dBFS", room_noise(60)),
+                        ("room noise -35 dBFS", room_noise(60, level_db=-35.0))):
+        detector = WakeWordDetector(model)
+        accepts, cpu = stream(detector, audio)
+        print(f"  {name:<22}{100 * cpu / 60:>6.2f}% of a core, "
+              f"{detector.transformed_frames}/{detector.frames} frames transformed, {accepts} false accepts")
+
+
+if __name__ == "__main__":
+    main()
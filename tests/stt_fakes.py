@@ -0,0 +1,41 @@
+from app.voice.model_manager import ModelManager
+from app.voice.stt_backends import STTBackend
+from app.voice.whisper_stt import WhisperSTT
+
+
+class FakeSTTBackend(STTBackend):
+    """
+    Stands in for a Whisper model behind the real WhisperSTT. `reply` is the
+    transcript, or a callable (audio, profile) -> transcript; with `fail` every
+    call raises. Each call's (audio, profile) is kept in `calls`, including the
+    model manager's warm-up pass on silence.
+    """
+    name = "fake"
+
+    def __init__(self, reply="", fail=False):
+        super().__init__("base")
+        self.reply = reply
+        self.fail = fail
+        self.calls = []
+
+    def load(self):
+        self.model = self.model or object()
+        return self.model
+
+    def transcribe(self, audio, profile=None):
+        self.calls.append((audio, profile))
+        if self.fail:
+            raise RuntimeError("decoder crashed")
+        return self.reply(audio, profile) if callable(self.reply) else self.reply
+
+    def load_audio(self, audio_path):
+        raise NotImplementedError
+
+
+def whisper_stt(test, backend):
+    """A WhisperSTT over `backend`, closed when `test` finishes."""
+    manager = ModelManager()
+    test.addCleanup(manager.close)
+    stt = WhisperSTT(backend=backend, manager=manager)
+    test.addCleanup(stt.batcher.close)
+    return stt
@@ -0,0 +1,64 @@
+import io
+import struct
+import unittest
+import wave
+import numpy as np
+from app.voice.audio_decode import SAMPLE_RATE, decode_audio
+
+
+def tone(rate, seconds=0.5, frequency=440.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return 0.5 * np.sin(2 * np.pi * frequency * t)
+
+
+def wav_bytes(samples, rate, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def float_wav_bytes(samples, rate):
+    data = samples.astype("<f4").tobytes()
+    fmt = struct.pack("<HHIIHH", 3, 1, rate, rate * 4, 4, 32)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+class TestAudioDecode(unittest.TestCase):
+
+    def test_pcm_wav_at_16k_is_passed_through(self):
+        samples = tone(SAMPLE_RATE)
+        audio = decode_audio(wav_bytes(samples, SAMPLE_RATE))
+        self.assertEqual(audio.dtype, np.float32)
+        np.testing.assert_allclose(audio, samples, atol=1e-4)
+
+    def test_stereo_44k_is_mixed_down_and_resampled(self):
+        left = tone(44100)
+        stereo = np.stack([left, left], axis=1).ravel()
+        audio = decode_audio(wav_bytes(stereo, 44100, channels=2))
+        self.assertEqual(audio.size, SAMPLE_RATE // 2)
+        # Away from the edges the resampled tone matches a tone generated at 16 kHz
+        np.testing.assert_allclose(audio[400:-400], tone(SAMPLE_RATE)[400:-400], atol=0.02)
+
+    def test_float_wav(self):
+        samples = tone(8000)
+        audio = decode_audio(float_wav_bytes(samples, 8000))
+        self.assertEqual(audio.size, SAMPLE_RATE // 2)
+        self.assertAlmostEqual(float(np.abs(audio).max()), 0.5, delta=0.02)
+
+    def test_raw_pcm_from_content_type(self):
+        samples = tone(SAMPLE_RATE)
+        pcm = (samples * 32767).astype(">i2").tobytes()
+        audio = decode_audio(pcm, "audio/L16; rate=16000; channels=1")
+        np.testing.assert_allclose(audio, samples, atol=1e-4)
+
+    def test_unknown_format_falls_back(self):
+        self.assertIsNone(decode_audio(b"ID3\x04\x00 not really an mp3", "audio/mpeg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
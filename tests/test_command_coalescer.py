@@ -0,0 +1,71 @@
+import threading
+import unittest
+from concurrent.futures import Future
+from app.devices.coalescer import PinCommandCoalescer
+
+
+class FakeLink:
+    """Records frames and acknowledges each one after a short delay."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.frames = []
+
+    def send(self, pin: int, value: int) -> Future:
+        return self._ack((pin, value))
+
+    def send_frame(self, pin_values) -> Future:
+        return self._ack(dict(pin_values))
+
+    def _ack(self, frame) -> Future:
+        self.frames.append(frame)
+        future: Future = Future()
+        threading.Timer(self.delay, future.set_result, args=("OK",)).start()
+        return future
+
+
+class TestPinCommandCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.link = FakeLink()
+        self.applied = []
+        self.coalescer = PinCommandCoalescer(self.link.send, window=0.05,
+                                             on_applied=lambda pin, value: self.applied.append((pin, value)),
+                                             send_frame=self.link.send_frame)
+        self.addCleanup(self.coalescer.close)
+
+    def test_burst_collapses_to_final_state(self):
+        futures = [self.coalescer.submit(8, value) for value in (1, 0, 1)]
+        futures.append(self.coalescer.submit(9, 1))
+        self.assertEqual([f.result(timeout=2) for f in futures], ["OK"] * 4)
+        self.assertEqual(sorted(self.link.frames), [(8, 1), (9, 1)])
+        self.assertEqual(sorted(self.applied), [(8, 1), (9, 1)])
+
+    def test_burst_back_to_current_state_is_skipped(self):
+        self.coalescer.submit(8, 1).result(timeout=2)
+        # Nets out to the state the pin already has: nothing is sent
+        burst = [self.coalescer.submit(8, value) for value in (0, 1)]
+        self.assertEqual([f.result(timeout=2) for f in burst], ["OK", "OK"])
+        self.assertEqual(self.link.frames, [(8, 1)])
+        self.assertEqual(self.coalescer.stats()["frames_skipped"], 1)
+
+    def test_multi_pin_frame_updates_what_a_later_burst_compares_against(self):
+        self.coalescer.submit(10, 1).result(timeout=2)
+        self.assertEqual(self.coalescer.submit_frame({10: 0, 11: 1}).result(timeout=2), "OK")
+        # Ends at 1, which the pin no longer has: it must be sent
+        burst = [self.coalescer.submit(10, value) for value in (1, 0, 1)]
+        self.assertEqual([f.result(timeout=2) for f in burst], ["OK"] * 3)
+        self.assertEqual(self.link.frames, [(10, 1), {10: 0, 11: 1}, (10, 1)])
+        self.assertEqual(self.coalescer.stats()["frames_skipped"], 0)
+
+    def test_multi_pin_frame_supersedes_held_commands_and_precedes_later_ones(self):
+        held = self.coalescer.submit(10, 1)
+        frame = self.coalescer.submit_frame({10: 0, 11: 1})
+        later = self.coalescer.submit(11, 0)
+        self.assertEqual([f.result(timeout=2) for f in (held, frame, later)], ["OK"] * 3)
+        self.assertEqual(self.link.frames, [{10: 0, 11: 1}, (11, 0)])
+        self.assertEqual(self.applied, [(10, 0), (11, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from config.settings import Settings
+from app.devices.hardware import ArduinoController
+from app.devices.pool import parse_controllers
+
+DEVICES = [
+    {"id": "hall_light", "name": "Hall Light", "description": "", "type": "lamp",
+     "location": "hall", "pin": 8, "status": "off"},
+    {"id": "garage_light", "name": "Garage Light", "description": "", "type": "lamp",
+     "location": "garage", "pin": 8, "status": "off", "controller": "garage"},
+    {"id": "shed_light", "name": "Shed Light", "description": "", "type": "lamp",
+     "location": "shed", "pin": 9, "status": "off", "controller": "shed"},
+]
+
+
+class TestControllerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.config_path = os.path.join(self.tmp.name, "devices.json")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump(DEVICES, f)
+
+        overrides = {
+            "USE_ARDUINO_SIMULATOR": "false",
+            # The shed board is unplugged
+            "ARDUINO_CONTROLLERS": f"default=sim://,garage=sim://,shed={os.path.join(self.tmp.name, 'missing')}",
+            "ARDUINO_OUTAGE_POLICY": "fail_fast",
+            "ARDUINO_READY_TIMEOUT": "1",
+            "ARDUINO_SIM_PROFILE": "ideal",
+        }
+        for name, value in overrides.items():
+            self.addCleanup(setattr, Settings, name, getattr(Settings, name, None))
+            setattr(Settings, name, value)
+
+    def test_parse_controllers(self):
+        self.assertEqual(parse_controllers("", "/dev/ttyACM0", 9600), {"default": ("/dev/ttyACM0", 9600)})
+        self.assertEqual(parse_controllers("a=COM3, b=/dev/ttyUSB0@115200", "x", 9600),
+                         {"a": ("COM3", 9600), "b": ("/dev/ttyUSB0", 115200)})
+
+    def test_routes_by_controller_and_isolates_dead_board(self):
+        controller = ArduinoController(self.config_path)
+        self.addCleanup(controller._cleanup_serial)
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline and controller.connection_status()["connected_boards"] < 2:
+            time.sleep(0.01)
+
+        status = controller.connection_status()
+        self.assertEqual(status["state"], "partial")
+        self.assertNotEqual(status["boards"]["shed"]["state"], "connected")
+
+        result = controller.control_devices([
+            {"device_id": "garage_light", "action": "on"},
+            {"device_id": "shed_light", "action": "on"},
+        ])
+        self.assertEqual(result, "Garage Light turned on; Error controlling Shed Light")
+        states = controller.get_device_states()
+        # Same pin number on another board is a different output
+        self.assertEqual(states["garage_light"]["status"], "on")
+        self.assertEqual(states["hall_light"]["status"], "off")
+        self.assertEqual(states["shed_light"]["status"], "off")
+        self.assertEqual(controller._sim_links.keys(), {"default", "garage"})
+
+
+if __name__ == "__main__":
+    unittest.main()
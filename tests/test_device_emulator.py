@@ -0,0 +1,29 @@
+import os
+import unittest
+import serial
+from app.devices.emulator import PtyArduinoEmulator
+
+
+@unittest.skipUnless(hasattr(os, "openpty"), "pty emulator needs a POSIX system")
+class TestPtyArduinoEmulator(unittest.TestCase):
+
+    def test_speaks_firmware_protocol_over_pyserial(self):
+        with PtyArduinoEmulator() as emulator:
+            port = serial.Serial(emulator.port, 9600, timeout=2)
+            try:
+                self.assertEqual(port.readline(), b"Arduino Ready\r\n")
+                port.write(b"8:1\n")
+                self.assertEqual(port.readline(), b"OK\r\n")
+                port.write(b"8:0,9:1\n")
+                self.assertEqual(port.readline(), b"OK\r\n")
+                port.write(b"PING\n")
+                self.assertEqual(port.readline(), b"PONG\r\n")
+                port.write(b"1:1\n")
+                self.assertEqual(port.readline(), b"ERROR:INVALID_PIN\r\n")
+            finally:
+                port.close()
+            self.assertEqual(emulator.pins, {8: 0, 9: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
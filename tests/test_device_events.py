@@ -0,0 +1,61 @@
+import threading
+import time
+import unittest
+from app.devices.events import DeviceEventBus
+
+
+class TestDeviceEventBus(unittest.TestCase):
+
+    def test_versions_are_monotonic_and_delivered(self):
+        bus = DeviceEventBus()
+        received = []
+        unsubscribe = bus.subscribe(received.append)
+        bus.publish("bedroom_light", {"status": "on"})
+        bus.publish("living_lamp", {"status": "on"})
+        unsubscribe()
+        bus.publish("bedroom_light", {"status": "off"})
+        self.assertEqual([e["version"] for e in received], [1, 2])
+        self.assertEqual(bus.version, 3)
+
+    def test_since_returns_delta_or_requests_resync(self):
+        bus = DeviceEventBus(backlog=2)
+        for status in ["on", "off", "on"]:
+            bus.publish("bedroom_light", {"status": status})
+        self.assertEqual([e["version"] for e in bus.since(1)], [2, 3])
+        self.assertEqual(bus.since(3), [])
+        self.assertIsNone(bus.since(0))   # fell out of the backlog
+        self.assertIsNone(bus.since(10))  # version from before a restart
+
+    def test_concurrent_publishers_deliver_in_version_order(self):
+        bus = DeviceEventBus()
+        received = []
+
+        def slow_subscriber(event):
+            time.sleep(0.001)  # widen the gap between assigning a version and delivering it
+            received.append(event["version"])
+
+        bus.subscribe(slow_subscriber)
+        threads = [threading.Thread(target=lambda: [bus.publish("bedroom_light", {"status": "on"})
+                                                    for _ in range(25)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(received, list(range(1, 101)))
+
+    def test_subscriber_may_publish(self):
+        bus = DeviceEventBus()
+        received = []
+
+        def follow(event):
+            received.append(event["version"])
+            if event["device_id"] == "bedroom_light":
+                bus.publish("hallway_light", dict(event["changes"]))
+
+        bus.subscribe(follow)
+        bus.publish("bedroom_light", {"status": "on"})
+        self.assertEqual(received, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
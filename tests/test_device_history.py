@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from app.devices.events import DeviceEventBus
+from app.devices.history import DeviceHistoryStore, split_by_hour
+
+# An hour boundary two days ago: inside the retention window, fully in the past
+T0 = (int(time.time()) // 3600 - 48) * 3600
+
+
+class TestDeviceHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "history.db")
+        self.store = DeviceHistoryStore(self.path, flush_interval=0.05)
+        self.store.start()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_split_by_hour(self):
+        self.assertEqual(split_by_hour(T0 + 3000, T0 + 4200), [(T0, 600), (T0 + 3600, 600)])
+        self.assertEqual(split_by_hour(T0, T0), [])
+
+    def test_rollups_span_hours_and_skip_repeats(self):
+        self.store.record("lamp", "off", T0)
+        self.store.record("lamp", "on", T0 + 1800)
+        self.store.record("lamp", "on", T0 + 2000)  # not a transition
+        self.store.record("lamp", "off", T0 + 3600 + 600)
+        self.assertTrue(self.store.flush())
+
+        hourly = self.store.history("lamp", T0, T0 + 7200)
+        self.assertEqual([(b["start"], b["on_seconds"], b["toggles"]) for b in hourly],
+                         [(T0, 1800, 1), (T0 + 3600, 600, 1)])
+        daily = self.store.history("lamp", T0, T0 + 7200, bucket=86400)
+        self.assertEqual(sum(b["on_seconds"] for b in daily), 2400)
+        self.assertEqual(len(self.store.transitions("lamp", T0, T0 + 7200)), 3)
+
+    def test_open_on_interval_is_counted(self):
+        self.store.record("heater", "on", T0)
+        self.assertTrue(self.store.flush())
+        hourly = self.store.history("heater", T0, T0 + 7200)
+        self.assertEqual([b["on_seconds"] for b in hourly], [3600, 3600])
+
+    def test_follows_event_bus_and_survives_restart(self):
+        bus = DeviceEventBus()
+        self.store.close()
+        self.store = DeviceHistoryStore(self.path, flush_interval=0.05)
+        self.store.start(bus, [{"id": "fan", "status": "off"}])
+        bus.publish("fan", {"status": "on"}, source="test")
+        bus.publish("fan", {"name": "Fan"}, source="test")  # not a status change
+        self.assertTrue(self.store.flush())
+        self.store.close()
+
+        # The last known state is reloaded, so an unchanged baseline is not re-recorded
+        self.store = DeviceHistoryStore(self.path, flush_interval=0.05)
+        self.store.start(bus, [{"id": "fan", "status": "on"}])
+        self.assertTrue(self.store.flush())
+        sources = [t["source"] for t in self.store.transitions("fan", 0, float("inf"))]
+        self.assertEqual(sources, ["startup", "test"])
+
+
+if __name__ == "__main__":
+    unittest.main()
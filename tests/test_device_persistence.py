@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+from app.devices.hardware import ArduinoSimulator
+from app.devices.persistence import DeviceStateStore
+
+
+class TestDeviceStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp.name, "devices.json")
+        with open(self.config_path, "w") as f:
+            json.dump([{"id": "bedroom_light", "status": "off"}, {"id": "living_lamp", "status": "off"}], f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read_config(self):
+        with open(self.config_path) as f:
+            return {d["id"]: d["status"] for d in json.load(f)}
+
+    def test_changes_are_journaled_not_written_inline(self):
+        store = DeviceStateStore(self.config_path, debounce=60, max_delay=60)
+        devices = store.load()
+        devices[0]["status"] = "on"
+        store.record("bedroom_light", "on")
+        self.assertEqual(self._read_config()["bedroom_light"], "off")
+        self.assertGreater(os.path.getsize(store.journal_path), 0)
+        store.close()
+        self.assertEqual(self._read_config()["bedroom_light"], "on")
+        self.assertEqual(os.path.getsize(store.journal_path), 0)
+
+    def test_journal_is_replayed_after_crash(self):
+        with open(self.config_path + ".journal", "w") as f:
+            f.write(json.dumps({"id": "living_lamp", "status": "on"}) + "\n")
+            f.write('{"id": "bedroom_li')  # torn write
+        store = DeviceStateStore(self.config_path)
+        devices = store.load()
+        self.assertEqual({d["id"]: d["status"] for d in devices}, {"bedroom_light": "off", "living_lamp": "on"})
+        self.assertEqual(self._read_config()["living_lamp"], "on")
+        store.close()
+
+    def test_simulator_keeps_recovered_state(self):
+        with open(self.config_path, "w") as f:
+            json.dump([{"id": "bedroom_light", "name": "Bedroom Light", "pin": 8, "status": "off"}], f)
+        simulator = ArduinoSimulator(self.config_path)
+        simulator.control_device({"device_id": "bedroom_light", "action": "on"})
+        simulator.store.close()
+        reopened = ArduinoSimulator(self.config_path)
+        self.addCleanup(reopened.store.close)
+        self.assertEqual(reopened.get_device_states()["bedroom_light"]["status"], "on")
+        self.assertEqual(reopened.get_pin(8), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
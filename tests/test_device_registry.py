@@ -0,0 +1,33 @@
+import unittest
+from app.devices.registry import DeviceRegistry
+
+
+class TestDeviceRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = DeviceRegistry([
+            {"id": "bedroom_light", "type": "lamp", "location": "bedroom", "pin": 8, "status": "off"},
+            {"id": "living_lamp", "type": "lamp", "location": "living_room", "pin": 9, "status": "on"},
+            {"id": "living_tv", "type": "tv", "location": "living_room", "pin": 10, "status": "off"},
+        ])
+
+    def test_lookup_by_id(self):
+        self.assertEqual(self.registry.get("living_tv")["pin"], 10)
+        self.assertIsNone(self.registry.get("missing"))
+
+    def test_filters_combine_and_normalize(self):
+        ids = [d["id"] for d in self.registry.query(location="Living Room", type="lamp")]
+        self.assertEqual(ids, ["living_lamp"])
+        self.assertEqual(len(self.registry.query()), 3)
+        self.assertEqual(self.registry.query(location="garage"), [])
+
+    def test_status_index_follows_updates(self):
+        device = self.registry.get("bedroom_light")
+        self.registry.set_status(device, "on")
+        self.assertEqual(device["status"], "on")
+        self.assertEqual([d["id"] for d in self.registry.query(status="on")], ["bedroom_light", "living_lamp"])
+        self.assertEqual([d["id"] for d in self.registry.query(status="off")], ["living_tv"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import datetime
+import threading
+import time
+import unittest
+from app.devices.events import DeviceEventBus
+from app.devices.rules import Rule, RuleEngine
+
+
+class FakeHome:
+    """Applies commands and publishes the resulting changes, like the controller does."""
+
+    def __init__(self, bus: DeviceEventBus):
+        self.bus = bus
+        self.states = {"lamp": {"status": "off"}, "fan": {"status": "off"}, "tv": {"status": "off"}}
+        self.commands = []
+        self.changed = threading.Event()
+
+    def execute(self, commands):
+        for command in commands:
+            self.commands.append((command["device_id"], command["action"]))
+            self.set(command["device_id"], command["action"])
+        self.changed.set()
+        return "OK"
+
+    def set(self, device_id, status):
+        if self.states[device_id]["status"] != status:
+            self.states[device_id]["status"] = status
+            self.bus.publish(device_id, {"status": status}, source="test")
+
+
+def rule(rule_id, device_id, to, then, **extra):
+    return {"id": rule_id, "when": {"device_id": device_id, "to": to},
+            "then": [{"device_id": d, "action": a} for d, a in then], **extra}
+
+
+class TestRuleEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = DeviceEventBus()
+        self.home = FakeHome(self.bus)
+        self.engine = RuleEngine("/nonexistent/rules.json", self.home.execute, self.home.states.get,
+                                 max_depth=4, max_fires_per_minute=3)
+        self.engine.start(self.bus)
+        self.addCleanup(self.engine.close)
+
+    def use(self, *specs):
+        self.engine.set_rules([Rule(spec, self.home.states.get) for spec in specs])
+
+    def settle(self):
+        time.sleep(0.1)
+
+    def test_only_indexed_rules_are_evaluated(self):
+        self.use(rule("lamp_fan", "lamp", "on", [("fan", "on")]),
+                 rule("tv_lamp", "tv", "on", [("lamp", "off")]))
+        self.home.set("lamp", "on")
+        self.assertTrue(self.home.changed.wait(2))
+        self.settle()
+        self.assertEqual(self.home.commands, [("fan", "on")])
+        # lamp -> on evaluates one rule, fan -> on evaluates none
+        self.assertEqual(self.engine.stats()["evaluations"], 1)
+
+    def test_conditions(self):
+        self.use(rule("needs_tv", "lamp", "on", [("fan", "on")], conditions=[{"device_id": "tv", "status": "on"}]))
+        self.home.set("lamp", "on")
+        self.settle()
+        self.assertEqual(self.home.commands, [])
+
+        night = Rule(rule("night", "lamp", "on", [("fan", "on")], conditions=[{"after": "22:00", "before": "06:00"}]),
+                     self.home.states.get)
+        event = {"changes": {"status": "on"}}
+        self.assertTrue(night.matches(event, "off", datetime.datetime(2024, 1, 1, 23, 30)))
+        self.assertTrue(night.matches(event, "off", datetime.datetime(2024, 1, 1, 5, 59)))
+        self.assertFalse(night.matches(event, "off", datetime.datetime(2024, 1, 1, 12, 0)))
+
+    def test_loop_is_suppressed(self):
+        # lamp on -> fan on -> lamp off -> fan off -> lamp on -> ...
+        self.use(rule("a", "lamp", "on", [("fan", "on")]),
+                 rule("b", "fan", "on", [("lamp", "off")]),
+                 rule("c", "lamp", "off", [("fan", "off")]),
+                 rule("d", "fan", "off", [("lamp", "on")]))
+        self.home.set("lamp", "on")
+        time.sleep(0.3)
+        self.assertEqual(self.home.commands, [("fan", "on"), ("lamp", "off"), ("fan", "off"), ("lamp", "on")])
+        self.assertEqual(self.engine.stats()["loops_suppressed"], 1)
+
+    def test_rate_limit(self):
+        self.use(rule("lamp_fan", "lamp", "on", [("tv", "on")]))
+        for _ in range(5):
+            self.home.set("lamp", "on")
+            self.home.set("lamp", "off")
+        self.settle()
+        self.assertEqual(self.engine.stats()["fires"], 3)
+        self.assertEqual(self.engine.stats()["rate_limited"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
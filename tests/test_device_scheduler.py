@@ -0,0 +1,91 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from app.devices.scheduler import DeviceScheduler, next_occurrence, parse_days, timing_from_request
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.fired = threading.Event()
+
+    def __call__(self, commands):
+        self.calls.append(commands)
+        self.fired.set()
+        return "; ".join(f"{c['device_id']} turned {c['action']}" for c in commands)
+
+
+class TestDeviceScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "schedules.json")
+        self.execute = Recorder()
+        self.scheduler = DeviceScheduler(self.path, self.execute, catch_up=60)
+        self.scheduler.start()
+
+    def tearDown(self):
+        self.scheduler.close()
+
+    def test_one_shot_fires_and_is_removed(self):
+        self.scheduler.schedule([{"device_id": "lamp", "action": "off"}], delay=0.05)
+        self.assertTrue(self.execute.fired.wait(2))
+        self.assertEqual(self.execute.calls, [[{"device_id": "lamp", "action": "off"}]])
+        time.sleep(0.05)
+        self.assertEqual(self.scheduler.list_jobs(), [])
+
+    def test_cancel_and_ordering(self):
+        late = self.scheduler.schedule([{"device_id": "fan", "action": "on"}], delay=3600)
+        soon = self.scheduler.schedule([{"device_id": "lamp", "action": "on"}], delay=0.1)
+        self.assertEqual([job["id"] for job in self.scheduler.list_jobs()], [soon["id"], late["id"]])
+        self.assertTrue(self.scheduler.cancel(soon["id"]))
+        self.assertFalse(self.scheduler.cancel(soon["id"]))
+        self.assertFalse(self.execute.fired.wait(0.3))
+
+    def test_jobs_persist_and_catch_up_after_restart(self):
+        self.scheduler.close()
+        now = time.time()
+        jobs = [
+            # Missed 10s ago: within the catch-up window, fires once
+            {"id": "recent", "commands": [{"device_id": "lamp", "action": "off"}], "next_run": now - 10},
+            # Missed an hour ago: skipped; the recurring job moves to its next interval
+            {"id": "stale", "commands": [{"device_id": "fan", "action": "on"}], "next_run": now - 3600, "every": 600},
+        ]
+        with open(self.path, "w") as f:
+            json.dump(jobs, f)
+
+        self.execute = Recorder()
+        self.scheduler = DeviceScheduler(self.path, self.execute, catch_up=60)
+        self.scheduler.start()
+        self.assertTrue(self.execute.fired.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(self.execute.calls, [[{"device_id": "lamp", "action": "off"}]])
+        remaining = self.scheduler.list_jobs()
+        self.assertEqual([job["id"] for job in remaining], ["stale"])
+        self.assertGreater(remaining[0]["next_run"], now)
+        self.assertTrue(remaining[0]["last_result"].startswith("Skipped"))
+
+    def test_recurrence_helpers(self):
+        self.assertEqual(parse_days("weekdays"), [0, 1, 2, 3, 4])
+        self.assertEqual(parse_days("Mon, friday"), [0, 4])
+        with self.assertRaises(ValueError):
+            parse_days("someday")
+
+        # Friday 08:00 -> the next weekday 07:00 is Monday
+        friday = datetime.datetime(2024, 3, 1, 8, 0).timestamp()
+        following = next_occurrence({"time": "07:00", "days": [0, 1, 2, 3, 4]}, friday)
+        self.assertEqual(datetime.datetime.fromtimestamp(following), datetime.datetime(2024, 3, 4, 7, 0))
+
+        self.assertEqual(timing_from_request(delay_minutes=20), {"delay": 1200.0})
+        self.assertEqual(timing_from_request(at="07:00", repeat="weekdays")["days"], [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            timing_from_request(repeat="daily")
+
+
+if __name__ == "__main__":
+    unittest.main()
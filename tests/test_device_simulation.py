@@ -0,0 +1,46 @@
+import time
+import unittest
+from app.devices.simulation import LinkFaultModel, SimulatedSerialPort, firmware_reply
+
+
+class TestFirmwareReply(unittest.TestCase):
+
+    def test_matches_firmware_protocol(self):
+        pins = {}
+        self.assertEqual(firmware_reply("8:1", pins), "OK")
+        self.assertEqual(firmware_reply("8:0,9:1,12:1", pins), "OK")
+        self.assertEqual(pins, {8: 0, 9: 1, 12: 1})
+        self.assertEqual(firmware_reply("PING", pins), "PONG")
+        self.assertEqual(firmware_reply("1:1", pins), "ERROR:INVALID_PIN")
+        self.assertEqual(firmware_reply("8:1,garbage", pins), "ERROR:INVALID_COMMAND")
+        self.assertEqual(pins[8], 0)  # a bad frame changes nothing
+
+
+class TestLinkFaultModel(unittest.TestCase):
+
+    def test_seeded_outcomes_are_reproducible(self):
+        a = LinkFaultModel(drop_rate=0.3, garble_rate=0.3, seed=7)
+        b = LinkFaultModel(drop_rate=0.3, garble_rate=0.3, seed=7)
+        self.assertEqual([a.next_outcome() for _ in range(50)], [b.next_outcome() for _ in range(50)])
+
+    def test_port_replies_after_link_time(self):
+        port = SimulatedSerialPort(LinkFaultModel(baudrate=9600, processing_ms=10), timeout=1.0)
+        self.assertEqual(port.readline(), b"Arduino Ready\r\n")
+        start = time.monotonic()
+        port.write(b"8:1\n")
+        port.flush()
+        self.assertEqual(port.readline(), b"OK\r\n")
+        # 4 bytes out + 10 ms processing + 4 bytes back at ~1 ms per byte
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+        self.assertEqual(port.pins, {8: 1})
+
+    def test_dropped_ack_yields_no_reply(self):
+        port = SimulatedSerialPort(LinkFaultModel(drop_rate=1.0), timeout=0.05)
+        port.readline()
+        port.write(b"8:1\n")
+        self.assertEqual(port.readline(), b"")
+        self.assertEqual(port.pins, {8: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from app.voice.long_form import Chunk, LongFormTranscription, plan_chunks, stitch
+from tests.stt_fakes import FakeSTTBackend, whisper_stt
+
+RATE = 16000
+
+
+def bursts(count, speech_seconds, pause_seconds=1.0):
+    """`count` stretches of a 220 Hz tone pulsing at a syllable rate, separated by low noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(speech_seconds * RATE)) / RATE
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.55 + 0.45 * np.sin(2 * np.pi * 4 * t))
+    parts = []
+    for _ in range(count):
+        parts.append(0.001 * rng.standard_normal(int(pause_seconds * RATE)))
+        parts.append(tone)
+    parts.append(0.001 * rng.standard_normal(int(pause_seconds * RATE)))
+    return np.concatenate(parts).astype(np.float32)
+
+
+class TestPlanChunks(unittest.TestCase):
+
+    def test_chunks_end_in_pauses(self):
+        audio = bursts(8, 6.0)  # 8 x 6 s of speech, 1 s pauses
+        chunks = plan_chunks(audio, max_seconds=28)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual((chunk.end - chunk.start) / RATE, 28)
+            self.assertEqual(chunk.overlap, 0)
+        for first, second in zip(chunks, chunks[1:]):
+            self.assertLessEqual(first.end, second.start)
+        speech_starts = [RATE * (1 + 7 * i) for i in range(8)]
+        for start in speech_starts:
+            self.assertTrue(any(c.start <= start + RATE // 2 < c.end for c in chunks))
+
+    def test_continuous_speech_is_cut_with_overlap(self):
+        audio = bursts(1, 70.0)
+        chunks = plan_chunks(audio, max_seconds=28, overlap_seconds=1.0)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0].overlap, 0)
+        for first, second in zip(chunks, chunks[1:]):
+            self.assertEqual(second.overlap, RATE)
+            self.assertEqual(first.end - second.start, RATE)
+        self.assertTrue(all((c.end - c.start) / RATE <= 28 for c in chunks))
+
+    def test_silence_has_no_chunks(self):
+        self.assertEqual(plan_chunks(np.zeros(RATE * 5, dtype=np.float32)), [])
+
+
+class TestStitch(unittest.TestCase):
+
+    def test_repeated_words_at_an_overlap_are_dropped(self):
+        chunks = [Chunk(0, 0, 10), Chunk(1, 9, 20, overlap=1)]
+        self.assertEqual(stitch(["The quick brown fox jumps", "fox jumps over the lazy dog."], chunks),
+                         "The quick brown fox jumps over the lazy dog.")
+
+    def test_word_fragments_at_the_cut_are_dropped(self):
+        chunks = [Chunk(0, 0, 10), Chunk(1, 9, 20, overlap=1)]
+        self.assertEqual(stitch(["Please remind me to call the plumb", "to call the plumber tomorrow"], chunks),
+                         "Please remind me to call the plumber tomorrow")
+
+    def test_chunks_split_at_pauses_are_joined_as_is(self):
+        chunks = [Chunk(0, 0, 10), Chunk(1, 12, 20)]
+        self.assertEqual(stitch(["Turn it off.", "Off the lights"], chunks), "Turn it off. Off the lights")
+
+
+class TestLongFormTranscription(unittest.TestCase):
+
+    def test_chunks_are_reported_as_they_finish_and_stitched_in_order(self):
+        pool = ThreadPoolExecutor(4)
+        self.addCleanup(pool.shutdown)
+
+        def slow_first(clip, profile):
+            # Earlier (longer) chunks finish last
+            return pool.submit(lambda: time.sleep(clip.size / RATE / 100) or f"part{clip.size // RATE}")
+
+        audio = np.concatenate([bursts(1, 20.0), bursts(1, 12.0), bursts(1, 4.0)])
+        events = list(LongFormTranscription(slow_first, max_in_flight=4).run(audio))
+        self.assertEqual(events[0]["type"], "plan")
+        chunk_events = [event for event in events if event["type"] == "chunk"]
+        self.assertEqual(len(chunk_events), events[0]["chunks"])
+        self.assertEqual([event["index"] for event in chunk_events], sorted(e["index"] for e in chunk_events)[::-1])
+        final = events[-1]
+        self.assertEqual(final["type"], "final")
+        self.assertEqual(final["text"], " ".join(event["text"] for event in sorted(chunk_events, key=lambda e: e["index"])))
+
+    def test_in_flight_chunks_are_bounded(self):
+        running, peak = [0], [0]
+        lock = threading.Lock()
+        pool = ThreadPoolExecutor(8)
+        self.addCleanup(pool.shutdown)
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return "x"
+
+        runner = LongFormTranscription(lambda clip, profile: pool.submit(work), max_in_flight=2, max_seconds=4)
+        events = list(runner.run(bursts(6, 3.0, pause_seconds=0.8)))
+        self.assertGreater(events[0]["chunks"], 2)
+        self.assertLessEqual(peak[0], 2)
+
+
+class TestWhisperSTTLongForm(unittest.TestCase):
+
+    def test_long_recordings_are_chunked(self):
+        stt = whisper_stt(self, FakeSTTBackend(lambda audio, profile: f"{audio.size // RATE}s"))
+        stt.long_form_seconds = 30
+        text = stt.transcribe_audio(bursts(8, 6.0), "command")
+        self.assertGreater(len(text.split()), 1)
+        self.assertTrue(all(word.endswith("s") for word in text.split()))
+        self.assertEqual(stt.transcribe_audio(bursts(1, 6.0), "command"), "6s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from app.voice.model_manager import ModelManager
+
+
+class FakeLoader:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.loads = 0
+        self.warmups = 0
+        self.unloads = 0
+
+    def load(self):
+        time.sleep(self.delay)
+        self.loads += 1
+        return {"weights": self.loads}
+
+    def warmup(self, model):
+        self.warmups += 1
+
+    def unload(self, model):
+        self.unloads += 1
+
+
+class TestModelManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = ModelManager(check_interval=0.05)
+        self.addCleanup(self.manager.close)
+
+    def test_loads_once_on_first_use_and_warms_up(self):
+        loader = FakeLoader(delay=0.1)
+        self.manager.register("stt", loader.load, loader.unload, loader.warmup)
+        self.assertFalse(self.manager.status()["stt"]["loaded"])
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.manager.get("stt"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((loader.loads, loader.warmups), (1, 1))
+        self.assertEqual(results, [{"weights": 1}] * 8)
+        self.assertGreaterEqual(self.manager.status()["stt"]["load_seconds"], 0.1)
+
+    def test_idle_models_are_unloaded_but_not_while_in_use(self):
+        loader = FakeLoader()
+        self.manager.register("tts", loader.load, loader.unload, idle_timeout=0.1)
+        with self.manager.use("tts"):
+            time.sleep(0.3)
+            self.assertTrue(self.manager.status()["tts"]["loaded"])
+        time.sleep(0.3)
+        self.assertFalse(self.manager.status()["tts"]["loaded"])
+        self.assertEqual(loader.unloads, 1)
+        # The next use loads it again
+        self.assertEqual(self.manager.get("tts"), {"weights": 2})
+
+    def test_unknown_model(self):
+        with self.assertRaises(KeyError):
+            self.manager.get("missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
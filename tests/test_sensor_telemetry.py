@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+import unittest
+import serial
+from app.devices.connection import SerialConnectionManager, CONNECTED
+from app.devices.emulator import PtyArduinoEmulator
+from app.devices.protocol import FrameDecoder, MAX_PAYLOAD, parse_telemetry, telemetry_to_frame
+from app.devices.telemetry import SensorRingBuffer, SensorStore
+
+
+class TestSensorStore(unittest.TestCase):
+
+    def test_ring_buffer_keeps_the_newest_samples(self):
+        buffer = SensorRingBuffer(4)
+        for i in range(6):
+            buffer.append(100.0 + i, float(i))
+        self.assertEqual(buffer.count, 4)
+        self.assertEqual(buffer.latest(), {"timestamp": 105.0, "value": 5.0})
+        self.assertEqual(buffer.stats(0)["min"], 2.0)
+        self.assertEqual(buffer.stats(104.0), {"count": 2, "mean": 4.5, "min": 4.0, "max": 5.0, "std": 0.5})
+        self.assertIsNone(buffer.stats(200.0))
+
+    def test_store_windows_and_board_prefix(self):
+        store = SensorStore(capacity=16)
+        now = time.time()
+        store.record({"temperature": 20.0}, now - 7200)
+        store.record({"temperature": 22.0}, now - 60)
+        store.record({"temperature": 24.0}, now - 30)
+        store.record({"motion": 1}, now, prefix="garage.")
+        self.assertEqual(store.sensors(), ["garage.motion", "temperature"])
+        self.assertEqual(store.stats("temperature", 3600)["mean"], 23.0)
+        self.assertEqual(store.stats("temperature", 3 * 3600)["count"], 3)
+        self.assertIsNone(store.stats("humidity"))
+
+    def test_parse_telemetry_skips_bad_pairs(self):
+        self.assertEqual(parse_telemetry("temp=21.5,bad,motion=1,x=y"), {"temp": 21.5, "motion": 1.0})
+
+    def test_framed_telemetry_splits_between_readings(self):
+        readings = {f"a{pin}": 1023.0 for pin in range(8)}
+        frames = FrameDecoder().feed(telemetry_to_frame(readings))
+        self.assertGreater(len(frames), 1)
+        self.assertTrue(all(len(payload) <= MAX_PAYLOAD for _, _, payload in frames))
+        received = {}
+        for _, _, payload in frames:
+            received.update(parse_telemetry(payload.decode("ascii")))
+        self.assertEqual(received, readings)
+
+
+@unittest.skipUnless(hasattr(os, "openpty"), "pty emulator needs a POSIX system")
+class TestTelemetryDemultiplexing(unittest.TestCase):
+
+    def run_link(self, protocol):
+        readings = []
+        received = threading.Event()
+
+        def on_telemetry(values):
+            readings.append(values)
+            if len(readings) >= 3:
+                received.set()
+
+        with PtyArduinoEmulator(telemetry_interval=0.02,
+                                sensors=lambda: {"temperature": 21.5}) as emulator:
+            connection = SerialConnectionManager(
+                emulator.port, 9600, ready_timeout=2, protocol=protocol,
+                port_factory=lambda: serial.Serial(emulator.port, 9600, timeout=1.0))
+            connection.on_telemetry = on_telemetry
+            connection.start()
+            try:
+                deadline = time.monotonic() + 3
+                while connection.state != CONNECTED and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                # Telemetry keeps arriving between (and during) command replies
+                futures = [connection.submit_pin(pin, 1) for pin in range(2, 10)]
+                self.assertEqual([f.result(timeout=3) for f in futures], ["OK"] * 8)
+                self.assertTrue(received.wait(3))
+                self.assertEqual(connection.framed, protocol == "binary")
+            finally:
+                connection.close()
+        self.assertEqual(readings[0], {"temperature": 21.5})
+        self.assertEqual(emulator.pins, {pin: 1 for pin in range(2, 10)})
+
+    def test_text_link(self):
+        self.run_link("text")
+
+    def test_framed_link(self):
+        self.run_link("binary")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,28 @@
+import os
 import serial
 import time
 
+# Port comes from ARDUINO_PORT (e.g. COM10, /dev/ttyACM0, or the pty printed by
+# `python -m app.devices.emulator`)
+port = os.getenv("ARDUINO_PORT", "COM10")
+
 # Set up the serial connection (adjust baudrate to match your Arduino sketch)
-arduino = serial.Serial(port='COM10', baudrate=9600, timeout=1)
+arduino = serial.Serial(port=port, baudrate=int(os.getenv("ARDUINO_BAUDRATE", "9600")), timeout=1)
 time.sleep(2)  # Wait for Arduino to reset
 
 # Write data to Arduino
 arduino.write(b'10:1\n')  # Must be bytes; add newline if Arduino expects it
 
+# The reply follows any "Arduino Ready" banner or telemetry lines already sent
+reply = b""
+deadline = time.time() + 3
+while time.time() < deadline:
+    reply = arduino.readline().strip()
+    if reply and reply != b"Arduino Ready" and not reply.startswith(b"T:"):
+        break
+print(f"Reply: {reply.decode(errors='replace')}")
+if reply != b"OK":
+    raise SystemExit("Expected OK for '10:1'")
+
 # Optional: close the connection
 arduino.close()
@@ -0,0 +1,104 @@
+import queue
+import threading
+import time
+import unittest
+import serial
+from app.devices.connection import SerialConnectionManager, CONNECTED
+
+
+class FakeArduino:
+    """Fake port: prints the ready banner, answers PING with PONG and everything else with OK."""
+
+    def __init__(self):
+        self.timeout = 1.0
+        self.is_open = True
+        self.broken = False
+        self.written = []
+        self._rx = queue.Queue()
+        self._rx.put(b"Arduino Ready\r\n")
+
+    def write(self, data: bytes):
+        if self.broken:
+            raise serial.SerialException("device disconnected")
+        self.written.append(data)
+        self._rx.put(b"PONG\r\n" if data == b"PING\n" else b"OK\r\n")
+
+    def flush(self):
+        pass
+
+    @property
+    def in_waiting(self) -> int:
+        return self._rx.qsize()
+
+    def readline(self) -> bytes:
+        if self.broken:
+            raise serial.SerialException("device disconnected")
+        try:
+            return self._rx.get(timeout=self.timeout)
+        except queue.Empty:
+            return b""
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSerialConnectionManager(unittest.TestCase):
+
+    def make_manager(self, **kwargs):
+        self.ports = []
+
+        def factory():
+            port = FakeArduino()
+            self.ports.append(port)
+            return port
+
+        options = dict(ready_timeout=0.5, reconnect_base_delay=0.01, heartbeat_interval=0.05, port_factory=factory)
+        options.update(kwargs)
+        manager = SerialConnectionManager("FAKE", **options)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_reconnects_after_serial_failure(self):
+        manager = self.make_manager()
+        manager.start()
+        self.assertTrue(wait_for(lambda: manager.state == CONNECTED))
+        self.assertEqual(manager.submit_pin(8, 1).result(timeout=2), "OK")
+
+        self.ports[-1].broken = True
+        self.assertTrue(wait_for(lambda: manager.reconnect_count == 1 and manager.state == CONNECTED))
+        self.assertEqual(manager.submit_pin(8, 0).result(timeout=2), "OK")
+        self.assertEqual(manager.status()["reconnect_count"], 1)
+
+    def test_commands_are_held_during_outage(self):
+        manager = self.make_manager()
+        gate = threading.Event()
+        factory = manager.port_factory
+        manager.port_factory = lambda: (gate.wait(), factory())[1]
+        manager.start()
+
+        future = manager.submit_pin(9, 1)
+        self.assertFalse(future.done())
+        gate.set()
+        self.assertEqual(future.result(timeout=2), "OK")
+
+    def test_fail_fast_policy(self):
+        manager = self.make_manager(outage_policy="fail_fast", port_factory=lambda: (_ for _ in ()).throw(OSError("no port")))
+        manager.start()
+        with self.assertRaises(ConnectionError):
+            manager.submit_pin(9, 1).result(timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from app.devices.protocol import (
+    OP_ACK, OP_SET_PINS, FrameDecoder, crc8, encode_frame, frame_to_line, frame_to_reply, line_to_frame,
+)
+from app.devices.serial_worker import SerialCommandWorker
+from app.devices.simulation import FirmwareSession, LinkFaultModel, SimulatedSerialPort
+
+
+class TestFraming(unittest.TestCase):
+
+    def test_crc8_check_value(self):
+        # CRC-8 (poly 0x07, init 0) check value
+        self.assertEqual(crc8(b"123456789"), 0xF4)
+
+    def test_round_trip_and_resync(self):
+        frame = line_to_frame(7, "8:1,12:0")
+        corrupted = bytearray(line_to_frame(6, "9:1"))
+        corrupted[-2] ^= 0x10
+        decoder = FrameDecoder()
+        frames = decoder.feed(b"noise" + bytes(corrupted) + frame[:3])
+        self.assertEqual(frames, [])
+        frames = decoder.feed(frame[3:] + encode_frame(8, OP_ACK))
+        self.assertEqual(decoder.crc_errors, 1)
+        self.assertEqual(frames[0][:2], (7, OP_SET_PINS))
+        self.assertEqual(frame_to_line(OP_SET_PINS, frames[0][2]), "8:1,12:0")
+        self.assertEqual(frame_to_reply(frames[1][1], frames[1][2]), "OK")
+
+    def test_firmware_session_speaks_both_formats(self):
+        session = FirmwareSession()
+        replies = session.feed(b"PROTO 1\n" + line_to_frame(1, "8:1") + line_to_frame(2, "1:1") + b"9:1\n")
+        self.assertEqual(replies[0][1], b"PROTO 1\r\n")
+        (seq, opcode, payload), = FrameDecoder().feed(replies[1][1])
+        self.assertEqual((seq, frame_to_reply(opcode, payload)), (1, "OK"))
+        (seq, opcode, payload), = FrameDecoder().feed(replies[2][1])
+        self.assertEqual((seq, frame_to_reply(opcode, payload)), (2, "ERROR:INVALID_PIN"))
+        self.assertEqual(replies[3][1], b"OK\r\n")
+        self.assertEqual(session.pins, {8: 1, 9: 1})
+
+
+class TestFramedWorker(unittest.TestCase):
+
+    def test_lost_replies_are_retried(self):
+        port = SimulatedSerialPort(LinkFaultModel(drop_rate=0.2, garble_rate=0.1, seed=3))
+        port.readline()
+        worker = SerialCommandWorker(port, max_in_flight=4, ack_timeout=0.05, framed=True, retries=5)
+        worker.start()
+        try:
+            # Distinct pins, so no command is superseded by a later one
+            futures = [worker.submit_pin(pin, 1) for pin in range(2, 14)]
+            self.assertEqual([f.result(timeout=5) for f in futures], ["OK"] * 12)
+        finally:
+            worker.stop()
+        self.assertGreater(worker.retransmits, 0)
+        self.assertEqual(port.pins, {pin: 1 for pin in range(2, 14)})
+
+
+if __name__ == "__main__":
+    unittest.main()
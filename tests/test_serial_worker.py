@@ -0,0 +1,83 @@
+import queue
+import threading
+import unittest
+from app.devices.serial_worker import SerialCommandWorker
+
+
+class FakeSerial:
+    """Loopback port that answers every command line with 'OK' after a short delay."""
+
+    def __init__(self, reply: bytes = b"OK\r\n", delay: float = 0.002):
+        self.reply = reply
+        self.delay = delay
+        self.timeout = 1.0
+        self.written = []
+        self._rx = queue.Queue()
+
+    def write(self, data: bytes):
+        self.written.append(data)
+        if self.reply:
+            threading.Timer(self.delay, self._rx.put, args=(self.reply,)).start()
+
+    def flush(self):
+        pass
+
+    @property
+    def in_waiting(self) -> int:
+        return self._rx.qsize()
+
+    def readline(self) -> bytes:
+        try:
+            return self._rx.get(timeout=self.timeout)
+        except queue.Empty:
+            return b""
+
+    def reset_input_buffer(self):
+        while not self._rx.empty():
+            self._rx.get_nowait()
+
+
+class TestSerialCommandWorker(unittest.TestCase):
+
+    def test_concurrent_commands_are_all_acknowledged(self):
+        port = FakeSerial()
+        worker = SerialCommandWorker(port, max_in_flight=4)
+        worker.start()
+        try:
+            futures = []
+            threads = [
+                threading.Thread(target=lambda i=i: futures.append(worker.submit_pin(i, 1)))
+                for i in range(2, 14)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertTrue(all(f.result(timeout=2) == "OK" for f in futures))
+            # Every command went out as its own complete line
+            self.assertEqual(sorted(port.written), sorted(f"{i}:1\n".encode() for i in range(2, 14)))
+        finally:
+            worker.stop()
+
+    def test_multi_pin_frame_gets_one_ack(self):
+        port = FakeSerial()
+        worker = SerialCommandWorker(port)
+        worker.start()
+        try:
+            self.assertEqual(worker.submit_pins({8: 0, 9: 0, 12: 0}).result(timeout=2), "OK")
+            self.assertEqual(port.written, [b"8:0,9:0,12:0\n"])
+        finally:
+            worker.stop()
+
+    def test_missing_ack_times_out(self):
+        worker = SerialCommandWorker(FakeSerial(reply=b""), ack_timeout=0.05)
+        worker.start()
+        try:
+            with self.assertRaises(TimeoutError):
+                worker.submit_pin(8, 1).result(timeout=2)
+        finally:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
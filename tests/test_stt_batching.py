@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+import numpy as np
+from app.voice.stt_batching import BatchedTranscriber, TranscriptionQueueFull
+
+
+class FakeModel:
+    """Batch call that costs a fixed overhead plus a little per clip, like a shared encoder pass."""
+
+    def __init__(self, overhead=0.05):
+        self.overhead = overhead
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def transcribe_batch(self, clips):
+        self.release.wait(2)
+        self.batches.append(len(clips))
+        time.sleep(self.overhead + 0.001 * len(clips))
+        return [f"clip {int(clip[0])}" for clip in clips]
+
+
+class TestBatchedTranscriber(unittest.TestCase):
+
+    def make(self, model, **kwargs):
+        transcriber = BatchedTranscriber(model.transcribe_batch, **kwargs)
+        transcriber.start()
+        self.addCleanup(transcriber.close)
+        return transcriber
+
+    def test_concurrent_clips_share_batches_and_get_their_own_text(self):
+        model = FakeModel()
+        transcriber = self.make(model, max_batch=8, max_wait=0.02)
+        results = {}
+
+        def client(i):
+            results[i] = transcriber.submit(np.full(1600, i, dtype=np.float32)).result(timeout=5)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {i: f"clip {i}" for i in range(16)})
+        self.assertLessEqual(max(model.batches), 8)
+        self.assertLess(len(model.batches), 16)
+
+    def test_queue_limit_rejects_instead_of_growing(self):
+        model = FakeModel()
+        model.release.clear()
+        transcriber = self.make(model, max_batch=1, max_queue=2)
+        clip = np.zeros(160, dtype=np.float32)
+        first = transcriber.submit(clip)
+        time.sleep(0.05)  # picked up by the worker, which now blocks
+        queued = [transcriber.submit(clip), transcriber.submit(clip)]
+        with self.assertRaises(TranscriptionQueueFull):
+            transcriber.submit(clip)
+        model.release.set()
+        for future in [first] + queued:
+            self.assertEqual(future.result(timeout=2), "clip 0")
+        self.assertEqual(transcriber.stats()["rejected"], 1)
+
+    def test_clips_are_batched_only_with_the_same_options(self):
+        calls = []
+        release = threading.Event()
+
+        def transcribe_batch(clips, options=None):
+            release.wait(2)
+            calls.append((options, len(clips)))
+            return [f"{options} {int(clip[0])}" for clip in clips]
+
+        transcriber = self.make(type("Model", (), {"transcribe_batch": staticmethod(transcribe_batch)}),
+                                max_batch=8, max_wait=0.1)
+        futures = [transcriber.submit(np.full(10, i, dtype=np.float32), "fast" if i % 2 else None)
+                   for i in range(6)]
+        release.set()
+        self.assertEqual([future.result(timeout=2) for future in futures],
+                         [f"{'fast' if i % 2 else None} {i}" for i in range(6)])
+        self.assertEqual(sorted(calls, key=str), [("fast", 3), (None, 3)])
+
+    def test_model_errors_reach_every_caller_in_the_batch(self):
+        def broken(clips):
+            raise RuntimeError("model crashed")
+
+        transcriber = BatchedTranscriber(broken, max_batch=4, max_wait=0.05)
+        transcriber.start()
+        self.addCleanup(transcriber.close)
+        futures = [transcriber.submit(np.zeros(10, dtype=np.float32)) for _ in range(3)]
+        for future in futures:
+            with self.assertRaisesRegex(RuntimeError, "model crashed"):
+                future.result(timeout=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
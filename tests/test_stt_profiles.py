@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+from app.voice.stt_profiles import DECODING_PROFILES, LatencyStats, get_profile
+from tests.stt_fakes import FakeSTTBackend, whisper_stt
+
+
+def speech(seconds=1.0):
+    t = np.arange(int(16000 * seconds)) / 16000
+    quiet = 0.001 * np.random.default_rng(0).standard_normal(8000)
+    return np.concatenate([quiet, 0.3 * np.sin(2 * np.pi * 220 * t), quiet]).astype(np.float32)
+
+
+class TestDecodingProfiles(unittest.TestCase):
+
+    def test_command_is_the_fast_path(self):
+        command, accurate = get_profile("command"), get_profile("accurate")
+        self.assertEqual(command.beam_size, 1)
+        self.assertFalse(command.fallback)
+        self.assertFalse(command.condition_on_previous_text)
+        self.assertIsNotNone(command.language)
+        self.assertGreater(accurate.beam_size, 1)
+        self.assertTrue(accurate.fallback)
+        self.assertIsNone(accurate.language)
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_profile("turbo")
+
+    def test_cache_ids_differ_between_profiles(self):
+        ids = {profile.cache_id() for profile in DECODING_PROFILES.values()}
+        self.assertEqual(len(ids), len(DECODING_PROFILES))
+
+    def test_latency_summary(self):
+        stats = LatencyStats()
+        self.assertEqual(stats.summary(), {"count": 0})
+        for latency in (0.1, 0.2, 0.3, 0.4):
+            stats.record(latency, audio_seconds=2.0)
+        summary = stats.summary()
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["p50_ms"], 300.0)
+        self.assertEqual(summary["max_ms"], 400.0)
+        self.assertAlmostEqual(summary["rtf"], 0.125)
+
+
+class TestWhisperSTTProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = FakeSTTBackend(lambda audio, profile: f"decoded with {profile.name if profile else 'defaults'}")
+        self.stt = whisper_stt(self, self.backend)
+
+    def test_profile_reaches_the_backend_and_is_timed(self):
+        self.assertEqual(self.stt.transcribe_audio(speech(), "command"), "decoded with command")
+        self.assertEqual(self.stt.transcribe_audio(speech(), "accurate"), "decoded with accurate")
+        stats = self.stt.profile_stats()
+        self.assertEqual(stats["command"]["latency"]["count"], 1)
+        self.assertEqual(stats["accurate"]["latency"]["count"], 1)
+        self.assertEqual(stats["dictation"]["latency"], {"count": 0})
+
+    def test_cached_transcripts_are_per_profile(self):
+        audio = speech()
+        before = len(self.backend.calls)  # The warm-up may already have run
+        self.stt.transcribe_audio(audio, "command")
+        self.stt.transcribe_audio(audio, "command")
+        self.stt.transcribe_audio(audio, "dictation")
+        self.assertEqual([profile.name for _, profile in self.backend.calls[before:]], ["command", "dictation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
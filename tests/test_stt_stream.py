@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from app.voice.stt_stream import StreamingTranscription
+
+RATE = 16000
+
+
+def pcm(seconds, amplitude, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(RATE * seconds)) / RATE
+    if amplitude > 0.05:
+        signal = amplitude * np.sin(2 * np.pi * 220 * t)
+    else:
+        signal = amplitude * rng.standard_normal(t.size)
+    return (signal * 32767).astype("<i2").tobytes()
+
+
+def stream(session, audio, chunk_bytes=640):
+    actions = []
+    for i in range(0, len(audio), chunk_bytes):
+        actions.extend(session.feed(audio[i:i + chunk_bytes]))
+    return actions
+
+
+class TestStreamingTranscription(unittest.TestCase):
+
+    def test_utterance_gets_partials_then_a_final(self):
+        session = StreamingTranscription(end_silence=0.4, partial_interval=0.5)
+        audio = pcm(0.5, 0.003) + pcm(1.5, 0.3) + pcm(0.6, 0.003, seed=1)
+        actions = stream(session, audio)
+        kinds = [action["type"] for action in actions]
+        self.assertEqual(kinds[0], "speech_start")
+        self.assertEqual(kinds.count("partial"), 2)
+        self.assertEqual(kinds[-1], "final")
+        final = actions[-1]["audio"]
+        # 1.5 s of speech plus up to 0.3 s pre-roll and a short silence tail
+        self.assertGreater(final.size / RATE, 1.5)
+        self.assertLess(final.size / RATE, 2.0)
+        self.assertEqual(final.dtype, np.float32)
+
+    def test_final_is_issued_as_soon_as_silence_is_long_enough(self):
+        session = StreamingTranscription(end_silence=0.3, partial_interval=10)
+        stream(session, pcm(0.3, 0.003) + pcm(1.0, 0.3))
+        actions = stream(session, pcm(0.27, 0.003, seed=2))
+        self.assertEqual(actions, [])
+        actions = stream(session, pcm(0.06, 0.003, seed=3))
+        self.assertEqual([action["type"] for action in actions], ["final"])
+
+    def test_short_blip_and_flush(self):
+        session = StreamingTranscription(min_speech=0.2)
+        actions = stream(session, pcm(0.3, 0.003) + pcm(0.06, 0.3) + pcm(0.6, 0.003, seed=1))
+        self.assertEqual([action["type"] for action in actions], ["speech_start", "discard"])
+        stream(session, pcm(0.5, 0.3))
+        self.assertEqual([action["type"] for action in session.flush()], ["final"])
+        self.assertEqual(session.flush(), [])
+
+    def test_other_sample_rates_are_resampled(self):
+        session = StreamingTranscription(sample_rate=8000)
+        t = np.arange(8000) / 8000
+        tone = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2").tobytes()
+        quiet = np.zeros(2400, dtype="<i2").tobytes()
+        actions = stream(session, quiet + tone + quiet * 2)
+        self.assertEqual(actions[-1]["type"], "final")
+        # 1 s of tone plus pre-roll and tail, now counted in 16 kHz samples
+        self.assertGreater(actions[-1]["audio"].size / RATE, 1.0)
+        self.assertLess(actions[-1]["audio"].size / RATE, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
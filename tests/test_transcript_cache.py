@@ -0,0 +1,89 @@
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+from app.voice.transcript_cache import TranscriptCache, transcript_key
+
+
+def clip(seed, seconds=0.5):
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal(int(16000 * seconds))).astype(np.float32)
+
+
+class TestTranscriptKey(unittest.TestCase):
+
+    def test_same_audio_same_key(self):
+        self.assertEqual(transcript_key(clip(1), "whisper:base"), transcript_key(clip(1).copy(), "whisper:base"))
+
+    def test_audio_and_model_change_the_key(self):
+        key = transcript_key(clip(1), "whisper:base")
+        self.assertNotEqual(key, transcript_key(clip(2), "whisper:base"))
+        self.assertNotEqual(key, transcript_key(clip(1), "faster-whisper:base:int8:beam5"))
+
+    def test_dtype_does_not_change_the_key(self):
+        audio = clip(3)
+        self.assertEqual(transcript_key(audio, "m"), transcript_key(audio.astype(np.float64), "m"))
+
+
+class TestTranscriptCache(unittest.TestCase):
+
+    def test_hit_skips_compute(self):
+        cache = TranscriptCache(max_entries=4)
+        calls = []
+        compute = lambda: calls.append(1) or "turn on the light"
+        self.assertEqual(cache.get_or_compute("a", compute), "turn on the light")
+        self.assertEqual(cache.get_or_compute("a", compute), "turn on the light")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TranscriptCache(max_entries=2)
+        cache.get_or_compute("a", lambda: "A")
+        cache.get_or_compute("b", lambda: "B")
+        cache.get_or_compute("a", lambda: "unused")
+        cache.get_or_compute("c", lambda: "C")
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.get_or_compute("a", lambda: "recomputed"), "A")
+        self.assertEqual(cache.get_or_compute("b", lambda: "recomputed"), "recomputed")
+
+    def test_disk_tier_survives_a_new_instance(self):
+        with tempfile.TemporaryDirectory() as directory:
+            TranscriptCache(max_entries=4, directory=directory).get_or_compute("ab12", lambda: "open the door")
+            cache = TranscriptCache(max_entries=4, directory=directory)
+            self.assertEqual(cache.get_or_compute("ab12", lambda: self.fail("recomputed")), "open the door")
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_concurrent_identical_requests_compute_once(self):
+        cache = TranscriptCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return "lights off"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["lights off"] * 6)
+
+    def test_errors_are_not_cached(self):
+        cache = TranscriptCache()
+
+        def fail():
+            raise RuntimeError("model crashed")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", fail)
+        self.assertEqual(cache.get_or_compute("k", lambda: "retried"), "retried")
+
+
+if __name__ == "__main__":
+    unittest.main()
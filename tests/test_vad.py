@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from app.voice.vad import detect_speech, trim_silence, zero_crossing_rate
+
+RATE = 16000
+rng = np.random.default_rng(0)
+
+
+def noise(seconds, amplitude=0.003):
+    return (amplitude * rng.standard_normal(int(RATE * seconds))).astype(np.float32)
+
+
+def voiced(seconds, amplitude=0.3):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32) + noise(seconds)
+
+
+class TestVAD(unittest.TestCase):
+
+    def test_segments_are_padded_and_short_gaps_bridged(self):
+        audio = np.concatenate([noise(1), voiced(0.8), noise(0.2), voiced(0.5), noise(2), voiced(0.6), noise(1)])
+        segments = [(start / RATE, end / RATE) for start, end in detect_speech(audio)]
+        self.assertEqual(len(segments), 2)
+        self.assertAlmostEqual(segments[0][0], 0.8, delta=0.05)
+        self.assertAlmostEqual(segments[0][1], 2.7, delta=0.05)
+        self.assertAlmostEqual(segments[1][0], 4.3, delta=0.05)
+        self.assertAlmostEqual(segments[1][1], 5.3, delta=0.05)
+
+    def test_fricatives_count_as_speech(self):
+        hiss = (0.012 * rng.standard_normal(int(RATE * 0.3))).astype(np.float32)
+        self.assertGreater(zero_crossing_rate(hiss, 480).mean(), 0.3)
+        self.assertTrue(detect_speech(np.concatenate([noise(1), hiss + noise(0.3), noise(1)])))
+
+    def test_noise_floor_follows_a_louder_background(self):
+        # A fan switching on at 3 s is a short onset at most; once learned it is background
+        audio = np.concatenate([noise(3), noise(4, 0.03), voiced(0.6, 0.5) + noise(0.6, 0.03), noise(2, 0.03)])
+        segments = [(start / RATE, end / RATE) for start, end in detect_speech(audio)]
+        self.assertAlmostEqual(segments[-1][0], 6.8, delta=0.05)
+        self.assertAlmostEqual(segments[-1][1], 7.8, delta=0.05)
+        self.assertTrue(all(end < 5.0 for _, end in segments[:-1]))
+
+    def test_no_speech(self):
+        self.assertIsNone(trim_silence(noise(5)))
+        self.assertIsNone(trim_silence(np.zeros(RATE * 2, dtype=np.float32)))
+        self.assertEqual(detect_speech(np.zeros(100, dtype=np.float32)), [])
+
+    def test_trim_keeps_only_speech(self):
+        audio = np.concatenate([noise(3), voiced(1.0), noise(3)])
+        trimmed = trim_silence(audio)
+        self.assertAlmostEqual(trimmed.size / RATE, 1.4, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
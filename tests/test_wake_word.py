@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from app.voice.assistant import WakeWordAssistant
+from app.voice.wake_word import MfccStream, WakeWordDetector, WakeWordModel, mfcc
+from tests.stt_fakes import FakeSTTBackend, whisper_stt
+
+RATE = 16000
+# (pitch, formant) per 120 ms segment: a crude vowel sequence standing in for a spoken phrase
+PHRASE = [(140, 700), (150, 500), (160, 2300), (150, 2000), (130, 800), (140, 1200), (150, 2600)]
+OTHER = [(140, 300), (130, 900), (150, 1500), (140, 600), (160, 2900), (130, 400), (120, 1800)]
+
+
+def word(segments, rate=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    parts = []
+    for pitch, formant in segments:
+        t = np.arange(int(0.12 / rate * RATE)) / RATE
+        parts.append(sum(np.sin(2 * np.pi * pitch * h * t) * np.exp(-((pitch * h - formant) / 400) ** 2)
+                         for h in range(1, 20)))
+    signal = np.concatenate(parts)
+    signal = 0.3 * signal / np.abs(signal).max()
+    return (signal + 0.003 * rng.standard_normal(signal.size)).astype(np.float32)
+
+
+def padded(clip, seed=0):
+    rng = np.random.default_rng(seed)
+    silence = lambda: (0.002 * rng.standard_normal(RATE // 2)).astype(np.float32)
+    return np.concatenate([silence(), clip, silence()])
+
+
+def detections(detector, audio, block=512):
+    return sum(detector.feed(audio[i:i + block]) for i in range(0, audio.size, block))
+
+
+def enrolled():
+    return WakeWordModel.enroll([padded(word(PHRASE, rate, seed), seed) for seed, rate in enumerate((0.9, 1.0, 1.1))])
+
+
+class TestMfcc(unittest.TestCase):
+
+    def test_stream_matches_whole_clip(self):
+        audio = word(PHRASE)
+        stream = MfccStream()
+        blocks = [stream.feed(audio[i:i + 333], silence_db=None)[0] for i in range(0, audio.size, 333)]
+        np.testing.assert_allclose(np.concatenate(blocks), mfcc(audio), rtol=1e-4, atol=1e-3)
+
+    def test_silent_frames_skip_the_transform(self):
+        features, loud = MfccStream().feed(np.zeros(RATE, dtype=np.float32))
+        self.assertEqual(loud.size, 98)
+        self.assertFalse(loud.any())
+        self.assertFalse(features.any())
+
+
+class TestWakeWordDetector(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = enrolled()
+
+    def test_detects_the_phrase_at_other_speeds(self):
+        for rate, seed in ((0.95, 7), (1.2, 8)):
+            self.assertEqual(detections(WakeWordDetector(self.model), padded(word(PHRASE, rate, seed))), 1)
+
+    def test_ignores_other_speech_and_noise(self):
+        detector = WakeWordDetector(self.model)
+        self.assertEqual(detections(detector, padded(word(OTHER, seed=3))), 0)
+        noise = (0.02 * np.random.default_rng(5).standard_normal(5 * RATE)).astype(np.float32)
+        self.assertEqual(detections(detector, noise), 0)
+
+    def test_silence_is_not_transformed(self):
+        detector = WakeWordDetector(self.model)
+        detections(detector, np.zeros(2 * RATE, dtype=np.float32))
+        self.assertGreater(detector.frames, 0)
+        self.assertEqual(detector.transformed_frames, 0)
+
+    def test_model_round_trips_through_a_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wake_word.npz")
+            self.model.save(path)
+            loaded = WakeWordModel.load(path)
+        self.assertEqual(len(loaded.templates), len(self.model.templates))
+        self.assertAlmostEqual(loaded.threshold, self.model.threshold, places=5)
+        self.assertEqual(loaded.phrase, "hey assistant")
+
+
+class FakeSTT:
+    def __init__(self):
+        self.clips = []
+
+    def transcribe_audio(self, audio, profile=None):
+        self.clips.append(audio)
+        return "turn on the lamp"
+
+
+def commands(backend):
+    """Clips the backend transcribed, leaving out the warm-up pass on silence."""
+    return [audio for audio, _ in backend.calls if audio.any()]
+
+
+def pcm_blocks(audio, block=512):
+    data = (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+    return [data[i:i + 2 * block] for i in range(0, len(data), 2 * block)]
+
+
+class TestWakeWordAssistant(unittest.TestCase):
+
+    def test_only_the_command_after_the_wake_word_is_transcribed(self):
+        stt = FakeSTT()
+        assistant = WakeWordAssistant(stt, detector=WakeWordDetector(enrolled()), command_timeout=3)
+        command = word(OTHER, seed=11)
+        audio = np.concatenate([padded(word(OTHER, seed=10)), padded(word(PHRASE, seed=12)), padded(command)])
+        self.assertEqual(assistant.listen(pcm_blocks(audio)), "turn on the lamp")
+        self.assertEqual(len(stt.clips), 1)
+        self.assertLess(abs(stt.clips[0].size - command.size) / RATE, 0.5)
+
+    def test_returns_empty_when_the_stream_ends_without_wake_word(self):
+        stt = FakeSTT()
+        assistant = WakeWordAssistant(stt, detector=WakeWordDetector(enrolled()))
+        self.assertEqual(assistant.listen(pcm_blocks(padded(word(OTHER)))), "")
+        self.assertEqual(stt.clips, [])
+
+    def test_silence_after_the_wake_word_goes_back_to_waiting(self):
+        backend = FakeSTTBackend("turn on the lamp")
+        assistant = WakeWordAssistant(whisper_stt(self, backend), detector=WakeWordDetector(enrolled()), command_timeout=1)
+        silence = (0.002 * np.random.default_rng(13).standard_normal(3 * RATE)).astype(np.float32)
+        audio = np.concatenate([padded(word(PHRASE, seed=12)), silence])
+        self.assertEqual(assistant.listen(pcm_blocks(audio)), "")
+        self.assertEqual(commands(backend), [])
+
+    def test_transcription_errors_are_not_commands(self):
+        backend = FakeSTTBackend(fail=True)
+        assistant = WakeWordAssistant(whisper_stt(self, backend), detector=WakeWordDetector(enrolled()), command_timeout=3)
+        audio = np.concatenate([padded(word(PHRASE, seed=12)), padded(word(OTHER, seed=11))])
+        self.assertEqual(assistant.listen(pcm_blocks(audio)), "")
+        self.assertEqual(len(commands(backend)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()